@@ -1 +1,41 @@
+from __future__ import annotations
 
+from typing import Any, Mapping
+
+from flask import Flask
+
+
+def create_app(config: Mapping[str, Any] | None = None) -> Flask:
+    # Fabryka nie dotyka bazy ani plików: schemat jest sprawdzany leniwie przy
+    # pierwszym żądaniu (ensure_database), czcionka PDF przy pierwszym PDF.
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///finance.db"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SECRET_KEY"] = "zmien-to-na-losowe-haslo"
+    app.config["LIST_PAGE_SIZE"] = 50
+    if config:
+        app.config.update(config)
+
+    from . import cli
+    from .blueprints import dashboard, data, invoices, jobs, ndg, search
+    from .config import DEFAULT_ISSUE_PLACE, NDG_MONTHLY_LIMIT, SELLER
+    from .extensions import db
+    from .helpers import pl_currency
+    from .schema import ensure_database
+
+    db.init_app(app)
+    for blueprint in (dashboard.bp, invoices.bp, ndg.bp, data.bp, search.bp, jobs.bp):
+        app.register_blueprint(blueprint)
+    app.add_template_filter(pl_currency, "pl_currency")
+    app.before_request(ensure_database)
+    cli.init_app(app)
+
+    @app.context_processor
+    def inject_globals():
+        return {
+            "NDG_MONTHLY_LIMIT": NDG_MONTHLY_LIMIT,
+            "SELLER": SELLER,
+            "DEFAULT_ISSUE_PLACE": DEFAULT_ISSUE_PLACE,
+        }
+
+    return app
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import func
+
+from .money import ZERO
+
+# Klucz miesiąca: (rok, miesiąc). Wszystkie serie są liczone jednym zapytaniem
+# GROUP BY na tabelę, a brakujące miesiące uzupełniane są zerami w Pythonie.
+MonthKey = Tuple[int, int]
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+
+def shift_month_key(key: MonthKey, delta: int) -> MonthKey:
+    idx = key[0] * 12 + (key[1] - 1) + delta
+    return idx // 12, idx % 12 + 1
+
+
+def trailing_months(reference: date, months_back: int) -> List[MonthKey]:
+    current = (reference.year, reference.month)
+    return [shift_month_key(current, -offset) for offset in reversed(range(months_back))]
+
+
+def year_months(year: int) -> List[MonthKey]:
+    return [(year, month) for month in range(1, 13)]
+
+
+def month_label(key: MonthKey) -> str:
+    return f"{key[0]}-{key[1]:02d}"
+
+
+def months_span(months: Sequence[MonthKey]) -> Tuple[date, date]:
+    first = min(months)
+    last_year, last_month = shift_month_key(max(months), 1)
+    return date(first[0], first[1], 1), date(last_year, last_month, 1)
+
+
+def rollup_series(
+    session,
+    year_column,
+    month_column,
+    value_column,
+    months: Sequence[MonthKey],
+    *criteria,
+) -> List[Decimal]:
+    # Odczyt z tabeli zestawień (jeden wiersz na miesiąc i typ dokumentu).
+    if not months:
+        return []
+    rows = (
+        session.query(year_column, month_column, func.coalesce(func.sum(value_column), 0))
+        .filter(year_column >= min(months)[0])
+        .filter(year_column <= max(months)[0])
+        .filter(*criteria)
+        .group_by(year_column, month_column)
+        .all()
+    )
+    found = {(int(year), int(month)): total for year, month, total in rows}
+    return [found.get(key, ZERO) for key in months]
+
+
+class CumulativeIndex:
+    # Sumy narastające per dzień: suma dowolnego zakresu dat to różnica dwóch
+    # wartości znalezionych wyszukiwaniem binarnym, bez ponownego skanu tabel.
+    def __init__(self, daily_values: Mapping[str, Mapping[date, int]]):
+        days = sorted({day for values in daily_values.values() for day in values})
+        self.days = [day.toordinal() for day in days]
+        self.prefix: Dict[str, List[int]] = {}
+        for name, values in daily_values.items():
+            running = 0
+            prefix = [0]
+            for day in days:
+                running += values.get(day, 0)
+                prefix.append(running)
+            self.prefix[name] = prefix
+
+    def total(self, name: str, start: date, end: date) -> int:
+        # Zakres prawostronnie otwarty: [start, end).
+        lo = bisect_left(self.days, start.toordinal())
+        hi = bisect_left(self.days, end.toordinal())
+        prefix = self.prefix[name]
+        return prefix[hi] - prefix[lo]
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return day
+
+
+def _period_label(start: date, granularity: str) -> str:
+    if granularity == "week":
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if granularity == "month":
+        return start.strftime("%Y-%m")
+    if granularity == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return start.isoformat()
+
+
+def _next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        year, month = shift_month_key((start.year, start.month), 1)
+        return date(year, month, 1)
+    if granularity == "quarter":
+        year, month = shift_month_key((start.year, start.month), 3)
+        return date(year, month, 1)
+    return start + timedelta(days=1)
+
+
+def period_buckets(first_day: date, last_day: date, granularity: str) -> List[Tuple[str, date, date]]:
+    # Kubełki [początek, koniec) przycięte do zakresu first_day..last_day włącznie.
+    buckets: List[Tuple[str, date, date]] = []
+    range_end = last_day + timedelta(days=1)
+    period = _period_start(first_day, granularity)
+    while period < range_end:
+        following = _next_period(period, granularity)
+        buckets.append(
+            (_period_label(period, granularity), max(period, first_day), min(following, range_end))
+        )
+        period = following
+    return buckets
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from flask import current_app
+from sqlalchemy import (
+    Column,
+    Index,
+    MetaData,
+    Table,
+    and_,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.orm import aliased
+
+from .migrations import table_exists
+from .models import ArchivedYear, Invoice, InvoiceItem, NDGDocument
+from .rollups import DOCUMENTS_VERSION, bump_data_version
+from .search import SEARCH_TABLES, create_search_tables
+
+# Zamknięte lata przenosimy do osobnych plików instance/archive_<rok>.db.
+# Baza główna trzyma tylko bieżące dane (i monthly_totals za wszystkie lata,
+# więc dashboard nie musi sięgać do archiwów). Archiwa są dołączane przez
+# ATTACH DATABASE tylko wtedy, gdy żądany zakres dat obejmuje zarchiwizowany
+# rok. Załączniki NDG zostają w bazie głównej.
+ARCHIVED_MODELS = (Invoice, InvoiceItem, NDGDocument)
+
+
+def archive_schema(year: int) -> str:
+    return f"archive_{int(year)}"
+
+
+def archive_file_name(year: int) -> str:
+    return f"{archive_schema(year)}.db"
+
+
+@lru_cache(maxsize=None)
+def _archive_metadata(year: int) -> MetaData:
+    # Kopie tabel bez kluczy obcych (np. do service_templates z bazy głównej),
+    # z tymi samymi indeksami co w bazie głównej.
+    metadata = MetaData()
+    for model in ARCHIVED_MODELS:
+        source = model.__table__
+        table = Table(
+            source.name,
+            metadata,
+            *(
+                Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+                for column in source.columns
+            ),
+            schema=archive_schema(year),
+        )
+        for index in source.indexes:
+            Index(index.name, *(table.c[column.name] for column in index.columns), unique=index.unique)
+    return metadata
+
+
+def archive_table(model, year: int):
+    return _archive_metadata(year).tables[f"{archive_schema(year)}.{model.__tablename__}"]
+
+
+def archived_years(connection) -> Dict[int, str]:
+    # Przed migracją tworzącą archived_years (np. przeliczenie rollupów
+    # w starszych krokach) tabeli jeszcze nie ma.
+    if not table_exists(connection, ArchivedYear.__tablename__):
+        return {}
+    rows = connection.execute(select(ArchivedYear.year, ArchivedYear.file_name).order_by(ArchivedYear.year))
+    return {year: file_name for year, file_name in rows}
+
+
+def archive_years_between(years: Iterable[int], start: date | None, end: date | None) -> List[int]:
+    # Zakres [start, end) - None oznacza brak ograniczenia z danej strony.
+    return [
+        year
+        for year in years
+        if (start is None or year >= start.year) and (end is None or date(year, 1, 1) < end)
+    ]
+
+
+def archive_path(file_name: str) -> Path:
+    return Path(current_app.instance_path) / file_name
+
+
+def attach_archives(connection, archives: Dict[int, str], years: Sequence[int]) -> None:
+    attached = {row[1] for row in connection.exec_driver_sql("PRAGMA database_list")}
+    for year in years:
+        schema = archive_schema(year)
+        if schema not in attached:
+            connection.execute(
+                text(f"ATTACH DATABASE :path AS {schema}"),
+                {"path": str(archive_path(archives[year]))},
+            )
+
+
+def with_archives(session, model, years: Sequence[int]):
+    # Model albo alias na UNION ALL tabeli głównej i tabel z archiwów - zapytania
+    # ORM (filtry, stronicowanie, load_only) działają na nim bez zmian.
+    if not years:
+        return model
+    connection = session.connection()
+    attach_archives(connection, archived_years(connection), years)
+    sources = [select(model.__table__), *(select(archive_table(model, year)) for year in years)]
+    return aliased(model, union_all(*sources).subquery(model.__tablename__), adapt_on_names=True)
+
+
+def archives_for_range(session, model, start: date | None, end: date | None):
+    years = archive_years_between(archived_years(session.connection()), start, end)
+    return with_archives(session, model, years), years
+
+
+def entity_columns(entity, columns: Sequence) -> List:
+    return [getattr(entity, column.key) for column in columns]
+
+
+def archives_for_filters(session, model, filters):
+    # Listy sięgają do archiwów tylko przy jawnie podanym zakresie dat (?od= / ?do=).
+    if filters.date_from is None and filters.date_to is None:
+        return model, []
+    end = filters.date_to + timedelta(days=1) if filters.date_to else None
+    return archives_for_range(session, model, filters.date_from, end)
+
+
+def with_all_archives(session, model):
+    return with_archives(session, model, list(archived_years(session.connection())))
+
+
+def archives_for_export(session, model, filters):
+    # Eksport bez okresu obejmuje całą historię, razem z archiwami.
+    if filters.date_from is None and filters.date_to is None:
+        return with_all_archives(session, model)
+    return archives_for_filters(session, model, filters)[0]
+
+
+def archived_max_id(connection, model) -> int:
+    archives = archived_years(connection)
+    attach_archives(connection, archives, list(archives))
+    values = [
+        connection.execute(select(func.max(archive_table(model, year).c.id))).scalar() for year in archives
+    ]
+    return max((value for value in values if value is not None), default=0)
+
+
+def find_archived(session, model, document_id: int):
+    # Identyfikatory są unikalne także między bazą główną a archiwami
+    # (tabele z AUTOINCREMENT nie używają ponownie id przeniesionych do
+    # archiwum), więc wystarczy pierwsze trafienie.
+    connection = session.connection()
+    archives = archived_years(connection)
+    for year in archives:
+        attach_archives(connection, archives, [year])
+        entity = aliased(model, archive_table(model, year), adapt_on_names=True)
+        document = session.query(entity).filter(entity.id == document_id).first()
+        if document is not None:
+            return document
+    return None
+
+
+def ensure_year_open(session, day: date | None) -> None:
+    if day is not None and day.year in archived_years(session.connection()):
+        raise ValueError(
+            f"Rok {day.year} jest zarchiwizowany - dokumentów z tego roku nie można dodawać ani zmieniać."
+        )
+
+
+def _move_search_rows(connection, kind: str, schema: str, ids_sql: str, params: dict) -> None:
+    table = SEARCH_TABLES[kind]
+    connection.execute(
+        text(
+            f"INSERT INTO {schema}.{table} (rowid, number, party, body)"
+            f" SELECT rowid, number, party, body FROM main.{table} WHERE rowid IN ({ids_sql})"
+        ),
+        params,
+    )
+    connection.execute(text(f"DELETE FROM main.{table} WHERE rowid IN ({ids_sql})"), params)
+
+
+def _copy_rows(connection, model, year: int, where) -> None:
+    target = archive_table(model, year)
+    columns = [column.name for column in model.__table__.columns]
+    connection.execute(
+        insert(target).from_select(columns, select(*model.__table__.columns).where(where))
+    )
+
+
+def archive_year(connection, year: int) -> Tuple[int, int]:
+    archives = archived_years(connection)
+    if year in archives:
+        raise ValueError(f"Rok {year} jest już zarchiwizowany.")
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    in_invoices = and_(Invoice.issue_date >= start, Invoice.issue_date < end)
+    in_ndg = and_(NDGDocument.document_date >= start, NDGDocument.document_date < end)
+    in_items = InvoiceItem.invoice_id.in_(select(Invoice.id).where(in_invoices))
+    invoice_count = connection.execute(select(func.count(Invoice.id)).where(in_invoices)).scalar()
+    ndg_count = connection.execute(select(func.count(NDGDocument.id)).where(in_ndg)).scalar()
+
+    archives = {**archives, year: archive_file_name(year)}
+    if archive_path(archives[year]).exists():
+        raise ValueError(f"Plik archiwum {archives[year]} już istnieje - usuń go albo przenieś.")
+    attach_archives(connection, archives, [year])
+    schema = archive_schema(year)
+    _archive_metadata(year).create_all(connection)
+    create_search_tables(connection, schema)
+
+    _copy_rows(connection, Invoice, year, in_invoices)
+    _copy_rows(connection, InvoiceItem, year, in_items)
+    _copy_rows(connection, NDGDocument, year, in_ndg)
+    params = {"start": start.isoformat(), "end": end.isoformat()}
+    _move_search_rows(
+        connection,
+        "invoice",
+        schema,
+        "SELECT id FROM main.invoices WHERE issue_date >= :start AND issue_date < :end",
+        params,
+    )
+    _move_search_rows(
+        connection,
+        "ndg",
+        schema,
+        "SELECT id FROM main.ndg_documents WHERE document_date >= :start AND document_date < :end",
+        params,
+    )
+    connection.execute(delete(InvoiceItem).where(in_items))
+    connection.execute(delete(Invoice).where(in_invoices))
+    connection.execute(delete(NDGDocument).where(in_ndg))
+
+    connection.execute(
+        insert(ArchivedYear).values(
+            year=year,
+            file_name=archives[year],
+            archived_at=datetime.now(timezone.utc).replace(tzinfo=None),
+            invoice_count=invoice_count,
+            ndg_count=ndg_count,
+        )
+    )
+    bump_data_version(connection, DOCUMENTS_VERSION)
+    return invoice_count, ndg_count
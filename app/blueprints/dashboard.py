@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from flask import Blueprint, jsonify, redirect, render_template, request, url_for
+from sqlalchemy import func, select
+from werkzeug.http import quote_etag
+
+from ..aggregation import (
+    GRANULARITIES,
+    CumulativeIndex,
+    month_label,
+    period_buckets,
+    shift_month_key,
+    trailing_months,
+)
+from ..archive import archive_table, archived_years, attach_archives
+from ..cache import app_cache
+from ..config import NDG_MONTHLY_LIMIT
+from ..extensions import db
+from ..helpers import month_name_pl, parse_any_date
+from ..line_items import service_revenue
+from ..models import Invoice, NDGDocument
+from ..money import grosze
+from ..rollups import DOCUMENTS_VERSION, annual_sales_by_month, data_version, ndg_costs_by_month, sales_by_month
+
+bp = Blueprint("dashboard", __name__)
+
+ANALYTICS_SERIES = ("sales", "ndg", "count")
+ANALYTICS_MAX_BUCKETS = 3700
+TOP_SERVICES_LIMIT = 5
+
+
+@bp.route("/")
+def index():
+    return redirect(url_for("dashboard.dashboard"))
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    etag: str
+    template_context: dict
+    api_payload: dict
+
+
+def _dashboard_snapshot() -> DashboardSnapshot:
+    today = date.today()
+    version = data_version(DOCUMENTS_VERSION)
+    # Migawka zależy tylko od bieżącego miesiąca i wersji danych, więc liczymy
+    # ją raz i podajemy kolejnym żądaniom aż do następnego zapisu.
+    return app_cache("dashboard").get_or_build(
+        (today.year, today.month, version),
+        lambda: _build_dashboard_snapshot(today, version),
+    )
+
+
+def _build_dashboard_snapshot(today: date, version: int) -> DashboardSnapshot:
+    months = trailing_months(today, 6)
+    month_dates = [date(year, month, 1) for year, month in months]
+    sales_data = sales_by_month(months)
+    ndg_costs = ndg_costs_by_month(months)
+
+    if month_dates:
+        current_idx = len(month_dates) - 1
+        current_date = month_dates[current_idx]
+    else:
+        current_idx = 0
+        current_date = date(today.year, today.month, 1)
+
+    current_month_sales = sales_data[current_idx] if sales_data else Decimal("0")
+    current_month_usage = current_month_sales
+    current_remaining = max(NDG_MONTHLY_LIMIT - current_month_usage, Decimal("0"))
+
+    donut_dataset = [
+        float(current_month_usage),
+        float(current_remaining),
+    ]
+
+    history_rows = []
+    for dt, sales_value, cost_value in reversed(
+        list(zip(month_dates, sales_data, ndg_costs))
+    ):
+        history_rows.append(
+            {
+                "label": month_name_pl(dt.year, dt.month, capitalize=False),
+                "limit": NDG_MONTHLY_LIMIT,
+                "sales": sales_value,
+                "ndg": cost_value,
+                "remaining": max(NDG_MONTHLY_LIMIT - sales_value, Decimal("0")),
+            }
+        )
+
+    chart_sales_series = [float(val) for val in sales_data]
+    chart_labels = [
+        month_name_pl(dt.year, dt.month, capitalize=True) for dt in month_dates
+    ]
+    chart_ndg_series = [float(val) for val in sales_data]
+    chart_ndg_cost_series = [float(val) for val in ndg_costs]
+    chart_limit_series = [float(NDG_MONTHLY_LIMIT) for _ in month_dates]
+    chart_remaining_series = [
+        float(max(NDG_MONTHLY_LIMIT - usage, Decimal("0"))) for usage in sales_data
+    ]
+    current_year = today.year
+
+    usage_percent = 0.0
+    if NDG_MONTHLY_LIMIT > 0:
+        usage_percent = float((current_month_usage / NDG_MONTHLY_LIMIT) * 100)
+        usage_percent = max(0.0, min(usage_percent, 100.0))
+
+    template_context = dict(
+        chart_labels=chart_labels,
+        sales_series=chart_sales_series,
+        ndg_series=chart_ndg_series,
+        ndg_cost_series=chart_ndg_cost_series,
+        limit_series=chart_limit_series,
+        remaining_series=chart_remaining_series,
+        current_month_name=month_name_pl(
+            current_date.year, current_date.month, capitalize=True
+        ),
+        current_year=current_year,
+        current_limit=NDG_MONTHLY_LIMIT,
+        current_sales=current_month_sales,
+        ndg_usage=current_month_usage,
+        ndg_remaining=current_remaining,
+        usage_percent=usage_percent,
+        donut_dataset=donut_dataset,
+        history_rows=history_rows,
+    )
+
+    api_payload = {
+        "labels": [month_label(key) for key in months],
+        "sales": chart_sales_series,
+        "ndg": chart_ndg_series,
+        "ndg_costs": chart_ndg_cost_series,
+        "ndg_limit": float(NDG_MONTHLY_LIMIT),
+        "current_ndg_usage": float(current_month_usage),
+        "current_ndg_remaining": float(current_remaining),
+    }
+    return DashboardSnapshot(
+        etag=f"dashboard-{today.year}-{today.month:02d}-{version}",
+        template_context=template_context,
+        api_payload=api_payload,
+    )
+
+
+def _top_services_url(today: date) -> str:
+    # Usługi kwartału pobiera przeglądarka z /api/service-revenue dopiero po
+    # rozwinięciu panelu "Kondycja firmy" - nie wchodzą do migawki dashboardu.
+    quarter_start = date(today.year, (today.month - 1) // 3 * 3 + 1, 1)
+    quarter_end = date(*shift_month_key((quarter_start.year, quarter_start.month), 3), 1)
+    return url_for(
+        "dashboard.service_revenue_data",
+        **{"from": quarter_start.isoformat(), "to": (quarter_end - timedelta(days=1)).isoformat()},
+        limit=TOP_SERVICES_LIMIT,
+    )
+
+
+@bp.route("/dashboard")
+def dashboard():
+    today = date.today()
+    snapshot = _dashboard_snapshot()
+    return render_template(
+        "dashboard.html",
+        dashboard_etag=quote_etag(snapshot.etag),
+        services_url=_top_services_url(today),
+        current_quarter_label=f"{(today.month - 1) // 3 + 1}. kwartał {today.year}",
+        **snapshot.template_context,
+    )
+
+
+@bp.route("/api/dashboard-data")
+def dashboard_data():
+    snapshot = _dashboard_snapshot()
+    response = jsonify(snapshot.api_payload)
+    response.set_etag(snapshot.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@bp.route("/api/annual-sales")
+def annual_sales_data():
+    year = request.args.get("year", type=int) or date.today().year
+    version = data_version(DOCUMENTS_VERSION)
+    _, totals = annual_sales_by_month(year)
+    response = jsonify(
+        {
+            "year": year,
+            "labels": [month_name_pl(year, month, capitalize=True) for month in range(1, 13)],
+            "series": [float(amount) for amount in totals],
+            "total": float(sum(totals, Decimal("0"))),
+        }
+    )
+    response.set_etag(f"annual-{year}-{version}")
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def _analytics_indexes() -> Tuple[int, List[CumulativeIndex]]:
+    # Sumy narastające trzymamy w dwóch częściach. Zarchiwizowane lata się nie
+    # zmieniają (ensure_year_open), więc ich indeks zależy tylko od listy
+    # archiwów; po zapisie przebudowujemy wyłącznie część z bazy głównej.
+    version = data_version(DOCUMENTS_VERSION)
+    connection = db.session.connection()
+    archives = archived_years(connection)
+    archived = app_cache("analytics_archived").get_or_build(
+        tuple(sorted(archives.items())),
+        lambda: _build_archived_index(connection, archives),
+    )
+    current = app_cache("analytics").get_or_build(
+        version,
+        lambda: CumulativeIndex(_daily_values(connection, Invoice.__table__, NDGDocument.__table__)),
+    )
+    return version, [archived, current]
+
+
+def _daily_values(connection, invoices, documents) -> Dict[str, Dict[date, int]]:
+    # Jedno zapytanie GROUP BY na tabelę: kwoty w groszach i liczba dokumentów per dzień.
+    sales_rows = connection.execute(
+        select(invoices.c.issue_date, func.sum(grosze(invoices.c.gross_amount)), func.count(invoices.c.id))
+        .group_by(invoices.c.issue_date)
+    ).all()
+    ndg_rows = connection.execute(
+        select(documents.c.document_date, func.sum(grosze(documents.c.amount))).group_by(documents.c.document_date)
+    ).all()
+    return {
+        "sales": {day: total for day, total, _ in sales_rows},
+        "count": {day: count for day, _, count in sales_rows},
+        "ndg": {day: total for day, total in ndg_rows},
+    }
+
+
+def _build_archived_index(connection, archives: Dict[int, str]) -> CumulativeIndex:
+    attach_archives(connection, archives, list(archives))
+    values: Dict[str, Dict[date, int]] = {name: {} for name in ANALYTICS_SERIES}
+    for year in archives:
+        yearly = _daily_values(connection, archive_table(Invoice, year), archive_table(NDGDocument, year))
+        for name, days in yearly.items():
+            values[name].update(days)
+    return CumulativeIndex(values)
+
+
+@bp.route("/api/analytics")
+def analytics_data():
+    today = date.today()
+    first_day = parse_any_date(request.args.get("from")) or date(today.year, 1, 1)
+    last_day = parse_any_date(request.args.get("to")) or today
+    granularity = (request.args.get("granularity") or "month").lower()
+    series_raw = request.args.get("series") or ",".join(ANALYTICS_SERIES)
+    series = [name.strip().lower() for name in series_raw.split(",") if name.strip()]
+
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": "Nieznana granulacja: użyj day, week, month lub quarter."}), 400
+    unknown = [name for name in series if name not in ANALYTICS_SERIES]
+    if unknown or not series:
+        return jsonify({"error": f"Nieznane serie: {', '.join(unknown) or 'brak'}."}), 400
+    if last_day < first_day:
+        return jsonify({"error": "Data końcowa jest wcześniejsza niż początkowa."}), 400
+    period_days = {"day": 1, "week": 7, "month": 28, "quarter": 90}[granularity]
+    if (last_day - first_day).days // period_days + 1 > ANALYTICS_MAX_BUCKETS:
+        return jsonify({"error": "Zbyt wiele przedziałów - zawęź zakres lub zwiększ granulację."}), 400
+
+    version, indexes = _analytics_indexes()
+    buckets = period_buckets(first_day, last_day, granularity)
+    columns: dict[str, list] = {}
+    for name in series:
+        values = [sum(index.total(name, start, end) for index in indexes) for _, start, end in buckets]
+        columns[name] = values if name == "count" else [value / 100 for value in values]
+
+    response = jsonify(
+        {
+            "from": first_day.isoformat(),
+            "to": last_day.isoformat(),
+            "granularity": granularity,
+            "labels": [label for label, _, _ in buckets],
+            "series": columns,
+        }
+    )
+    # Domyślny zakres kończy się dziś, więc ta sama wersja danych daje inną odpowiedź następnego dnia.
+    response.set_etag(f"analytics-{version}-{today:%Y%m%d}-{zlib.crc32(request.query_string):08x}")
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@bp.route("/api/service-revenue")
+def service_revenue_data():
+    today = date.today()
+    first_day = parse_any_date(request.args.get("from")) or date(today.year, 1, 1)
+    last_day = parse_any_date(request.args.get("to")) or today
+    limit = request.args.get("limit", type=int)
+    if last_day < first_day:
+        return jsonify({"error": "Data końcowa jest wcześniejsza niż początkowa."}), 400
+
+    version = data_version(DOCUMENTS_VERSION)
+    rows = service_revenue(db.session, first_day, last_day + timedelta(days=1), limit=limit)
+    response = jsonify(
+        {
+            "from": first_day.isoformat(),
+            "to": last_day.isoformat(),
+            "services": [
+                {
+                    "service": row["service"],
+                    "gross": float(row["gross"]),
+                    "net": float(row["net"]),
+                    "quantity": float(row["quantity"]),
+                    "documents": row["documents"],
+                }
+                for row in rows
+            ],
+        }
+    )
+    # Jak w /api/analytics: domyślne "to" to dzisiejsza data.
+    response.set_etag(f"services-{version}-{today:%Y%m%d}-{zlib.crc32(request.query_string):08x}")
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import closing
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from pathlib import Path
+from typing import List
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, send_file, url_for
+from werkzeug.datastructures import FileStorage
+
+from ..archive import archive_path, archived_years
+from ..cache import clear_app_caches
+from ..change_log import DEFAULT_CHANGES_LIMIT, changes_since, record_bulk_changes
+from ..config import UPLOAD_NDG, UPLOAD_ROOT
+from ..extensions import db
+from ..helpers import (
+    delete_upload_files,
+    parse_any_date,
+    parse_decimal,
+    read_csv_dicts,
+    row_get,
+    slugify,
+)
+from ..invoice_line import InvoiceLine, encode_lines
+from ..jobs import JobContext, JobOutcome, job_handler, preserved_jobs, submit_job
+from ..line_items import delete_invoice_items, write_invoice_items
+from ..models import Invoice, NDGAttachment, NDGDocument
+from ..numbering import rebuild_document_sequences, register_document_number
+from ..pdf_cache import clear_pdf_cache
+from ..rollups import advanced_data_versions, rebuild_monthly_totals
+from ..schema import initialize_database
+from ..search import rebuild_search_index
+from .jobs import job_accepted, job_rejected
+
+bp = Blueprint("data", __name__)
+
+# Nazwy plików wejściowych w katalogu zadania (instance/jobs/<id>/).
+IMPORT_CSV_FILE = "import.csv"
+IMPORT_ZIP_FILE = "attachments.zip"
+BACKUP_UPLOAD_FILE = "backup.db"
+# Nazwa pliku bazy w kopii ZIP (baza razem z plikami archiwów lat).
+BACKUP_DATABASE_NAME = "finance.db"
+
+
+@bp.route("/import")
+def import_data():
+    return render_template("import.html")
+
+
+@bp.route("/import/invoices", methods=["POST"])
+def import_invoices_csv():
+    file = request.files.get("csv_file")
+    if not file or file.filename == "":
+        return job_rejected("Wybierz plik CSV z danymi sprzedaży.", "data.import_data")
+    job = submit_job("import_invoices", {"file_name": file.filename}, {IMPORT_CSV_FILE: file})
+    return job_accepted(job, "data.import_data")
+
+
+def _job_csv_rows(job: JobContext) -> List[dict]:
+    with open(job.directory / IMPORT_CSV_FILE, "rb") as handle:
+        rows = read_csv_dicts(FileStorage(handle))
+    if not rows:
+        raise ValueError("Plik CSV nie zawiera danych.")
+    return rows
+
+
+@job_handler("import_invoices")
+def _run_invoice_import(job: JobContext, params: dict) -> JobOutcome:
+    rows = _job_csv_rows(job)
+    imported = 0
+    skipped = 0
+    skipped_entries: List[tuple[str | None, str]] = []
+    pending_items: List[tuple[Invoice, List[InvoiceLine]]] = []
+    closed_years = archived_years(db.session.connection())
+    for row in job.track(rows, len(rows)):
+        number = row_get(row, "Numer", "Number", "No")
+        if not number:
+            skipped += 1
+            skipped_entries.append((None, "Brak numeru dokumentu"))
+            continue
+
+        issue_date = parse_any_date(row_get(row, "Data", "Data dokumentu", "Issue Date")) or date.today()
+        if issue_date.year in closed_years:
+            skipped += 1
+            skipped_entries.append((number, f"Rok {issue_date.year} jest zarchiwizowany"))
+            continue
+        sale_date = parse_any_date(row_get(row, "Data sprzedaży", "Data Sprzedaży")) or issue_date
+        document_type_raw = (row_get(row, "Typ", "Type") or "faktura").strip().lower()
+        if document_type_raw in {"pa", "par", "paragon"}:
+            doc_type_clean = "paragon"
+        elif document_type_raw in {"fhan", "fh", "faktura"}:
+            doc_type_clean = "faktura"
+        elif "rach" in document_type_raw:
+            doc_type_clean = "rachunek"
+        else:
+            doc_type_clean = "faktura"
+
+        if Invoice.query.filter_by(number=number, document_type=doc_type_clean).first():
+            skipped += 1
+            skipped_entries.append((number, "Numer już istnieje w bazie"))
+            continue
+
+        client_name = (
+            row_get(row, "Kontrahent", "Klient", "Client")
+            or row_get(row, "Odbiorca", "Buyer")
+            or "Klient detaliczny"
+        )
+        payment_method = row_get(row, "Sposób płatności", "Platnosc", "Payment Method")
+        currency = (row_get(row, "Waluta", "Currency") or "PLN").upper()
+
+        gross_str = row_get(row, "Wartość brutto", "Wartosc brutto", "Brutto", "Kwota")
+        net_str = row_get(row, "Wartość", "Wartosc", "Netto")
+        try:
+            gross_amount = parse_decimal(gross_str or net_str or "0")
+        except InvalidOperation:
+            skipped += 1
+            skipped_entries.append((number, "Niepoprawna kwota brutto"))
+            continue
+        try:
+            net_amount = parse_decimal(net_str) if net_str else gross_amount
+        except InvalidOperation:
+            net_amount = gross_amount
+        tax_rate = Decimal("0")
+
+        notes = row_get(row, "Uwagi", "Notatki", "Notes") or None
+        status = row_get(row, "Status", "Stan")
+        service_description = (
+            row_get(row, "Usługa", "Usluga", "Opis", "Opis zdarzenia")
+            or notes
+            or f"Pozycja {number}"
+        )
+
+        internal_notes_parts: List[str] = []
+        if status:
+            internal_notes_parts.append(f"Status: {status}")
+        if currency and currency != "PLN":
+            internal_notes_parts.append(f"Waluta: {currency}")
+        internal_notes = "; ".join(internal_notes_parts) or None
+
+        items = [
+            InvoiceLine(
+                description=service_description,
+                quantity=Decimal("1"),
+                unit="usł.",
+                unit_price_net=net_amount,
+                unit_price_gross=gross_amount,
+                line_total_net=net_amount,
+                line_total_gross=gross_amount,
+            )
+        ]
+
+        try:
+            invoice = Invoice(
+                document_type=doc_type_clean,
+                number=number,
+                issue_date=issue_date,
+                sale_date=sale_date,
+                issue_place=row_get(row, "Miejsce wystawienia", "Miejsce"),
+                client_name=client_name,
+                client_address=None,
+                payment_method=payment_method or None,
+                amount_paid=None,
+                items_json=encode_lines(items),
+                net_amount=net_amount,
+                tax_rate=tax_rate,
+                gross_amount=gross_amount,
+                notes=notes,
+                internal_notes=internal_notes,
+            )
+            db.session.add(invoice)
+            register_document_number(db.session, doc_type_clean, issue_date, number)
+            pending_items.append((invoice, items))
+            imported += 1
+        except Exception as exc:
+            db.session.rollback()
+            pending_items.clear()
+            skipped += 1
+            skipped_entries.append((number, f"Błąd zapisu: {exc}"))
+            continue
+
+    db.session.flush()
+    write_invoice_items(db.session, [(invoice.id, items) for invoice, items in pending_items])
+    db.session.commit()
+    messages: List[str] = []
+    if imported:
+        messages.append(f"Zaimportowano {imported} dokumentów sprzedaży.")
+    if skipped_entries:
+        details = "; ".join(
+            f"{num or 'brak numeru'} ({reason})" for num, reason in skipped_entries[:10]
+        )
+        suffix = "… " if len(skipped_entries) > 10 else ""
+        messages.append(f"Pominięto {skipped} dokumentów: {suffix}{details}")
+    return JobOutcome(" ".join(messages))
+
+
+@bp.route("/import/ndg", methods=["POST"])
+def import_ndg_csv():
+    csv_file = request.files.get("csv_file")
+    if not csv_file or csv_file.filename == "":
+        return job_rejected("Wybierz plik CSV z dokumentami NDG.", "data.import_data")
+    uploads = {IMPORT_CSV_FILE: csv_file}
+    zip_file = request.files.get("attachments_zip")
+    if zip_file and zip_file.filename:
+        uploads[IMPORT_ZIP_FILE] = zip_file
+    job = submit_job("import_ndg", {"file_name": csv_file.filename}, uploads)
+    return job_accepted(job, "data.import_data")
+
+
+@job_handler("import_ndg")
+def _run_ndg_import(job: JobContext, params: dict) -> JobOutcome:
+    rows = _job_csv_rows(job)
+    attachments_map: dict[str, zipfile.ZipInfo] = {}
+    zip_stream = None
+    zip_path = job.directory / IMPORT_ZIP_FILE
+    if zip_path.exists():
+        try:
+            zip_stream = zipfile.ZipFile(zip_path)
+            for info in zip_stream.infolist():
+                if info.is_dir():
+                    continue
+                if not info.filename.lower().endswith(".pdf"):
+                    continue
+                key = slugify(Path(info.filename).stem)
+                attachments_map[key] = info
+        except zipfile.BadZipFile:
+            raise ValueError("Niepoprawny plik ZIP z załącznikami.")
+
+    imported = 0
+    skipped = 0
+    attached = 0
+    closed_years = archived_years(db.session.connection())
+    # Pliki zapisane przed przerwaniem importu (błąd, anulowanie) usuwamy -
+    # dokumenty, do których należą, nie trafią do bazy.
+    written_files: List[str] = []
+    try:
+        for row in job.track(rows, len(rows)):
+            number = row_get(row, "Numer", "Number", "No")
+            if not number:
+                skipped += 1
+                continue
+            existing = NDGDocument.query.filter_by(number=number).first()
+            if existing:
+                skipped += 1
+                continue
+
+            doc_date = parse_any_date(row_get(row, "Data", "Date")) or date.today()
+            if doc_date.year in closed_years:
+                skipped += 1
+                continue
+            supplier_name = (
+                row_get(row, "Kontrahent", "Dostawca", "Supplier")
+                or row_get(row, "Odbiorca", "Buyer")
+                or "Dostawca"
+            )
+            description = row_get(row, "Uwagi", "Opis zdarzenia", "Opis", "Usługa", "Usluga")
+            amount_str = row_get(row, "Wartość brutto", "Wartosc brutto", "Wartość", "Wartosc", "Kwota", "Brutto")
+            try:
+                amount = parse_decimal(amount_str or "0")
+            except InvalidOperation:
+                skipped += 1
+                continue
+            currency = (row_get(row, "Waluta", "Currency") or "PLN").upper()
+            status = row_get(row, "Status", "Stan")
+            internal_notes_parts: List[str] = []
+            if status:
+                internal_notes_parts.append(f"Status: {status}")
+            if currency != "PLN":
+                internal_notes_parts.append(f"Waluta: {currency}")
+
+            ndg_doc = NDGDocument(
+                number=number,
+                document_date=doc_date,
+                supplier_name=supplier_name,
+                description=description or None,
+                amount=amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+                file_reference=None,
+                internal_notes="; ".join(internal_notes_parts) or None,
+            )
+
+            slug = slugify(number)
+            if slug and slug in attachments_map and zip_stream is not None:
+                info = attachments_map[slug]
+                target = UPLOAD_NDG / f"{slug}.pdf"
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with zip_stream.open(info) as source, open(target, "wb") as handle:
+                    handle.write(source.read())
+                ndg_doc.file_reference = str(target.relative_to(UPLOAD_ROOT))
+                written_files.append(ndg_doc.file_reference)
+                attached += 1
+
+            db.session.add(ndg_doc)
+            imported += 1
+
+        db.session.commit()
+    except BaseException:
+        delete_upload_files(written_files)
+        raise
+    finally:
+        if zip_stream is not None:
+            zip_stream.close()
+    return JobOutcome(
+        f"Zaimportowano {imported} dokumentów NDG (załączono {attached} plików). Pomięto {skipped}."
+    )
+
+
+def _database_path() -> Path | None:
+    database = db.engine.url.database
+    if not database or database == ":memory:":
+        return None
+    return Path(database)
+
+
+@bp.route("/api/changes")
+def changes_api():
+    since = max(request.args.get("since", type=int) or 0, 0)
+    limit = request.args.get("limit", type=int) or DEFAULT_CHANGES_LIMIT
+    entries, has_more = changes_since(db.session, since, limit)
+    return jsonify(
+        {
+            "since": since,
+            "next_cursor": entries[-1].id if entries else since,
+            "has_more": has_more,
+            "changes": [
+                {
+                    "cursor": entry.id,
+                    "entity": entry.entity,
+                    "id": entry.entity_id,
+                    "operation": entry.operation,
+                    "changed_at": entry.changed_at.isoformat(),
+                }
+                for entry in entries
+            ],
+        }
+    )
+
+
+def _archive_files_of(database: Path) -> List[str]:
+    # Pliki archiwów lat, do których odwołuje się baza (tabela archived_years).
+    with closing(sqlite3.connect(database)) as connection:
+        try:
+            rows = connection.execute("SELECT file_name FROM archived_years").fetchall()
+        except sqlite3.OperationalError:
+            return []
+    return [file_name for (file_name,) in rows]
+
+
+@bp.route("/backup/export", methods=["GET"])
+def export_database():
+    db_path = _database_path()
+    if db_path is None or not db_path.exists():
+        flash("Plik bazy danych nie istnieje.", "error")
+        return redirect(url_for("data.import_data"))
+    archives = archived_years(db.session.connection())
+    if not archives:
+        filename = f"backup_{date.today():%Y%m%d}.db"
+        return send_file(db_path, as_attachment=True, download_name=filename)
+
+    # Zarchiwizowane lata leżą w osobnych plikach - kopia to ZIP z bazą
+    # i wszystkimi plikami archiwów, do których baza się odwołuje.
+    bundle = tempfile.TemporaryFile()
+    with zipfile.ZipFile(bundle, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.write(db_path, BACKUP_DATABASE_NAME)
+        for file_name in archives.values():
+            archive.write(archive_path(file_name), file_name)
+    bundle.seek(0)
+    return send_file(
+        bundle,
+        as_attachment=True,
+        download_name=f"backup_{date.today():%Y%m%d}.zip",
+        mimetype="application/zip",
+    )
+
+
+@bp.route("/backup/import", methods=["POST"])
+def import_database_backup():
+    uploaded = request.files.get("backup_file")
+    if not uploaded or uploaded.filename == "":
+        return job_rejected("Wybierz plik kopii bazy danych.", "data.import_data")
+    if _database_path() is None:
+        return job_rejected("Przywracanie kopii wymaga bazy zapisanej w pliku.", "data.import_data")
+    job = submit_job("restore_backup", {"file_name": uploaded.filename}, {BACKUP_UPLOAD_FILE: uploaded})
+    return job_accepted(job, "data.import_data")
+
+
+def _unpack_backup(job: JobContext) -> tuple[Path, List[Path]]:
+    # Kopia to plik bazy albo ZIP z bazą i archiwami lat (export_database).
+    # Zwraca bazę i pliki archiwów do skopiowania; kopii bez archiwów, do
+    # których odwołuje się archived_years, nie przywracamy.
+    upload = job.directory / BACKUP_UPLOAD_FILE
+    if not zipfile.is_zipfile(upload):
+        missing = _archive_files_of(upload)
+        if missing:
+            raise ValueError(
+                "Kopia odwołuje się do plików archiwum, których nie zawiera: "
+                f"{', '.join(missing)}. Przywróć kopię ZIP pobraną razem z archiwami."
+            )
+        return upload, []
+
+    with zipfile.ZipFile(upload) as bundle:
+        names = set(bundle.namelist())
+        if BACKUP_DATABASE_NAME not in names:
+            raise ValueError(f"Plik ZIP nie zawiera bazy {BACKUP_DATABASE_NAME}.")
+        database = job.directory / BACKUP_DATABASE_NAME
+        database.write_bytes(bundle.read(BACKUP_DATABASE_NAME))
+        archive_files = _archive_files_of(database)
+        missing = [file_name for file_name in archive_files if file_name not in names]
+        if missing:
+            raise ValueError(f"Plik ZIP nie zawiera archiwów: {', '.join(missing)}.")
+        extracted = []
+        for file_name in archive_files:
+            # Nazwy pochodzą z archived_years (archive_<rok>.db), nie ze ścieżek w ZIP-ie.
+            target = job.directory / Path(file_name).name
+            target.write_bytes(bundle.read(file_name))
+            extracted.append(target)
+    return database, extracted
+
+
+@job_handler("restore_backup", exclusive=True)
+def _run_backup_restore(job: JobContext, params: dict) -> JobOutcome:
+    db_path = _database_path()
+    job.progress(0, 2)
+    try:
+        database, archive_files = _unpack_backup(job)
+    except (zipfile.BadZipFile, sqlite3.DatabaseError) as exc:
+        raise ValueError(f"Nie udało się odczytać kopii: {exc}") from exc
+    # Po podmianie pliku bazy zadania nie da się już przerwać.
+    job.check_cancelled()
+    try:
+        with preserved_jobs(), advanced_data_versions():
+            db.session.remove()
+            db.engine.dispose()
+            shutil.copy2(database, db_path)
+            for source in archive_files:
+                shutil.copy2(source, archive_path(source.name))
+            initialize_database()
+        job.progress(1)
+        clear_app_caches()
+        clear_pdf_cache()
+        rebuild_monthly_totals(db.session.connection())
+        rebuild_search_index(db.session.connection())
+        db.session.commit()
+    except Exception as exc:
+        raise ValueError(f"Nie udało się przywrócić bazy: {exc}") from exc
+    job.progress(2)
+    return JobOutcome("Baza danych została przywrócona z kopii.")
+
+
+@bp.post("/documents/purge")
+def purge_documents():
+    scope = (request.form.get("scope") or "all").lower()
+    delete_sales = scope in {"sales", "sprzedaz", "sale", "all"}
+    delete_ndg = scope in {"ndg", "koszty", "all"}
+
+    deleted_sales = 0
+    deleted_ndg = 0
+    try:
+        if delete_sales:
+            delete_invoice_items(db.session)
+            record_bulk_changes(db.session.connection(), Invoice, "delete")
+            deleted_sales = db.session.query(Invoice).delete(synchronize_session=False)
+            rebuild_document_sequences(db.session.connection())
+        if delete_ndg:
+            refs = [
+                ref
+                for (ref,) in db.session.query(NDGDocument.file_reference).all()
+                if ref
+            ]
+            refs.extend(ref for (ref,) in db.session.query(NDGAttachment.file_reference).all())
+            delete_upload_files(refs)
+            record_bulk_changes(db.session.connection(), NDGAttachment, "delete")
+            db.session.query(NDGAttachment).delete(synchronize_session=False)
+            record_bulk_changes(db.session.connection(), NDGDocument, "delete")
+            deleted_ndg = db.session.query(NDGDocument).delete(synchronize_session=False)
+        rebuild_monthly_totals(db.session.connection())
+        rebuild_search_index(db.session.connection())
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        flash("Nie udało się usunąć dokumentów. Spróbuj ponownie.", "error")
+        return redirect(url_for("data.import_data"))
+    if delete_sales:
+        clear_pdf_cache()
+
+    messages: List[str] = []
+    if deleted_sales:
+        messages.append(f"sprzedaży ({deleted_sales})")
+    if deleted_ndg:
+        messages.append(f"kosztów NDG ({deleted_ndg})")
+    if not messages:
+        flash("Brak danych do usunięcia.", "info")
+    else:
+        flash("Usunięto " + " i ".join(messages) + ".", "success")
+    return redirect(url_for("data.import_data"))
@@ -0,0 +1,550 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from typing import List
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    flash,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    stream_with_context,
+    url_for,
+)
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+
+from ..archive import (
+    archived_years,
+    archives_for_export,
+    archives_for_filters,
+    archives_for_range,
+    ensure_year_open,
+    entity_columns,
+    find_archived,
+)
+from ..clients import CLIENT_SUGGESTIONS_LIMIT, client_suggestions
+from ..config import DEFAULT_ISSUE_PLACE
+from ..extensions import db
+from ..filters import (
+    filter_invoices,
+    invoice_totals,
+    list_filters_from_request,
+    register_filters,
+    register_filters_from_request,
+    register_period_error,
+)
+from ..helpers import (
+    extract_items_from_form,
+    month_bounds,
+    month_key_to_date,
+    parse_any_date,
+    parse_date,
+    parse_decimal,
+    prefill_from_request,
+)
+from ..invoice_line import encode_lines
+from ..jobs import JobContext, JobOutcome, job_handler, submit_job
+from ..line_items import delete_invoice_items, write_invoice_items
+from ..models import INVOICE_LIST_ORDER, Invoice, InvoiceItem, ServiceTemplate
+from ..numbering import allocate_document_number, peek_document_number, register_document_number
+from ..pagination import keyset_page, requested_page_size
+from ..pdf import number_to_words_pl, sales_register_pdf_bytes
+from ..pdf_bundle import invoice_pdf_bundle
+from ..pdf_cache import (
+    discard_cached_pdf,
+    invoice_pdf_file,
+    invoice_pdf_filename,
+    invoice_pdf_key,
+)
+from ..service_catalog import invalidate_service_catalog, service_catalog, service_catalog_version
+from .jobs import job_accepted, job_rejected
+
+bp = Blueprint("invoices", __name__)
+
+# Listy ładują tylko wyświetlane kolumny; items_json, notes i internal_notes
+# są dociągane wyłącznie w widoku szczegółów, edycji i PDF dokumentu.
+INVOICE_LIST_COLUMNS = (
+    Invoice.id,
+    Invoice.issue_date,
+    Invoice.number,
+    Invoice.document_type,
+    Invoice.client_name,
+    Invoice.gross_amount,
+)
+INVOICE_DOCUMENT_TYPES = ("faktura", "paragon", "rachunek")
+REGISTER_BATCH_SIZE = 500
+REGISTER_ORDER = (Invoice.issue_date, Invoice.number, Invoice.id)
+SALES_REGISTER_COLUMNS = (
+    Invoice.id,
+    Invoice.issue_date,
+    Invoice.number,
+    Invoice.client_name,
+    Invoice.net_amount,
+    Invoice.gross_amount,
+)
+
+
+@bp.route("/api/next-number")
+def next_number_api():
+    raw_date = request.args.get("issue_date")
+    doc_type = request.args.get("document_type", "faktura").lower()
+    issue_date = parse_any_date(raw_date) or date.today()
+    if doc_type not in {"faktura", "paragon"}:
+        doc_type = "faktura"
+    number = peek_document_number(db.session, doc_type, issue_date)
+    return jsonify({"number": number})
+
+
+@bp.route("/api/clients")
+def clients_api():
+    prefix = request.args.get("prefix", "")
+    limit = request.args.get("limit", type=int) or CLIENT_SUGGESTIONS_LIMIT
+    return jsonify({"clients": client_suggestions(prefix, limit)})
+
+
+@bp.route("/invoices")
+def invoices():
+    filters = list_filters_from_request()
+    entity, included_years = archives_for_filters(db.session, Invoice, filters)
+    query = filter_invoices(
+        db.session.query(entity).options(load_only(*entity_columns(entity, INVOICE_LIST_COLUMNS))),
+        filters,
+        entity,
+    )
+    page = keyset_page(query, entity_columns(entity, INVOICE_LIST_ORDER), requested_page_size())
+    return render_template(
+        "invoices.html",
+        invoices=page.items,
+        page=page,
+        filters=filters,
+        totals=invoice_totals(db.session, filters, entity),
+        document_types=INVOICE_DOCUMENT_TYPES,
+        archived_years=list(archived_years(db.session.connection())),
+        included_years=included_years,
+        export_url=url_for("invoices.export_invoices_pdf", **filters.register_args()),
+        bundle_month=(filters.date_from or date.today()).strftime("%Y-%m"),
+    )
+
+
+@bp.route("/invoices/new", methods=["GET", "POST"])
+def new_invoice():
+    prefill_items: List[dict] = []
+    if request.method == "POST":
+        try:
+            issue_date = parse_date(request.form.get("issue_date"))
+            sale_date_raw = request.form.get("sale_date") or request.form.get("issue_date")
+            sale_date = parse_date(sale_date_raw) if sale_date_raw else None
+            issue_place = request.form.get("issue_place", "").strip() or DEFAULT_ISSUE_PLACE
+            document_type = request.form.get("document_type", "paragon").lower()
+            if document_type not in {"faktura", "paragon"}:
+                document_type = "paragon"
+            number = request.form.get("number", "").strip()
+            client_name = request.form.get("client_name", "").strip()
+            client_tax_id = request.form.get("client_tax_id", "").strip()
+            client_address = request.form.get("client_address", "").strip()
+            tax_rate = parse_decimal(request.form.get("tax_rate", "0"))
+            notes = request.form.get("notes", "").strip() or None
+            internal_notes = request.form.get("internal_notes", "").strip() or None
+            payment_method = request.form.get("payment_method", "").strip() or "BLIK"
+            amount_paid_raw = request.form.get("amount_paid", "").replace(",", ".")
+            amount_paid = Decimal(amount_paid_raw) if amount_paid_raw else None
+            if amount_paid is not None:
+                amount_paid = amount_paid.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            # Niezmieniony podpowiedziany numer przydzielamy dopiero przy zapisie,
+            # bo w międzyczasie mógł go zająć inny dokument.
+            auto_number = not number or number == request.form.get("number_suggested", "").strip()
+            if not issue_date:
+                raise ValueError("Data wystawienia jest wymagana.")
+            ensure_year_open(db.session, issue_date)
+
+            items = extract_items_from_form(request, tax_rate)
+            if not items:
+                raise ValueError("Dodaj przynajmniej jedną pozycję.")
+
+            net_total = sum((item.line_total_net for item in items), Decimal("0"))
+            net_total = net_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            gross_total = sum((item.line_total_gross for item in items), Decimal("0"))
+            gross_total = gross_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            if amount_paid is None:
+                amount_paid = gross_total
+
+            if not client_name:
+                client_name = "Klient detaliczny"
+
+            if auto_number:
+                number = allocate_document_number(db.session, document_type, issue_date)
+            else:
+                register_document_number(db.session, document_type, issue_date, number)
+
+            invoice = Invoice(
+                document_type=document_type,
+                number=number,
+                issue_date=issue_date,
+                sale_date=sale_date,
+                issue_place=issue_place or DEFAULT_ISSUE_PLACE,
+                client_name=client_name,
+                client_tax_id=client_tax_id or None,
+                client_address=client_address or None,
+                payment_method=payment_method or "BLIK",
+                amount_paid=amount_paid,
+                items_json=encode_lines(items),
+                net_amount=net_total,
+                tax_rate=tax_rate,
+                gross_amount=gross_total,
+                notes=notes,
+                internal_notes=internal_notes,
+            )
+            db.session.add(invoice)
+            db.session.flush()
+            write_invoice_items(db.session, [(invoice.id, items)])
+            db.session.commit()
+            flash("Dokument został zapisany. Możesz od razu pobrać PDF.", "success")
+            return redirect(url_for("invoices.invoice_detail", invoice_id=invoice.id, saved=1))
+        except IntegrityError:
+            db.session.rollback()
+            flash(f"Dokument o numerze {number} już istnieje.", "error")
+            prefill_items = prefill_from_request(request)
+        except (ValueError, InvalidOperation) as exc:
+            flash(str(exc), "error")
+            prefill_items = prefill_from_request(request)
+
+    today_str = date.today().isoformat()
+    default_doc_type = "paragon"
+    default_number = peek_document_number(db.session, default_doc_type, date.today())
+    if request.method != "POST":
+        prefill_items = []
+    return render_template(
+        "invoice_form.html",
+        default_date=today_str,
+        default_number=default_number,
+        service_catalog_version=service_catalog_version(),
+        prefill_items=prefill_items,
+        invoice=None,
+        is_edit=False,
+        auto_number_enabled=True,
+        default_doc_type=default_doc_type,
+        default_issue_place=DEFAULT_ISSUE_PLACE,
+    )
+
+
+@bp.route("/invoices/<int:invoice_id>/edit", methods=["GET", "POST"])
+def edit_invoice(invoice_id: int):
+    invoice = Invoice.query.get_or_404(invoice_id)
+    prefill_items = [
+        {
+            "description": item.description,
+            "quantity": str(item.quantity),
+            "gross_price": str(item.unit_price_gross),
+            "service_template_id": item.service_template_id or "",
+        }
+        for item in invoice.items
+    ]
+
+    if request.method == "POST":
+        previous_pdf_key = invoice_pdf_key(invoice)
+        try:
+            issue_date = parse_date(request.form.get("issue_date"))
+            sale_date_raw = request.form.get("sale_date") or request.form.get("issue_date")
+            sale_date = parse_date(sale_date_raw) if sale_date_raw else None
+            issue_place = request.form.get("issue_place", "").strip() or DEFAULT_ISSUE_PLACE
+            document_type = request.form.get("document_type", invoice.document_type).lower()
+            if document_type not in {"faktura", "paragon"}:
+                document_type = invoice.document_type
+            number = request.form.get("number", "").strip() or invoice.number
+            client_name = request.form.get("client_name", "").strip()
+            client_tax_id = request.form.get("client_tax_id", "").strip()
+            client_address = request.form.get("client_address", "").strip()
+            tax_rate = parse_decimal(request.form.get("tax_rate", str(invoice.tax_rate or 0)))
+            notes = request.form.get("notes", "").strip() or None
+            internal_notes = request.form.get("internal_notes", "").strip() or None
+            payment_method = request.form.get("payment_method", "").strip() or invoice.payment_method or "BLIK"
+            amount_paid_raw = request.form.get("amount_paid", "").replace(",", ".")
+            amount_paid = Decimal(amount_paid_raw) if amount_paid_raw else None
+            if amount_paid is not None:
+                amount_paid = amount_paid.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            if not issue_date:
+                raise ValueError("Data wystawienia jest wymagana.")
+            ensure_year_open(db.session, issue_date)
+
+            items = extract_items_from_form(request, tax_rate)
+            if not items:
+                raise ValueError("Dodaj przynajmniej jedną pozycję.")
+
+            net_total = sum((item.line_total_net for item in items), Decimal("0"))
+            net_total = net_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            gross_total = sum((item.line_total_gross for item in items), Decimal("0"))
+            gross_total = gross_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+            if amount_paid is None:
+                amount_paid = gross_total
+
+            if not client_name:
+                client_name = "Klient detaliczny"
+
+            if not number:
+                number = allocate_document_number(db.session, document_type, issue_date)
+            elif number != invoice.number:
+                register_document_number(db.session, document_type, issue_date, number)
+
+            invoice.document_type = document_type
+            invoice.number = number
+            invoice.issue_date = issue_date
+            invoice.sale_date = sale_date
+            invoice.issue_place = issue_place or DEFAULT_ISSUE_PLACE
+            invoice.client_name = client_name
+            invoice.client_tax_id = client_tax_id or None
+            invoice.client_address = client_address or None
+            invoice.payment_method = payment_method
+            invoice.amount_paid = amount_paid
+            invoice.items_json = encode_lines(items)
+            invoice.net_amount = net_total
+            invoice.tax_rate = tax_rate
+            invoice.gross_amount = gross_total
+            invoice.notes = notes
+            invoice.internal_notes = internal_notes
+            # Zapytanie o pozycje robi autoflush - dopiero po wszystkich
+            # przypisaniach, żeby edycja dała jeden flush i jeden wpis w change_log.
+            write_invoice_items(db.session, [(invoice.id, items)])
+
+            db.session.commit()
+            discard_cached_pdf(previous_pdf_key)
+            flash("Dokument został zaktualizowany.", "success")
+            return redirect(url_for("invoices.invoice_detail", invoice_id=invoice.id))
+        except IntegrityError:
+            db.session.rollback()
+            flash(f"Dokument o numerze {number} już istnieje.", "error")
+            prefill_items = prefill_from_request(request)
+        except (ValueError, InvalidOperation) as exc:
+            flash(str(exc), "error")
+            prefill_items = prefill_from_request(request)
+
+    return render_template(
+        "invoice_form.html",
+        default_date=invoice.issue_date.strftime("%Y-%m-%d"),
+        default_number=invoice.number,
+        service_catalog_version=service_catalog_version(),
+        prefill_items=prefill_items,
+        invoice=invoice,
+        is_edit=True,
+        auto_number_enabled=False,
+        default_issue_place=DEFAULT_ISSUE_PLACE,
+    )
+
+
+@bp.post("/invoices/<int:invoice_id>/delete")
+def delete_invoice(invoice_id: int):
+    invoice = Invoice.query.get_or_404(invoice_id)
+    pdf_key = invoice_pdf_key(invoice)
+    delete_invoice_items(db.session, [invoice.id])
+    db.session.delete(invoice)
+    db.session.commit()
+    discard_cached_pdf(pdf_key)
+    flash("Dokument został usunięty.", "success")
+    return redirect(url_for("invoices.invoices"))
+
+
+@bp.route("/invoices/<int:invoice_id>")
+def invoice_detail(invoice_id: int):
+    invoice = _invoice_or_404(invoice_id)
+    tax_amount = invoice.gross_amount - invoice.net_amount
+    amount_paid = invoice.amount_paid or Decimal("0")
+    remaining_to_pay = max(invoice.gross_amount - amount_paid, Decimal("0"))
+    amount_in_words = number_to_words_pl(invoice.gross_amount)
+    show_saved_modal = request.args.get("saved") == "1"
+    document_title = _document_display_title(invoice)
+
+    return render_template(
+        "invoice_detail.html",
+        invoice=invoice,
+        items=invoice.items,
+        tax_amount=tax_amount,
+        amount_paid=amount_paid,
+        amount_remaining=remaining_to_pay,
+        amount_in_words=amount_in_words,
+        show_saved_modal=show_saved_modal,
+        document_display_title=document_title,
+    )
+
+
+@bp.route("/invoices/<int:invoice_id>/pdf")
+def invoice_pdf(invoice_id: int):
+    invoice = _invoice_or_404(invoice_id)
+    # Plik z pdf_cache (renderowany tylko przy pierwszym pobraniu danej wersji
+    # dokumentu); ETag to skrót treści, Last-Modified - czas zapisu pliku.
+    key = invoice_pdf_key(invoice)
+    response = send_file(
+        invoice_pdf_file(invoice, key),
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=invoice_pdf_filename(invoice),
+        etag=key,
+        conditional=True,
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _sales_register_query(filters):
+    entity = archives_for_export(db.session, Invoice, filters)
+    return filter_invoices(
+        db.session.query(entity).options(load_only(*entity_columns(entity, SALES_REGISTER_COLUMNS))),
+        filters,
+        entity,
+    ).order_by(*entity_columns(entity, REGISTER_ORDER))
+
+
+def _sales_register_filename(filters) -> str:
+    suffix = "".join(f"_{value}" for value in filters.register_args().values())
+    return f"ewidencja_sprzedazy{suffix}.pdf"
+
+
+@bp.route("/invoices/export/pdf")
+def export_invoices_pdf():
+    error = register_period_error(request.args)
+    if error:
+        flash(error, "error")
+        return redirect(url_for("invoices.invoices"))
+    filters = register_filters_from_request()
+    # yield_per: dokumenty są pobierane i zamieniane na obiekty partiami,
+    # a PDF zbiera tylko sumy - pamięć nie rośnie z liczbą dokumentów.
+    invoices = _sales_register_query(filters).yield_per(REGISTER_BATCH_SIZE)
+    pdf_bytes = sales_register_pdf_bytes(invoices, period=filters.period_label)
+
+    response = make_response(pdf_bytes)
+    response.headers["Content-Type"] = "application/pdf"
+    response.headers["Content-Disposition"] = f"attachment; filename={_sales_register_filename(filters)}"
+    return response
+
+
+@bp.post("/invoices/export/pdf")
+def queue_invoices_pdf_export():
+    # Ta sama ewidencja jako zadanie w tle (formularz na liście dokumentów).
+    error = register_period_error(request.args)
+    if error:
+        return job_rejected(error, "invoices.invoices")
+    filters = register_filters_from_request()
+    job = submit_job("sales_register", filters.register_args())
+    return job_accepted(job, "invoices.invoices")
+
+
+@job_handler("sales_register")
+def _run_sales_register(job: JobContext, params: dict) -> JobOutcome:
+    filters = register_filters(params)
+    query = _sales_register_query(filters)
+    total = query.order_by(None).count()
+    invoices = job.track(query.yield_per(REGISTER_BATCH_SIZE), total)
+    pdf_bytes = sales_register_pdf_bytes(invoices, period=filters.period_label)
+    return JobOutcome(
+        f"Ewidencja sprzedaży gotowa ({total} dokumentów).",
+        job.write_result(_sales_register_filename(filters), pdf_bytes),
+    )
+
+
+@bp.route("/invoices/export/bundle")
+def export_invoices_bundle():
+    try:
+        start = month_key_to_date(request.args.get("month", ""))
+    except ValueError:
+        flash("Podaj miesiąc w formacie RRRR-MM.", "error")
+        return redirect(url_for("invoices.invoices"))
+    _, end = month_bounds(start, 0)
+    entity, _ = archives_for_range(db.session, Invoice, start, end)
+    invoices = (
+        db.session.query(entity)
+        .filter(entity.issue_date >= start, entity.issue_date < end)
+        .order_by(*entity_columns(entity, REGISTER_ORDER))
+        .all()
+    )
+    response = Response(stream_with_context(invoice_pdf_bundle(invoices)), mimetype="application/zip")
+    response.headers["Content-Disposition"] = f"attachment; filename=dokumenty_{start:%Y-%m}.zip"
+    return response
+
+
+@bp.route("/api/service-templates")
+def service_templates_api():
+    catalog = service_catalog()
+    response = jsonify({"version": catalog.version, "templates": list(catalog.templates)})
+    response.set_etag(f"service-templates-{catalog.version}")
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@bp.route("/services", methods=["GET", "POST"])
+def service_templates_view():
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        description = request.form.get("description", "").strip()
+        price_raw = request.form.get("gross_price", "0").replace(",", ".")
+
+        if not name or not description:
+            flash("Nazwa i opis szablonu są wymagane.", "error")
+            return redirect(url_for("invoices.service_templates_view"))
+        try:
+            price = Decimal(price_raw)
+        except InvalidOperation:
+            flash("Niepoprawna kwota brutto.", "error")
+            return redirect(url_for("invoices.service_templates_view"))
+
+        template = ServiceTemplate(
+            name=name,
+            description=description,
+            gross_price=price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        )
+        db.session.add(template)
+        invalidate_service_catalog(db.session.connection())
+        db.session.commit()
+        flash("Dodano szablon usługi.", "success")
+        return redirect(url_for("invoices.service_templates_view"))
+
+    templates = ServiceTemplate.query.order_by(ServiceTemplate.name).all()
+    return render_template("service_templates.html", templates=templates)
+
+
+@bp.post("/services/<int:template_id>/delete")
+def delete_service_template(template_id: int):
+    template = ServiceTemplate.query.get_or_404(template_id)
+    db.session.execute(
+        update(InvoiceItem)
+        .where(InvoiceItem.service_template_id == template.id)
+        .values(service_template_id=None)
+    )
+    db.session.delete(template)
+    invalidate_service_catalog(db.session.connection())
+    db.session.commit()
+    flash("Szablon został usunięty.", "success")
+    return redirect(url_for("invoices.service_templates_view"))
+
+
+def _invoice_or_404(invoice_id: int) -> Invoice:
+    # Podgląd i PDF działają także dla dokumentów z zarchiwizowanych lat.
+    invoice = db.session.get(Invoice, invoice_id) or find_archived(db.session, Invoice, invoice_id)
+    if invoice is None:
+        abort(404)
+    return invoice
+
+
+def _document_display_title(invoice: Invoice) -> str:
+    doc_type = (invoice.document_type or "Dokument").strip()
+    number = (invoice.number or "").strip()
+    normalized_doc = doc_type.lower()
+    normalized_number = number.lower()
+
+    if number and normalized_number.startswith(normalized_doc):
+        return number
+    if doc_type and number:
+        return f"{doc_type.capitalize()} {number}"
+    return (doc_type or number or "Dokument").strip()
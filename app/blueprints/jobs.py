@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from flask import Blueprint, abort, flash, jsonify, redirect, request, send_file, url_for
+
+from ..extensions import db
+from ..jobs import ACTIVE_STATUSES, cancel_job, get_job, job_directory, job_progress
+from ..models import Job
+
+bp = Blueprint("jobs", __name__)
+
+
+def _wants_json() -> bool:
+    # Formularze wysyłane przez static/jobs.js proszą o JSON; bez JS
+    # przeglądarka dostaje przekierowanie z komunikatem.
+    return request.accept_mimetypes.best == "application/json"
+
+
+def job_status(job: Job) -> dict:
+    done, total = job_progress(job)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "message": job.message,
+        "progress": {"done": done, "total": total},
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": url_for("jobs.job_status_api", job_id=job.id),
+        "cancel_url": url_for("jobs.cancel_job_api", job_id=job.id) if job.status in ACTIVE_STATUSES else None,
+        "result_url": (
+            url_for("jobs.job_result", job_id=job.id) if job.status == "done" and job.result_name else None
+        ),
+    }
+
+
+def job_accepted(job: Job, endpoint: str):
+    status_url = url_for("jobs.job_status_api", job_id=job.id)
+    if _wants_json():
+        response = jsonify(job_status(job))
+        response.status_code = 202
+        response.headers["Location"] = status_url
+        return response
+    flash(f"Zadanie #{job.id} dodane do kolejki - stan: {status_url}", "success")
+    return redirect(url_for(endpoint))
+
+
+def job_rejected(message: str, endpoint: str):
+    if _wants_json():
+        return jsonify({"error": message}), 400
+    flash(message, "error")
+    return redirect(url_for(endpoint))
+
+
+def _job_or_404(job_id: int) -> Job:
+    job = get_job(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+@bp.route("/jobs/<int:job_id>")
+def job_status_api(job_id: int):
+    response = jsonify(job_status(_job_or_404(job_id)))
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@bp.route("/jobs/<int:job_id>/result")
+def job_result(job_id: int):
+    job = _job_or_404(job_id)
+    if job.status != "done" or not job.result_name:
+        abort(404)
+    path = job_directory(job.id) / job.result_name
+    if not path.exists():
+        abort(404)
+    return send_file(path, as_attachment=True, download_name=job.result_name)
+
+
+@bp.post("/jobs/<int:job_id>/cancel")
+def cancel_job_api(job_id: int):
+    job = _job_or_404(job_id)
+    if not cancel_job(job.id):
+        return jsonify({"error": "Zadanie już się zakończyło."}), 409
+    db.session.refresh(job)
+    return jsonify(job_status(job)), 202
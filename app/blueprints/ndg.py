@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from typing import List
+
+from flask import Blueprint, abort, flash, make_response, redirect, render_template, request, send_file, url_for
+from sqlalchemy.orm import load_only, selectinload
+
+from ..archive import (
+    archived_years,
+    archives_for_export,
+    archives_for_filters,
+    ensure_year_open,
+    entity_columns,
+)
+from ..config import NDG_MONTHLY_LIMIT
+from ..extensions import db
+from ..filters import (
+    filter_ndg_documents,
+    list_filters_from_request,
+    ndg_totals,
+    register_filters,
+    register_filters_from_request,
+    register_period_error,
+)
+from ..helpers import (
+    delete_upload_files,
+    month_key_to_date,
+    month_name_pl,
+    parse_date,
+    parse_decimal,
+    safe_upload_path,
+    save_ndg_attachment,
+)
+from ..jobs import JobContext, JobOutcome, job_handler, submit_job
+from ..models import NDG_LIST_ORDER, NDGAttachment, NDGDocument
+from ..pagination import keyset_page, requested_page_size
+from ..pdf import ndg_register_pdf_bytes
+from ..rollups import aggregate_ndg_documents
+from .jobs import job_accepted, job_rejected
+
+bp = Blueprint("ndg", __name__)
+
+REGISTER_BATCH_SIZE = 500
+NDG_REGISTER_COLUMNS = (
+    NDGDocument.id,
+    NDGDocument.document_date,
+    NDGDocument.number,
+    NDGDocument.supplier_name,
+    NDGDocument.amount,
+    NDGDocument.description,
+)
+NDG_REGISTER_ORDER = (NDGDocument.document_date, NDGDocument.number, NDGDocument.id)
+
+
+@bp.route("/ndg")
+def ndg_documents():
+    filters = list_filters_from_request()
+    entity, included_years = archives_for_filters(db.session, NDGDocument, filters)
+    query = filter_ndg_documents(
+        db.session.query(entity).options(selectinload(entity.attachments)), filters, entity
+    )
+    page = keyset_page(query, entity_columns(entity, NDG_LIST_ORDER), requested_page_size())
+    today = date.today()
+    ndg_labels_raw, ndg_series_raw = aggregate_ndg_documents(today, months_back=12)
+    monthly_usage = ndg_series_raw[-1]
+    ndg_chart_dates = [month_key_to_date(label) for label in ndg_labels_raw]
+    ndg_chart_labels = [
+        month_name_pl(dt.year, dt.month, capitalize=True) for dt in ndg_chart_dates
+    ]
+    ndg_chart_series = [float(val) for val in ndg_series_raw]
+
+    monthly_rows = []
+    for dt, total in zip(ndg_chart_dates, ndg_series_raw):
+        monthly_rows.append(
+            {
+                "label": month_name_pl(dt.year, dt.month, capitalize=True),
+                "amount": total,
+            }
+        )
+    ndg_total_window = sum(ndg_series_raw, Decimal("0"))
+
+    return render_template(
+        "ndg_documents.html",
+        documents=page.items,
+        page=page,
+        filters=filters,
+        totals=ndg_totals(db.session, filters, entity),
+        archived_years=list(archived_years(db.session.connection())),
+        included_years=included_years,
+        export_url=url_for("ndg.export_ndg_pdf", **filters.register_args()),
+        monthly_usage=monthly_usage,
+        ndg_total_window=ndg_total_window,
+        chart_labels=ndg_chart_labels,
+        chart_series=ndg_chart_series,
+        monthly_rows=monthly_rows,
+    )
+
+
+def _ndg_register_query(filters):
+    entity = archives_for_export(db.session, NDGDocument, filters)
+    return filter_ndg_documents(
+        db.session.query(entity).options(load_only(*entity_columns(entity, NDG_REGISTER_COLUMNS))),
+        filters,
+        entity,
+    ).order_by(*entity_columns(entity, NDG_REGISTER_ORDER))
+
+
+def _ndg_register_filename(filters) -> str:
+    suffix = "".join(f"_{value}" for value in filters.register_args().values())
+    return f"ndg_dokumenty{suffix}.pdf"
+
+
+@bp.route("/ndg/export/pdf")
+def export_ndg_pdf():
+    error = register_period_error(request.args)
+    if error:
+        flash(error, "error")
+        return redirect(url_for("ndg.ndg_documents"))
+    filters = register_filters_from_request()
+    documents = _ndg_register_query(filters).yield_per(REGISTER_BATCH_SIZE)
+    pdf_bytes = ndg_register_pdf_bytes(documents, period=filters.period_label)
+
+    response = make_response(pdf_bytes)
+    response.headers["Content-Type"] = "application/pdf"
+    response.headers["Content-Disposition"] = f"attachment; filename={_ndg_register_filename(filters)}"
+    return response
+
+
+@bp.post("/ndg/export/pdf")
+def queue_ndg_pdf_export():
+    error = register_period_error(request.args)
+    if error:
+        return job_rejected(error, "ndg.ndg_documents")
+    filters = register_filters_from_request()
+    job = submit_job("ndg_register", filters.register_args())
+    return job_accepted(job, "ndg.ndg_documents")
+
+
+@job_handler("ndg_register")
+def _run_ndg_register(job: JobContext, params: dict) -> JobOutcome:
+    filters = register_filters(params)
+    query = _ndg_register_query(filters)
+    total = query.order_by(None).count()
+    documents = job.track(query.yield_per(REGISTER_BATCH_SIZE), total)
+    pdf_bytes = ndg_register_pdf_bytes(documents, period=filters.period_label)
+    return JobOutcome(
+        f"Lista dokumentów NDG gotowa ({total} dokumentów).",
+        job.write_result(_ndg_register_filename(filters), pdf_bytes),
+    )
+
+
+@bp.route("/uploads/<path:filename>")
+def serve_upload(filename: str):
+    try:
+        full_path, relative = safe_upload_path(filename)
+    except FileNotFoundError:
+        abort(404)
+    if not full_path.exists():
+        try:
+            alt = filename.split("/", 1)[1]
+            full_path, relative = safe_upload_path(alt)
+        except (IndexError, FileNotFoundError):
+            abort(404)
+        if not full_path.exists():
+            abort(404)
+    return send_file(full_path)
+
+
+@bp.route("/ndg/new", methods=["GET", "POST"])
+def new_ndg_document():
+    if request.method == "POST":
+        try:
+            doc_date = parse_date(request.form.get("document_date"))
+            number = request.form.get("number", "").strip()
+            supplier_name = request.form.get("supplier_name", "").strip()
+            description = request.form.get("description", "").strip()
+            amount = parse_decimal(request.form.get("amount", "0"))
+            file_reference = request.form.get("file_reference", "").strip()
+            internal_notes = request.form.get("internal_notes", "").strip() or None
+            uploads = [
+                file
+                for file in request.files.getlist("attachments")
+                if file and file.filename
+            ]
+
+            if not (doc_date and number and supplier_name):
+                raise ValueError("Numer, data i dostawca są wymagane.")
+            ensure_year_open(db.session, doc_date)
+            if amount <= 0:
+                raise ValueError("Kwota musi być większa od zera.")
+
+            document = NDGDocument(
+                number=number,
+                document_date=doc_date,
+                supplier_name=supplier_name,
+                description=description or None,
+                amount=amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+                file_reference=file_reference or None,
+                internal_notes=internal_notes,
+            )
+            for upload in uploads:
+                ref = save_ndg_attachment(upload, number)
+                document.attachments.append(NDGAttachment(file_reference=ref))
+            db.session.add(document)
+            db.session.commit()
+            flash("Dokument NDG został zapisany.", "success")
+            return redirect(url_for("ndg.ndg_documents"))
+        except (ValueError, InvalidOperation) as exc:
+            flash(str(exc), "error")
+
+    default_date = date.today().isoformat()
+    return render_template(
+        "ndg_form.html",
+        default_date=default_date,
+        ndg_limit=NDG_MONTHLY_LIMIT,
+        document=None,
+        is_edit=False,
+    )
+
+
+@bp.route("/ndg/<int:document_id>/edit", methods=["GET", "POST"])
+def edit_ndg_document(document_id: int):
+    document = NDGDocument.query.get_or_404(document_id)
+    if request.method == "POST":
+        try:
+            doc_date = parse_date(request.form.get("document_date"))
+            number = request.form.get("number", "").strip()
+            supplier_name = request.form.get("supplier_name", "").strip()
+            description = request.form.get("description", "").strip()
+            amount = parse_decimal(request.form.get("amount", "0"))
+            file_reference = request.form.get("file_reference", "").strip()
+            internal_notes = request.form.get("internal_notes", "").strip() or None
+            uploads = [
+                file
+                for file in request.files.getlist("attachments")
+                if file and file.filename
+            ]
+            remove_ids = set(request.form.getlist("remove_attachment_ids"))
+
+            if not (doc_date and number and supplier_name):
+                raise ValueError("Numer, data i dostawca są wymagane.")
+            ensure_year_open(db.session, doc_date)
+            if amount <= 0:
+                raise ValueError("Kwota musi być większa od zera.")
+
+            if remove_ids:
+                for attachment in list(document.attachments):
+                    if str(attachment.id) in remove_ids:
+                        delete_upload_files([attachment.file_reference])
+                        db.session.delete(attachment)
+            for upload in uploads:
+                ref = save_ndg_attachment(upload, number)
+                document.attachments.append(NDGAttachment(file_reference=ref))
+
+            document.number = number
+            document.document_date = doc_date
+            document.supplier_name = supplier_name
+            document.description = description or None
+            document.amount = amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            document.file_reference = file_reference or None
+            document.internal_notes = internal_notes
+
+            db.session.commit()
+            flash("Dokument NDG został zaktualizowany.", "success")
+            return redirect(url_for("ndg.ndg_documents"))
+        except (ValueError, InvalidOperation) as exc:
+            flash(str(exc), "error")
+
+    return render_template(
+        "ndg_form.html",
+        default_date=document.document_date.strftime("%Y-%m-%d"),
+        ndg_limit=NDG_MONTHLY_LIMIT,
+        document=document,
+        is_edit=True,
+    )
+
+
+@bp.post("/ndg/<int:document_id>/delete")
+def delete_ndg_document(document_id: int):
+    document = NDGDocument.query.get_or_404(document_id)
+    delete_refs: List[str] = []
+    if document.file_reference:
+        delete_refs.append(document.file_reference)
+    delete_refs.extend([att.file_reference for att in document.attachments])
+    delete_upload_files(delete_refs)
+
+    db.session.delete(document)
+    db.session.commit()
+    flash("Dokument NDG został usunięty.", "success")
+    return redirect(url_for("ndg.ndg_documents"))
+
+
+@bp.post("/ndg/attachments/<int:attachment_id>/delete")
+def delete_ndg_attachment(attachment_id: int):
+    attachment = NDGAttachment.query.get_or_404(attachment_id)
+    document_id = attachment.document_id
+    delete_upload_files([attachment.file_reference])
+    db.session.delete(attachment)
+    db.session.commit()
+    flash("Załącznik został usunięty.", "success")
+    return redirect(url_for("ndg.edit_ndg_document", document_id=document_id))
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, render_template, request, url_for
+
+from ..archive import archive_schema, archived_years, with_archives
+from ..extensions import db
+from ..models import Invoice, NDGDocument
+from ..pagination import requested_page_size
+from ..search import SearchHit, search_documents
+
+bp = Blueprint("search", __name__)
+
+
+def _include_archive() -> bool:
+    return request.args.get("archiwum") == "1"
+
+
+def _run_search():
+    query = (request.args.get("q") or "").strip()
+    page = request.args.get("page", type=int) or 1
+    # Zarchiwizowane lata przeszukujemy tylko na życzenie (?archiwum=1).
+    years = list(archived_years(db.session.connection())) if _include_archive() else []
+    return search_documents(
+        db.session,
+        query,
+        page=page,
+        per_page=requested_page_size(),
+        schemas=["main", *(archive_schema(year) for year in years)],
+        entities={
+            "invoice": with_archives(db.session, Invoice, years),
+            "ndg": with_archives(db.session, NDGDocument, years),
+        },
+    )
+
+
+def _hit_payload(hit: SearchHit) -> dict:
+    document = hit.document
+    if hit.kind == "invoice":
+        return {
+            "kind": hit.kind,
+            "id": document.id,
+            "number": document.number,
+            "document_type": document.document_type,
+            "date": document.issue_date.isoformat(),
+            "party": document.client_name,
+            "amount": float(document.gross_amount),
+            "url": url_for("invoices.invoice_detail", invoice_id=document.id),
+        }
+    return {
+        "kind": hit.kind,
+        "id": document.id,
+        "number": document.number,
+        "document_type": "ndg",
+        "date": document.document_date.isoformat(),
+        "party": document.supplier_name,
+        "amount": float(document.amount),
+        "url": _ndg_url(document),
+    }
+
+
+def _ndg_url(document) -> str:
+    # Dokumenty z archiwum są tylko do odczytu - prowadzimy do listy z tego dnia.
+    day = document.document_date
+    if day.year in archived_years(db.session.connection()):
+        return url_for("ndg.ndg_documents", od=day.isoformat(), do=day.isoformat())
+    return url_for("ndg.edit_ndg_document", document_id=document.id)
+
+
+@bp.route("/search")
+def search():
+    results = _run_search()
+    return render_template(
+        "search.html",
+        results=results,
+        hits=[_hit_payload(hit) for hit in results.hits],
+        include_archive=_include_archive(),
+        has_archive=bool(archived_years(db.session.connection())),
+    )
+
+
+@bp.route("/api/search")
+def search_api():
+    results = _run_search()
+    return jsonify(
+        {
+            "query": results.query,
+            "page": results.page,
+            "per_page": results.per_page,
+            "total": results.total,
+            "results": [_hit_payload(hit) for hit in results.hits],
+        }
+    )
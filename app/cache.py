@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Hashable, TypeVar
+
+from flask import current_app
+
+T = TypeVar("T")
+
+
+class VersionedCache:
+    # Domyślnie trzyma wynik tylko dla ostatniego klucza (np. miesiąc + wersja
+    # danych): nowy klucz wypiera poprzednie wpisy, więc pamięć nie rośnie
+    # z czasem. Z max_entries > 1 wypierany jest najdawniej używany wpis.
+    def __init__(self, max_entries: int = 1) -> None:
+        self._entries: Dict[Hashable, object] = {}
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._entries:
+                value = self._entries.pop(key)
+                self._entries[key] = value
+                return value
+        value = build()
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self._max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = value
+        return value
+
+
+def app_cache(name: str, max_entries: int = 1) -> VersionedCache:
+    # Bufory są przypięte do instancji aplikacji, żeby kilka aplikacji
+    # z create_app() (np. z różnymi bazami) nie dzieliło wyników.
+    caches = current_app.extensions.setdefault("versioned_caches", {})
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches.setdefault(name, VersionedCache(max_entries))
+    return cache
+
+
+def clear_app_caches() -> None:
+    # Po podmianie pliku bazy (przywrócenie kopii) bufory opróżniamy niezależnie
+    # od kluczy; same wersje przesuwa do przodu rollups.advanced_data_versions.
+    current_app.extensions.pop("versioned_caches", None)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from sqlalchemy import event, insert, literal, select
+
+from .extensions import db
+from .models import ChangeLogEntry, Invoice, NDGAttachment, NDGDocument
+
+# Dziennik zmian do synchronizacji przyrostowej: każdy zapis dokumentu
+# dopisuje wiersz (encja, id, operacja) w tej samej transakcji. Wpisów nie
+# modyfikujemy ani nie usuwamy - odbiorca pamięta ostatni przeczytany id.
+CHANGE_ENTITIES = {
+    Invoice: "invoice",
+    NDGDocument: "ndg",
+    NDGAttachment: "ndg_attachment",
+}
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _entries(objects, operation: str, changed_at: datetime) -> List[dict]:
+    return [
+        {
+            "entity": CHANGE_ENTITIES[type(obj)],
+            "entity_id": obj.id,
+            "operation": operation,
+            "changed_at": changed_at,
+        }
+        for obj in objects
+        if type(obj) in CHANGE_ENTITIES
+    ]
+
+
+@event.listens_for(db.session, "after_flush")
+def _record_changes(session, flush_context) -> None:
+    changed_at = _now()
+    rows = [
+        *_entries(session.new, "create", changed_at),
+        *_entries(
+            (obj for obj in session.dirty if session.is_modified(obj, include_collections=False)),
+            "update",
+            changed_at,
+        ),
+        *_entries(session.deleted, "delete", changed_at),
+    ]
+    if rows:
+        session.connection().execute(insert(ChangeLogEntry), rows)
+
+
+def record_bulk_changes(connection, model, operation: str, where=None) -> None:
+    # Dla operacji masowych (Query.delete), które omijają zdarzenia sesji.
+    source = select(
+        literal(CHANGE_ENTITIES[model]),
+        model.id,
+        literal(operation),
+        literal(_now()),
+    ).order_by(model.id)
+    if where is not None:
+        source = source.where(where)
+    connection.execute(
+        insert(ChangeLogEntry).from_select(
+            ["entity", "entity_id", "operation", "changed_at"], source
+        )
+    )
+
+
+def backfill_change_log(connection) -> None:
+    # Istniejące dokumenty trafiają do dziennika jako "create", żeby odbiorca
+    # startujący od since=0 dostał pełny stan.
+    for model in CHANGE_ENTITIES:
+        record_bulk_changes(connection, model, "create")
+
+
+def changes_since(
+    session, since: int, limit: int = DEFAULT_CHANGES_LIMIT
+) -> Tuple[List[ChangeLogEntry], bool]:
+    limit = max(1, min(limit, MAX_CHANGES_LIMIT))
+    entries = (
+        session.query(ChangeLogEntry)
+        .filter(ChangeLogEntry.id > since)
+        .order_by(ChangeLogEntry.id)
+        .limit(limit + 1)
+        .all()
+    )
+    return entries[:limit], len(entries) > limit
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import List, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, tuple_
+
+from .archive import archive_file_name, archive_year
+from .extensions import db
+from .filters import ListFilters, filter_invoices, filter_ndg_documents
+from .helpers import month_bounds
+from .models import (
+    INVOICE_LIST_ORDER,
+    NDG_LIST_ORDER,
+    Client,
+    DocumentSequence,
+    Invoice,
+    InvoiceItem,
+    MonthlyTotal,
+    NDGAttachment,
+    NDGDocument,
+)
+from .rollups import rebuild_monthly_totals, rollup_source_selects
+from .search import rebuild_search_index
+from .schema import LATEST_SCHEMA_VERSION, ensure_database, upgrade_database
+
+
+@click.command("db-upgrade")
+@with_appcontext
+def db_upgrade_command() -> None:
+    applied = upgrade_database()
+    for step in applied:
+        click.echo(f"Zastosowano: {step}")
+    click.echo(f"Schemat bazy w wersji {LATEST_SCHEMA_VERSION}.")
+
+
+@click.command("rebuild-rollups")
+@with_appcontext
+def rebuild_rollups_command() -> None:
+    ensure_database()
+    rebuild_monthly_totals(db.session.connection())
+    db.session.commit()
+    click.echo("Przeliczono zestawienie monthly_totals.")
+
+
+@click.command("reindex-search")
+@with_appcontext
+def reindex_search_command() -> None:
+    ensure_database()
+    indexed = rebuild_search_index(db.session.connection())
+    db.session.commit()
+    click.echo(f"Zaindeksowano dokumentów: {indexed}.")
+
+
+@click.command("archive-year")
+@click.argument("year", type=int)
+@with_appcontext
+def archive_year_command(year: int) -> None:
+    # Rok poprzedni może jeszcze dostać korekty, archiwizujemy starsze lata.
+    if year >= date.today().year - 1:
+        raise click.ClickException(
+            f"Archiwizować można tylko lata zamknięte (najpóźniej {date.today().year - 2})."
+        )
+    ensure_database()
+    try:
+        invoice_count, ndg_count = archive_year(db.session.connection(), year)
+    except ValueError as exc:
+        db.session.rollback()
+        raise click.ClickException(str(exc)) from exc
+    db.session.commit()
+    click.echo(
+        f"Przeniesiono rok {year} do {archive_file_name(year)}: "
+        f"dokumentów sprzedaży {invoice_count}, dokumentów NDG {ndg_count}."
+    )
+
+
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans_command() -> None:
+    ensure_database()
+    failures: List[str] = []
+    for name, details, scanned in query_plan_report():
+        if scanned:
+            failures.append(name)
+        click.echo(f"{'SCAN' if scanned else 'OK':<5} {name}: {' | '.join(details)}")
+    if failures:
+        raise click.ClickException(
+            "Pełny skan tabeli w zapytaniach: " + ", ".join(failures)
+        )
+
+
+def query_plan_report() -> List[Tuple[str, List[str], List[str]]]:
+    # (nazwa, plan, kroki planu będące pełnym skanem tabeli) dla gorących zapytań.
+    report = []
+    for name, statement in _hot_query_statements():
+        details = _explain_query_plan(statement)
+        report.append((name, details, [detail for detail in details if _FULL_SCAN_PATTERN.match(detail)]))
+    return report
+
+
+# "SCAN invoices" (lub "SCAN TABLE invoices" w starszym SQLite) bez "USING INDEX".
+_FULL_SCAN_PATTERN = re.compile(r"^SCAN (TABLE )?\w+$")
+
+
+def _hot_query_statements() -> List[Tuple[str, object]]:
+    start, end = month_bounds(date.today(), 0)
+    return [
+        (
+            "sprzedaż w zakresie dat",
+            select(func.sum(Invoice.gross_amount))
+            .where(Invoice.issue_date >= start)
+            .where(Invoice.issue_date < end),
+        ),
+        (
+            "numeracja dokumentów",
+            select(DocumentSequence.last_value).filter_by(
+                document_type="paragon", year=start.year, month=start.month
+            ),
+        ),
+        (
+            "sumy filtrowanej listy sprzedaży",
+            filter_invoices(
+                select(func.count(Invoice.id), func.sum(Invoice.gross_amount)),
+                ListFilters(date_from=start, date_to=end, document_type="paragon"),
+            ),
+        ),
+        (
+            "sumy filtrowanej listy NDG",
+            filter_ndg_documents(
+                select(func.count(NDGDocument.id), func.sum(NDGDocument.amount)),
+                ListFilters(date_from=start, date_to=end, party="dostawca"),
+            ),
+        ),
+        (
+            "import sprzedaży (numer + typ)",
+            select(Invoice.id)
+            .where(Invoice.number == "1/1/2024")
+            .where(Invoice.document_type == "faktura"),
+        ),
+        (
+            "koszty NDG w zakresie dat",
+            select(func.sum(NDGDocument.amount))
+            .where(NDGDocument.document_date >= start)
+            .where(NDGDocument.document_date < end),
+        ),
+        ("import NDG (numer)", select(NDGDocument.id).where(NDGDocument.number == "NDG/1")),
+        (
+            "przychód na usługę (kwartał)",
+            select(InvoiceItem.description, func.sum(InvoiceItem.line_total_gross))
+            .join(Invoice, Invoice.id == InvoiceItem.invoice_id)
+            .where(Invoice.issue_date >= start)
+            .where(Invoice.issue_date < end)
+            .group_by(InvoiceItem.description),
+        ),
+        (
+            "lista sprzedaży (kolejna strona)",
+            select(Invoice.id)
+            .where(tuple_(*INVOICE_LIST_ORDER) < tuple_(start, "1/1/2024", 1))
+            .order_by(*[column.desc() for column in INVOICE_LIST_ORDER])
+            .limit(50),
+        ),
+        (
+            "lista NDG (kolejna strona)",
+            select(NDGDocument.id)
+            .where(tuple_(*NDG_LIST_ORDER) < tuple_(start, "NDG/1", 1))
+            .order_by(*[column.desc() for column in NDG_LIST_ORDER])
+            .limit(50),
+        ),
+        (
+            "podpowiedzi kontrahentów",
+            select(Client.name)
+            .where(Client.search_name >= "kow")
+            .where(Client.search_name < "kox")
+            .order_by(Client.search_name)
+            .limit(10),
+        ),
+        (
+            "załączniki dokumentu NDG",
+            select(NDGAttachment.id).where(NDGAttachment.document_id == 1),
+        ),
+        *(
+            (f"przeliczenie monthly_totals ({idx})", source)
+            for idx, source in enumerate(rollup_source_selects(start, end), 1)
+        ),
+        (
+            "odczyt monthly_totals",
+            select(MonthlyTotal.gross_amount)
+            .where(MonthlyTotal.year >= start.year)
+            .where(MonthlyTotal.year <= end.year),
+        ),
+    ]
+
+
+def _explain_query_plan(statement) -> List[str]:
+    compiled = statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+        return [row[-1] for row in rows]
+
+
+def init_app(app) -> None:
+    for command in (
+        db_upgrade_command,
+        rebuild_rollups_command,
+        reindex_search_command,
+        archive_year_command,
+        check_query_plans_command,
+    ):
+        app.cli.add_command(command)
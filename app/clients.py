@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import case, event, func, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .cache import app_cache
+from .extensions import db
+from .models import Client, Invoice
+from .rollups import DOCUMENTS_VERSION, data_version
+from .search import search_text
+
+# Katalog kontrahentów budowany z dokumentów sprzedaży: jeden wiersz na NIP
+# (a bez NIP-u na znormalizowaną nazwę), z danymi z najnowszego dokumentu.
+# Podpowiedzi to zapytanie zakresowe po indeksie (search_name >= "kow" AND
+# search_name < "kox"), więc koszt nie zależy od liczby kontrahentów.
+RETAIL_CLIENT_NAME = "Klient detaliczny"
+CLIENT_SUGGESTIONS_LIMIT = 10
+MAX_CLIENT_SUGGESTIONS = 25
+CLIENT_CACHE_ENTRIES = 256
+BACKFILL_BATCH_SIZE = 500
+
+
+def tax_digits(tax_id: str | None) -> str | None:
+    digits = re.sub(r"\D", "", tax_id or "")
+    return digits or None
+
+
+def client_key(name: str, tax_id: str | None) -> str:
+    digits = tax_digits(tax_id)
+    if digits:
+        return f"nip:{digits}"
+    return f"nazwa:{search_text(name)}"
+
+
+def _client_row(name, tax_id, address, used_on: date | None) -> dict | None:
+    name = (name or "").strip()
+    tax_id = (tax_id or "").strip() or None
+    if not name or (name == RETAIL_CLIENT_NAME and not tax_id) or not search_text(name):
+        return None
+    return {
+        "key": client_key(name, tax_id),
+        "name": name,
+        "tax_id": tax_id,
+        "address": (address or "").strip() or None,
+        "search_name": search_text(name),
+        "tax_digits": tax_digits(tax_id),
+        "last_used": used_on,
+    }
+
+
+def upsert_clients(executor, rows: List[dict]) -> None:
+    # Dane kontrahenta nadpisuje tylko dokument nie starszy niż ostatnio użyty.
+    if not rows:
+        return
+    statement = sqlite_insert(Client)
+    excluded = statement.excluded
+    newer = or_(Client.last_used.is_(None), excluded.last_used >= Client.last_used)
+
+    def latest(column, fallback=None):
+        value = excluded[column.key] if fallback is None else func.coalesce(excluded[column.key], fallback)
+        return case((newer, value), else_=column)
+
+    executor.execute(
+        statement.on_conflict_do_update(
+            index_elements=[Client.key],
+            set_={
+                "name": latest(Client.name),
+                "tax_id": latest(Client.tax_id, Client.tax_id),
+                "address": latest(Client.address, Client.address),
+                "search_name": latest(Client.search_name),
+                "tax_digits": latest(Client.tax_digits, Client.tax_digits),
+                "last_used": func.max(func.coalesce(Client.last_used, excluded.last_used), excluded.last_used),
+            },
+        ),
+        rows,
+    )
+
+
+@event.listens_for(db.session, "after_flush")
+def _remember_clients(session, flush_context) -> None:
+    rows = [
+        _client_row(obj.client_name, obj.client_tax_id, obj.client_address, obj.issue_date)
+        for obj in [*session.new, *session.dirty]
+        if isinstance(obj, Invoice)
+    ]
+    upsert_clients(session.connection(), [row for row in rows if row])
+
+
+def backfill_clients(connection) -> None:
+    last_id = 0
+    while True:
+        batch = connection.execute(
+            select(
+                Invoice.id,
+                Invoice.client_name,
+                Invoice.client_tax_id,
+                Invoice.client_address,
+                Invoice.issue_date,
+            )
+            .where(Invoice.id > last_id)
+            .order_by(Invoice.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not batch:
+            return
+        rows = [_client_row(*row[1:]) for row in batch]
+        upsert_clients(connection, [row for row in rows if row])
+        last_id = batch[-1].id
+
+
+def _prefix_range(column, prefix: str):
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return column >= prefix, column < upper
+
+
+def _find_clients(prefix: str, by_tax_id: bool, limit: int) -> List[dict]:
+    column = Client.tax_digits if by_tax_id else Client.search_name
+    rows = (
+        db.session.query(Client.name, Client.tax_id, Client.address)
+        .filter(*_prefix_range(column, prefix))
+        .order_by(column)
+        .limit(limit)
+        .all()
+    )
+    return [{"name": name, "tax_id": tax_id, "address": address} for name, tax_id, address in rows]
+
+
+def client_suggestions(prefix: str, limit: int = CLIENT_SUGGESTIONS_LIMIT) -> List[dict]:
+    # Wpisany NIP (same cyfry, ewentualnie z "PL" i kreskami) szukamy po cyfrach.
+    raw = (prefix or "").strip()
+    by_tax_id = bool(re.fullmatch(r"(PL)?[\d\s-]+", raw, re.IGNORECASE))
+    normalized = tax_digits(raw) if by_tax_id else search_text(raw)
+    if not normalized:
+        return []
+    limit = max(1, min(limit, MAX_CLIENT_SUGGESTIONS))
+    version = data_version(DOCUMENTS_VERSION)
+    return app_cache("clients", CLIENT_CACHE_ENTRIES).get_or_build(
+        (version, by_tax_id, normalized, limit),
+        lambda: _find_clients(normalized, by_tax_id, limit),
+    )
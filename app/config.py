@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
 from typing import Dict
 
@@ -27,3 +28,13 @@ DEFAULT_ISSUE_PLACE = "Stare Kurowo"
 UPLOAD_ROOT = Path(__file__).resolve().parent / "uploads"
 UPLOAD_INVOICES = UPLOAD_ROOT / "invoices"
 UPLOAD_NDG = UPLOAD_ROOT / "ndg"
+
+# Stała limitu NDG - w razie zmiany można zaczytać z konfiguracji/ENV.
+NDG_MONTHLY_LIMIT = Decimal("3499.50")
+
+PDF_FONT_CANDIDATES = [
+    Path(__file__).resolve().parent / "static" / "fonts" / "DejaVuSans.ttf",
+    Path("C:/Windows/Fonts/arial.ttf"),
+    Path("C:/Windows/Fonts/arialuni.ttf"),
+    Path("C:/Windows/Fonts/segoeui.ttf"),
+]
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Mapping
+
+from flask import request
+from sqlalchemy import func
+
+from .helpers import parse_any_date, parse_decimal
+from .models import Invoice, NDGDocument
+from .money import ZERO
+
+# Filtry list dokumentów z parametrów zapytania (?od=&do=&typ=&kontrahent=
+# &kwota_od=&kwota_do=&platnosc=). Zakres dat trafia w indeksy po dacie
+# (i typie dokumentu), pozostałe warunki zawężają już wybrany zakres.
+FILTER_ARGS = ("od", "do", "typ", "kontrahent", "kwota_od", "kwota_do", "platnosc")
+
+
+@dataclass(frozen=True)
+class ListFilters:
+    date_from: date | None = None
+    date_to: date | None = None
+    document_type: str | None = None
+    party: str | None = None
+    amount_min: Decimal | None = None
+    amount_max: Decimal | None = None
+    payment_method: str | None = None
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.__dataclass_fields__)
+
+    def query_args(self) -> Dict[str, str]:
+        # Parametry do linków stronicowania - tylko te, które dały się odczytać.
+        values = {
+            "od": self.date_from.isoformat() if self.date_from else None,
+            "do": self.date_to.isoformat() if self.date_to else None,
+            "typ": self.document_type,
+            "kontrahent": self.party,
+            "kwota_od": str(self.amount_min) if self.amount_min is not None else None,
+            "kwota_do": str(self.amount_max) if self.amount_max is not None else None,
+            "platnosc": self.payment_method,
+        }
+        return {key: value for key, value in values.items() if value is not None}
+
+    def register_args(self) -> Dict[str, str]:
+        # Parametry eksportu ewidencji (?from=&to=&type=) dla bieżącego filtra listy.
+        values = {
+            "from": self.date_from.isoformat() if self.date_from else None,
+            "to": self.date_to.isoformat() if self.date_to else None,
+            "type": self.document_type,
+        }
+        return {key: value for key, value in values.items() if value is not None}
+
+    @property
+    def period_reversed(self) -> bool:
+        return bool(self.date_from and self.date_to and self.date_to < self.date_from)
+
+    @property
+    def period_label(self) -> str | None:
+        if self.date_from and self.date_to:
+            return f"{self.date_from.isoformat()} – {self.date_to.isoformat()}"
+        if self.date_from:
+            return f"od {self.date_from.isoformat()}"
+        if self.date_to:
+            return f"do {self.date_to.isoformat()}"
+        return None
+
+
+@dataclass(frozen=True)
+class ListTotals:
+    count: int = 0
+    net: Decimal = ZERO
+    gross: Decimal = ZERO
+
+
+def _text_arg(name: str) -> str | None:
+    return (request.args.get(name) or "").strip() or None
+
+
+def _amount_arg(name: str) -> Decimal | None:
+    raw = _text_arg(name)
+    if raw is None:
+        return None
+    try:
+        return parse_decimal(raw)
+    except InvalidOperation:
+        return None
+
+
+def list_filters_from_request() -> ListFilters:
+    document_type = _text_arg("typ")
+    return ListFilters(
+        date_from=parse_any_date(_text_arg("od")),
+        date_to=parse_any_date(_text_arg("do")),
+        document_type=document_type.lower() if document_type else None,
+        party=_text_arg("kontrahent"),
+        amount_min=_amount_arg("kwota_od"),
+        amount_max=_amount_arg("kwota_do"),
+        payment_method=_text_arg("platnosc"),
+    )
+
+
+def register_filters(args: Mapping[str, str]) -> ListFilters:
+    # Eksport ewidencji: okres i typ dokumentu (?from=&to=&type=, także
+    # parametry zadania w tle zapisane przez register_args()).
+    values = {name: (args.get(name) or "").strip() or None for name in ("from", "to", "type")}
+    return ListFilters(
+        date_from=parse_any_date(values["from"]),
+        date_to=parse_any_date(values["to"]),
+        document_type=values["type"].lower() if values["type"] else None,
+    )
+
+
+def register_filters_from_request() -> ListFilters:
+    return register_filters(request.args)
+
+
+def register_period_error(args: Mapping[str, str]) -> str | None:
+    # Nieczytelna data nie może po cichu zmienić eksportu okresu w eksport
+    # całej historii - zgłaszamy ją tak jak odwrócony zakres.
+    for name, label in (("from", "początkowa"), ("to", "końcowa")):
+        raw = (args.get(name) or "").strip()
+        if raw and parse_any_date(raw) is None:
+            return f"Niepoprawna data {label}: {raw}."
+    if register_filters(args).period_reversed:
+        return "Data końcowa jest wcześniejsza niż początkowa."
+    return None
+
+
+def _contains(column, value: str):
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+
+def _apply_common(query, filters: ListFilters, date_column, party_column, amount_column):
+    if filters.date_from:
+        query = query.filter(date_column >= filters.date_from)
+    if filters.date_to:
+        query = query.filter(date_column < filters.date_to + timedelta(days=1))
+    if filters.party:
+        query = query.filter(_contains(party_column, filters.party))
+    if filters.amount_min is not None:
+        query = query.filter(amount_column >= filters.amount_min)
+    if filters.amount_max is not None:
+        query = query.filter(amount_column <= filters.amount_max)
+    return query
+
+
+def filter_invoices(query, filters: ListFilters, entity=Invoice):
+    # entity: model albo alias z archiwami (archive.with_archives).
+    query = _apply_common(query, filters, entity.issue_date, entity.client_name, entity.gross_amount)
+    if filters.document_type:
+        query = query.filter(entity.document_type == filters.document_type)
+    if filters.payment_method:
+        query = query.filter(_contains(entity.payment_method, filters.payment_method))
+    return query
+
+
+def filter_ndg_documents(query, filters: ListFilters, entity=NDGDocument):
+    return _apply_common(query, filters, entity.document_date, entity.supplier_name, entity.amount)
+
+
+def invoice_totals(session, filters: ListFilters, entity=Invoice) -> ListTotals:
+    query = session.query(
+        func.count(entity.id),
+        func.coalesce(func.sum(entity.net_amount), 0),
+        func.coalesce(func.sum(entity.gross_amount), 0),
+    )
+    count, net, gross = filter_invoices(query, filters, entity).one()
+    return ListTotals(count=count, net=net, gross=gross)
+
+
+def ndg_totals(session, filters: ListFilters, entity=NDGDocument) -> ListTotals:
+    query = session.query(
+        func.count(entity.id),
+        func.coalesce(func.sum(entity.amount), 0),
+    )
+    count, amount = filter_ndg_documents(query, filters, entity).one()
+    return ListTotals(count=count, net=amount, gross=amount)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+import unicodedata
+import uuid
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from flask import current_app, request
+from werkzeug.utils import secure_filename
+
+from .config import UPLOAD_NDG, UPLOAD_ROOT
+from .invoice_line import InvoiceLine
+
+MONTH_NAMES_PL = [
+    "styczeń",
+    "luty",
+    "marzec",
+    "kwiecień",
+    "maj",
+    "czerwiec",
+    "lipiec",
+    "sierpień",
+    "wrzesień",
+    "październik",
+    "listopad",
+    "grudzień",
+]
+
+
+def pl_currency(value: Decimal | float | int | None) -> str:
+    if value is None:
+        return "0,00 zł"
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    value = value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    formatted = f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", " ")
+    return f"{formatted} zł"
+
+
+def parse_decimal(raw_value: str | None) -> Decimal:
+    if not raw_value:
+        return Decimal("0")
+    normalized = raw_value.replace(" ", "").replace(",", ".")
+    return Decimal(normalized)
+
+
+def parse_date(raw_value: str | None) -> date:
+    if not raw_value:
+        raise ValueError("Data jest wymagana.")
+    try:
+        return datetime.strptime(raw_value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise ValueError("Niepoprawny format daty. Użyj RRRR-MM-DD.") from exc
+
+
+def parse_any_date(raw_value: str | None) -> date | None:
+    if not raw_value:
+        return None
+    candidates = [
+        "%Y-%m-%d",
+        "%d.%m.%Y",
+        "%d/%m/%Y",
+        "%Y.%m.%d",
+    ]
+    value = raw_value.strip()
+    for fmt in candidates:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def extract_items_from_form(req: request, tax_rate: Decimal) -> List[InvoiceLine]:
+    descriptions = req.form.getlist("item_description[]")
+    quantities = req.form.getlist("item_quantity[]")
+    gross_prices = req.form.getlist("item_gross_price[]")
+    template_ids = req.form.getlist("item_template_id[]")
+    template_ids += [""] * (len(descriptions) - len(template_ids))
+
+    items = []
+    for description, quantity, gross_price, template_id in zip(
+        descriptions, quantities, gross_prices, template_ids
+    ):
+        description = (description or "").strip()
+        if not description:
+            continue
+        quantity_decimal = parse_decimal(quantity or "1")
+        unit_price_gross = parse_decimal(gross_price or "0")
+        if quantity_decimal <= 0:
+            raise ValueError("Ilość pozycji musi być większa od zera.")
+        if unit_price_gross < 0:
+            raise ValueError("Cena jednostkowa nie może być ujemna.")
+
+        tax_multiplier = tax_rate / Decimal("100") if tax_rate else Decimal("0")
+        if tax_multiplier:
+            unit_price_net = (unit_price_gross / (Decimal("1") + tax_multiplier)).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+        else:
+            unit_price_net = unit_price_gross
+
+        line_total_gross = (quantity_decimal * unit_price_gross).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+        line_total_net = (quantity_decimal * unit_price_net).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+        items.append(
+            InvoiceLine(
+                description=description,
+                quantity=quantity_decimal,
+                unit="usł.",
+                unit_price_net=unit_price_net,
+                unit_price_gross=unit_price_gross.quantize(
+                    Decimal("0.01"), rounding=ROUND_HALF_UP
+                ),
+                line_total_net=line_total_net,
+                line_total_gross=line_total_gross,
+                service_template_id=int(template_id) if (template_id or "").isdigit() else None,
+            )
+        )
+    return items
+
+
+def prefill_from_request(req: request) -> List[dict]:
+    descriptions = req.form.getlist("item_description[]")
+    quantities = req.form.getlist("item_quantity[]")
+    gross_prices = req.form.getlist("item_gross_price[]") or req.form.getlist("item_unit_price[]")
+    template_ids = req.form.getlist("item_template_id[]")
+    template_ids += [""] * (len(descriptions) - len(template_ids))
+
+    prefill: List[dict] = []
+    for description, quantity, gross_price, template_id in zip(
+        descriptions, quantities, gross_prices, template_ids
+    ):
+        if not description:
+            continue
+        prefill.append(
+            {
+                "description": description,
+                "quantity": quantity,
+                "gross_price": gross_price,
+                "service_template_id": template_id,
+            }
+        )
+    return prefill
+
+
+def month_bounds(reference: date, month_offset: int) -> Tuple[date, date]:
+    target_year, target_month = shift_month(reference.year, reference.month, month_offset)
+    start = date(target_year, target_month, 1)
+    next_year, next_month = shift_month(target_year, target_month, 1)
+    end = date(next_year, next_month, 1)
+    return start, end
+
+
+def shift_month(year: int, month: int, delta: int) -> Tuple[int, int]:
+    idx = (year * 12 + (month - 1)) + delta
+    new_year = idx // 12
+    new_month = idx % 12 + 1
+    return new_year, new_month
+
+
+def month_name_pl(year: int, month: int, capitalize: bool = True) -> str:
+    name = MONTH_NAMES_PL[month - 1]
+    if capitalize:
+        name = name.capitalize()
+    return f"{name} {year}"
+
+
+def month_key_to_date(label: str) -> date:
+    year, month = map(int, label.split("-"))
+    return date(year, month, 1)
+
+
+def slugify(value: str) -> str:
+    normalized = (
+        unicodedata.normalize("NFKD", value)
+        .encode("ascii", "ignore")
+        .decode("ascii")
+        .lower()
+    )
+    normalized = re.sub(r"[^a-z0-9]+", "_", normalized)
+    return normalized.strip("_")
+
+
+def row_get(row: dict, *keys: str) -> str | None:
+    for key in keys:
+        if not key:
+            continue
+        variants = {key, key.lower(), key.upper()}
+        for variant in variants:
+            if variant in row:
+                value = (row[variant] or "").strip()
+                if value:
+                    return value
+    return None
+
+
+def _decode_csv_bytes(payload: bytes) -> str:
+    encodings = ["utf-8-sig", "utf-8", "cp1250", "iso-8859-2", "latin-1"]
+    for encoding in encodings:
+        try:
+            return payload.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return payload.decode("latin-1", errors="ignore")
+
+
+def _detect_csv_delimiter(text_data: str) -> str:
+    sample = text_data[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=";,|\t")
+        return dialect.delimiter
+    except csv.Error:
+        if sample.count(";") > sample.count(","):
+            return ";"
+        return ","
+
+
+def read_csv_dicts(upload) -> List[dict]:
+    content = upload.read()
+    decoded: str
+    if isinstance(content, bytes):
+        decoded = _decode_csv_bytes(content)
+    else:
+        decoded = content
+    upload.stream.seek(0)
+    delimiter = _detect_csv_delimiter(decoded)
+    reader = csv.DictReader(io.StringIO(decoded), delimiter=delimiter)
+    rows: List[dict] = []
+    for raw_row in reader:
+        cleaned: dict[str, str] = {}
+        for key, value in raw_row.items():
+            key_clean = (key or "").strip()
+            if not key_clean:
+                continue
+            cleaned[key_clean] = (value or "").strip()
+        if cleaned:
+            rows.append(cleaned)
+    return rows
+
+
+def safe_upload_path(filename: str) -> Tuple[Path, Path]:
+    cleaned = filename.replace("\\", "/")
+    parts = [part for part in cleaned.split("/") if part and part not in {"..", "."}]
+    if parts and parts[0].lower() == "uploads":
+        parts = parts[1:]
+    if not parts:
+        raise FileNotFoundError("Brak ścieżki")
+    relative = Path(*parts)
+    full_path = (UPLOAD_ROOT / relative).resolve()
+    if not str(full_path).startswith(str(UPLOAD_ROOT.resolve())):
+        raise FileNotFoundError("Ścieżka poza katalogiem uploads")
+    return full_path, relative
+
+
+def save_ndg_attachment(file_storage, preferred_name: str | None) -> str:
+    filename = secure_filename(file_storage.filename)
+    extension = Path(filename).suffix or ".bin"
+    base_slug = slugify(preferred_name or Path(filename).stem)
+    if not base_slug:
+        base_slug = uuid.uuid4().hex
+    target_name = f"{base_slug}_{uuid.uuid4().hex[:8]}{extension}"
+    target_path = (UPLOAD_NDG / target_name).resolve()
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    file_storage.save(target_path)
+    relative = target_path.relative_to(UPLOAD_ROOT).as_posix()
+    return relative
+
+
+def delete_upload_files(references: Sequence[str]) -> None:
+    for ref in references:
+        if not ref:
+            continue
+        try:
+            target, _ = safe_upload_path(ref)
+        except FileNotFoundError:
+            continue
+        try:
+            if target.exists():
+                target.unlink()
+        except OSError:
+            current_app.logger.warning("Nie udało się usunąć pliku %s", target)
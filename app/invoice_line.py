@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Tuple
+
+_ZERO = Decimal("0")
+
+
+def _decimal(raw, default: str = "0") -> Decimal:
+    # Wartości z items_json są zapisywane przez str(Decimal), więc zwykle
+    # wystarcza bezpośrednia konwersja; zamiana przecinka tylko awaryjnie.
+    if raw is None or raw == "":
+        return Decimal(default)
+    if isinstance(raw, Decimal):
+        return raw
+    text = str(raw)
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        return Decimal(text.replace(" ", "").replace(",", "."))
+
+
+class InvoiceLine:
+    __slots__ = (
+        "description",
+        "quantity",
+        "unit",
+        "unit_price_net",
+        "unit_price_gross",
+        "line_total_net",
+        "line_total_gross",
+        "service_template_id",
+    )
+
+    def __init__(
+        self,
+        description: str,
+        quantity: Decimal,
+        unit: str,
+        unit_price_net: Decimal,
+        unit_price_gross: Decimal,
+        line_total_net: Decimal,
+        line_total_gross: Decimal,
+        service_template_id: int | None = None,
+    ) -> None:
+        self.description = description
+        self.quantity = quantity
+        self.unit = unit
+        self.unit_price_net = unit_price_net
+        self.unit_price_gross = unit_price_gross
+        self.line_total_net = line_total_net
+        self.line_total_gross = line_total_gross
+        self.service_template_id = service_template_id
+
+    @classmethod
+    def from_raw(cls, raw_item: dict) -> "InvoiceLine":
+        # Starsze wpisy mają tylko unit_price / line_total bez podziału netto/brutto.
+        try:
+            quantity = _decimal(raw_item.get("quantity"))
+        except InvalidOperation:
+            quantity = _ZERO
+        unit_price = raw_item.get("unit_price")
+        line_total = raw_item.get("line_total")
+        return cls(
+            description=raw_item.get("description", ""),
+            quantity=quantity,
+            unit=raw_item.get("unit", "usł."),
+            unit_price_net=_decimal(raw_item.get("unit_price_net", unit_price)),
+            unit_price_gross=_decimal(raw_item.get("unit_price_gross", unit_price)),
+            line_total_net=_decimal(raw_item.get("line_total_net", line_total)),
+            line_total_gross=_decimal(raw_item.get("line_total_gross", line_total)),
+            service_template_id=raw_item.get("service_template_id"),
+        )
+
+    def to_raw(self) -> dict:
+        entry = {
+            "description": self.description,
+            "quantity": str(self.quantity),
+            "unit": self.unit,
+            "unit_price_net": str(self.unit_price_net),
+            "unit_price_gross": str(self.unit_price_gross),
+            "line_total_net": str(self.line_total_net),
+            "line_total_gross": str(self.line_total_gross),
+        }
+        if self.service_template_id:
+            entry["service_template_id"] = self.service_template_id
+        return entry
+
+    def __repr__(self) -> str:
+        return f"InvoiceLine({self.description!r}, {self.quantity} x {self.unit_price_gross})"
+
+
+def decode_lines(items_json: str | None) -> Tuple[InvoiceLine, ...]:
+    try:
+        raw_items = json.loads(items_json or "[]")
+    except json.JSONDecodeError:
+        return ()
+    if not isinstance(raw_items, list):
+        return ()
+    return tuple(InvoiceLine.from_raw(raw) for raw in raw_items if isinstance(raw, dict))
+
+
+def encode_lines(lines) -> str:
+    return json.dumps([line.to_raw() for line in lines])
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Mapping, TypeVar
+
+from flask import Flask, current_app
+from sqlalchemy import delete, insert, select, update
+
+from .extensions import db
+from .models import Job
+
+# Długie operacje (eksport ewidencji, import CSV, przywracanie kopii) działają
+# w puli wątków procesu aplikacji, a żądanie tylko zapisuje zadanie w tabeli
+# jobs. Pliki wejściowe i wynik leżą w instance/jobs/<id>/. Postęp i żądanie
+# anulowania trzymamy w pamięci - zapis do bazy w trakcie importu czekałby
+# na blokadę zapisu trzymaną przez sam import. Zakładamy jeden proces
+# aplikacji na bazę (serwer wątkowy).
+JOB_WORKERS = 2
+JOB_RETENTION = timedelta(days=7)
+JOBS_DIR = "jobs"
+ACTIVE_STATUSES = ("queued", "running")
+
+T = TypeVar("T")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class JobOutcome:
+    message: str
+    result_name: str | None = None
+
+
+class _LiveJob:
+    def __init__(self) -> None:
+        self.done = 0
+        self.total: int | None = None
+        self.cancel = threading.Event()
+
+
+class JobContext:
+    # Przekazywany do funkcji zadania: katalog na pliki, postęp, anulowanie.
+    def __init__(self, job_id: int, directory: Path, live: _LiveJob) -> None:
+        self.id = job_id
+        self.directory = directory
+        self._live = live
+
+    def progress(self, done: int, total: int | None = None) -> None:
+        self._live.done = done
+        if total is not None:
+            self._live.total = total
+
+    def check_cancelled(self) -> None:
+        if self._live.cancel.is_set():
+            raise JobCancelled()
+
+    def track(self, items: Iterable[T], total: int) -> Iterator[T]:
+        # Przepuszcza elementy, licząc postęp; anulowanie przerywa iterację.
+        self.progress(0, total)
+        done = 0
+        for item in items:
+            self.check_cancelled()
+            yield item
+            done += 1
+            self.progress(done)
+
+    def write_result(self, name: str, data: bytes) -> str:
+        (self.directory / name).write_bytes(data)
+        return name
+
+
+@dataclass(frozen=True)
+class _Handler:
+    run: Callable[[JobContext, dict], JobOutcome]
+    exclusive: bool
+
+
+_HANDLERS: Dict[str, _Handler] = {}
+
+
+def job_handler(kind: str, exclusive: bool = False):
+    # exclusive - zadanie czeka, aż skończą się pozostałe, i blokuje kolejne
+    # (przywracanie kopii podmienia plik bazy).
+    def register(func):
+        _HANDLERS[kind] = _Handler(func, exclusive)
+        return func
+
+    return register
+
+
+class _JobGate:
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._active = 0
+        self._exclusive = False
+        self._waiting_exclusive = 0
+
+    @contextmanager
+    def hold(self, exclusive: bool):
+        with self._condition:
+            if exclusive:
+                self._waiting_exclusive += 1
+                self._condition.wait_for(lambda: self._active == 0 and not self._exclusive)
+                self._waiting_exclusive -= 1
+                self._exclusive = True
+            else:
+                self._condition.wait_for(lambda: not self._exclusive and not self._waiting_exclusive)
+                self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                if exclusive:
+                    self._exclusive = False
+                else:
+                    self._active -= 1
+                self._condition.notify_all()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_directory(job_id: int) -> Path:
+    return Path(current_app.instance_path) / JOBS_DIR / str(job_id)
+
+
+class JobRunner:
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+        self._live: Dict[int, _LiveJob] = {}
+        self._lock = threading.Lock()
+        self._gate = _JobGate()
+        # Trzymana przez przywracanie kopii od zrzutu tabeli jobs do jej
+        # odtworzenia w nowej bazie - odczyty zadań czekają na koniec podmiany.
+        self.swap_lock = threading.Lock()
+
+    def live(self, job_id: int) -> _LiveJob | None:
+        with self._lock:
+            return self._live.get(job_id)
+
+    def start(self, job_id: int, kind: str) -> None:
+        live = _LiveJob()
+        with self._lock:
+            self._live[job_id] = live
+        self._executor.submit(self._run, job_id, kind, live)
+
+    def _run(self, job_id: int, kind: str, live: _LiveJob) -> None:
+        handler = _HANDLERS[kind]
+        with self.app.app_context():
+            directory = job_directory(job_id)
+            try:
+                with self._gate.hold(handler.exclusive):
+                    params = _mark_started(job_id)
+                    if params is None:
+                        return
+                    self._execute(job_id, kind, handler, JobContext(job_id, directory, live), live, params)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._live.pop(job_id, None)
+
+    def _execute(
+        self,
+        job_id: int,
+        kind: str,
+        handler: _Handler,
+        context: JobContext,
+        live: _LiveJob,
+        params: dict,
+    ) -> None:
+        result_name = None
+        try:
+            outcome = handler.run(context, params)
+        except JobCancelled:
+            db.session.rollback()
+            status, message = "cancelled", "Zadanie anulowane."
+        except Exception as exc:
+            db.session.rollback()
+            if not isinstance(exc, ValueError):
+                current_app.logger.exception("Zadanie %s (%s) nie powiodło się", job_id, kind)
+            status, message = "failed", str(exc) or exc.__class__.__name__
+        else:
+            status, message, result_name = "done", outcome.message, outcome.result_name
+        _finish(job_id, status, message, live.done, live.total, result_name)
+        _remove_inputs(context.directory, keep=result_name)
+
+
+_RUNNER_LOCK = threading.Lock()
+
+
+def job_runner() -> JobRunner:
+    state = current_app.extensions
+    runner = state.get("job_runner")
+    if runner is None:
+        with _RUNNER_LOCK:
+            runner = state.get("job_runner")
+            if runner is None:
+                _fail_interrupted_jobs()
+                runner = state["job_runner"] = JobRunner(current_app._get_current_object())
+    return runner
+
+
+def _fail_interrupted_jobs() -> None:
+    # Zadania z poprzedniego uruchomienia aplikacji nie mają już wątku.
+    db.session.execute(
+        update(Job)
+        .where(Job.status.in_(ACTIVE_STATUSES))
+        .values(status="failed", message="Zadanie przerwane - aplikacja została zatrzymana.", finished_at=_now())
+    )
+    db.session.commit()
+
+
+def _mark_started(job_id: int) -> dict | None:
+    # None - zadanie anulowano, zanim trafiło do wątku.
+    started = db.session.execute(
+        update(Job).where(Job.id == job_id, Job.status == "queued").values(status="running", started_at=_now())
+    ).rowcount
+    db.session.commit()
+    if not started:
+        return None
+    return json.loads(db.session.execute(select(Job.params_json).where(Job.id == job_id)).scalar_one())
+
+
+def _finish(
+    job_id: int,
+    status: str,
+    message: str,
+    done: int,
+    total: int | None,
+    result_name: str | None,
+) -> None:
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(
+            status=status,
+            message=message,
+            progress_done=done,
+            progress_total=total,
+            result_name=result_name,
+            finished_at=_now(),
+        )
+    )
+    db.session.commit()
+
+
+def _remove_inputs(directory: Path, keep: str | None) -> None:
+    for path in directory.glob("*"):
+        if path.name != keep and path.is_file():
+            path.unlink(missing_ok=True)
+
+
+def _prune_old_jobs() -> None:
+    cutoff = _now() - JOB_RETENTION
+    old_ids = db.session.execute(
+        select(Job.id).where(Job.status.not_in(ACTIVE_STATUSES), Job.finished_at < cutoff)
+    ).scalars().all()
+    if old_ids:
+        db.session.execute(delete(Job).where(Job.id.in_(old_ids)))
+        for job_id in old_ids:
+            shutil.rmtree(job_directory(job_id), ignore_errors=True)
+
+
+def submit_job(kind: str, params: Mapping[str, object], uploads: Mapping[str, object] | None = None) -> Job:
+    # uploads - pliki z żądania (FileStorage) zapisywane w katalogu zadania pod podanymi nazwami.
+    runner = job_runner()
+    _prune_old_jobs()
+    job = Job(kind=kind, status="queued", params_json=json.dumps(dict(params)), created_at=_now())
+    db.session.add(job)
+    db.session.flush()
+    directory = job_directory(job.id)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, upload in (uploads or {}).items():
+            upload.save(directory / name)
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    runner.start(job.id, kind)
+    return job
+
+
+def cancel_job(job_id: int) -> bool:
+    cancelled = db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "queued")
+        .values(status="cancelled", message="Zadanie anulowane.", finished_at=_now())
+    ).rowcount
+    db.session.commit()
+    if cancelled:
+        return True
+    live = job_runner().live(job_id)
+    if live is None:
+        return False
+    live.cancel.set()
+    return True
+
+
+def job_progress(job: Job) -> tuple[int, int | None]:
+    live = job_runner().live(job.id) if job.status in ACTIVE_STATUSES else None
+    if live is not None:
+        return live.done, live.total
+    return job.progress_done, job.progress_total
+
+
+def get_job(job_id: int) -> Job | None:
+    with job_runner().swap_lock:
+        return db.session.get(Job, job_id)
+
+
+@contextmanager
+def preserved_jobs():
+    # Tabela jobs opisuje zadania tego procesu - przy podmianie pliku bazy
+    # (przywracanie kopii) przenosimy ją do nowej bazy bez zmian.
+    with job_runner().swap_lock:
+        rows = [dict(row._mapping) for row in db.session.execute(select(Job.__table__))]
+        yield
+        db.session.execute(delete(Job))
+        if rows:
+            db.session.execute(insert(Job.__table__), rows)
+        db.session.commit()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, List, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+
+from .archive import archives_for_range, with_archives
+from .invoice_line import InvoiceLine, decode_lines
+from .models import Invoice, InvoiceItem, ServiceTemplate
+
+# Pozycje dokumentu są zapisywane dwukrotnie: jako items_json (źródło dla
+# widoków i PDF) oraz jako wiersze invoice_items, na których liczymy
+# zestawienia usług jednym zapytaniem SQL.
+BACKFILL_BATCH_SIZE = 500
+
+
+def _item_rows(invoice_id: int, items: Sequence[InvoiceLine]) -> List[dict]:
+    return [
+        {
+            "invoice_id": invoice_id,
+            "position": position,
+            "description": (item.description or "")[:255],
+            "quantity": item.quantity,
+            "unit": item.unit or "usł.",
+            "unit_price_net": item.unit_price_net,
+            "unit_price_gross": item.unit_price_gross,
+            "line_total_net": item.line_total_net,
+            "line_total_gross": item.line_total_gross,
+            "service_template_id": item.service_template_id,
+        }
+        for position, item in enumerate(items, 1)
+    ]
+
+
+def write_invoice_items(executor, entries: Iterable[Tuple[int, Sequence[InvoiceLine]]]) -> None:
+    # Jedno DELETE i jedno INSERT (executemany) dla całej paczki dokumentów.
+    # executor to sesja albo połączenie - oba mają execute().
+    entries = list(entries)
+    if not entries:
+        return
+    delete_invoice_items(executor, [invoice_id for invoice_id, _ in entries])
+    rows = [row for invoice_id, items in entries for row in _item_rows(invoice_id, items)]
+    if rows:
+        executor.execute(insert(InvoiceItem), rows)
+
+
+def delete_invoice_items(executor, invoice_ids: Sequence[int] | None = None) -> None:
+    statement = delete(InvoiceItem)
+    if invoice_ids is not None:
+        statement = statement.where(InvoiceItem.invoice_id.in_(invoice_ids))
+    executor.execute(statement)
+
+
+def backfill_invoice_items(connection) -> None:
+    delete_invoice_items(connection)
+    last_id = 0
+    while True:
+        batch = connection.execute(
+            select(Invoice.id, Invoice.items_json)
+            .where(Invoice.id > last_id)
+            .order_by(Invoice.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not batch:
+            return
+        write_invoice_items(
+            connection, [(invoice_id, decode_lines(items_json)) for invoice_id, items_json in batch]
+        )
+        last_id = batch[-1][0]
+
+
+def service_revenue(
+    session,
+    start: date | None = None,
+    end: date | None = None,
+    limit: int | None = None,
+) -> List[dict]:
+    # Przychód na usługę: nazwa szablonu, a dla pozycji wpisanych ręcznie opis.
+    invoice, years = archives_for_range(session, Invoice, start, end)
+    item = with_archives(session, InvoiceItem, years)
+    service = func.coalesce(ServiceTemplate.name, item.description)
+    gross = func.sum(item.line_total_gross)
+    query = (
+        session.query(
+            service,
+            gross,
+            func.sum(item.line_total_net),
+            func.sum(item.quantity),
+            func.count(func.distinct(item.invoice_id)),
+        )
+        .select_from(item)
+        .join(invoice, invoice.id == item.invoice_id)
+        .outerjoin(ServiceTemplate, ServiceTemplate.id == item.service_template_id)
+    )
+    if start is not None:
+        query = query.filter(invoice.issue_date >= start)
+    if end is not None:
+        query = query.filter(invoice.issue_date < end)
+    query = query.group_by(service).order_by(gross.desc(), service)
+    if limit:
+        query = query.limit(limit)
+    return [
+        {
+            "service": name,
+            "gross": gross_total,
+            "net": net_total,
+            "quantity": quantity,
+            "documents": documents,
+        }
+        for name, gross_total, net_total, quantity, documents in query.all()
+    ]
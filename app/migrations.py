@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Callable, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Kolejne kroki schematu: (numer, opis, funkcja(connection)). Numer zapisanego
+# kroku trafia do tabeli schema_version, więc zwykły start aplikacji to jeden
+# odczyt tej tabeli zamiast inspekcji wszystkich kolumn.
+Migration = Tuple[int, str, Callable[..., None]]
+
+
+def read_schema_version(connection) -> int | None:
+    try:
+        row = connection.execute(text("SELECT version FROM schema_version")).first()
+    except OperationalError:
+        return None
+    return int(row[0]) if row else 0
+
+
+def table_exists(connection, table: str) -> bool:
+    row = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": table},
+    ).first()
+    return row is not None
+
+
+def add_column(connection, table: str, column_ddl: str) -> None:
+    column = column_ddl.split()[0]
+    existing = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+    if column not in existing:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_ddl}"))
+
+
+def _write_schema_version(connection, version: int) -> None:
+    connection.execute(text("DELETE FROM schema_version"))
+    connection.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+
+
+def upgrade_schema(
+    engine,
+    migrations: Sequence[Migration],
+    create_schema: Callable[..., None],
+) -> List[str]:
+    latest = migrations[-1][0] if migrations else 0
+    applied: List[str] = []
+
+    with engine.begin() as conn:
+        version = read_schema_version(conn)
+        if version is None:
+            fresh = conn.execute(
+                text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'")
+            ).scalar()
+            conn.execute(text("CREATE TABLE schema_version (version INTEGER NOT NULL)"))
+            if not fresh:
+                # Pusta baza: tworzymy od razu aktualny schemat.
+                create_schema(conn)
+                _write_schema_version(conn, latest)
+                return ["schemat bazowy"]
+            version = 0
+            _write_schema_version(conn, version)
+
+    for number, description, step in migrations:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            _write_schema_version(conn, number)
+        applied.append(f"{number}: {description}")
+    return applied
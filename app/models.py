@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Tuple
+
+from sqlalchemy import event
+
+from .extensions import db
+from .invoice_line import InvoiceLine, decode_lines
+from .money import MoneyGrosze
+
+
+class Invoice(db.Model):
+    __tablename__ = "invoices"
+    __table_args__ = (
+        db.Index("ix_invoices_type_issue_date", "document_type", "issue_date"),
+        db.Index("ix_invoices_number_type", "number", "document_type", unique=True),
+        # Zakresy dat obsługuje indeks listy (issue_date jest pierwszą kolumną).
+        db.Index("ix_invoices_list_order", "issue_date", "number", "id"),
+        # Identyfikatory nie wracają po usunięciu dokumentów - te same id
+        # mogą leżeć w archiwach lat, w indeksie FTS i w change_log.
+        {"sqlite_autoincrement": True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    document_type = db.Column(db.String(20), nullable=False)  # faktura / rachunek
+    number = db.Column(db.String(120), nullable=False)
+    issue_date = db.Column(db.Date, nullable=False)
+    sale_date = db.Column(db.Date)
+    issue_place = db.Column(db.String(120))
+    client_name = db.Column(db.String(255), nullable=False)
+    client_tax_id = db.Column(db.String(50))
+    client_address = db.Column(db.String(255))
+    payment_method = db.Column(db.String(120))
+    amount_paid = db.Column(MoneyGrosze())
+    items_json = db.Column(db.Text, nullable=False, default="[]")
+    net_amount = db.Column(MoneyGrosze(), nullable=False)
+    tax_rate = db.Column(db.Numeric(5, 2), nullable=False, default=Decimal("0"))
+    gross_amount = db.Column(MoneyGrosze(), nullable=False)
+    notes = db.Column(db.Text)
+    internal_notes = db.Column(db.Text)
+
+    @property
+    def items(self) -> Tuple[InvoiceLine, ...]:
+        # Pozycje dekodujemy raz na instancję; bufor znika przy przypisaniu
+        # items_json oraz przy wygaszeniu/odświeżeniu obiektu w sesji.
+        lines = self.__dict__.get(_ITEMS_CACHE_KEY)
+        if lines is None:
+            lines = decode_lines(self.items_json)
+            self.__dict__[_ITEMS_CACHE_KEY] = lines
+        return lines
+
+
+_ITEMS_CACHE_KEY = "_items_cache"
+
+
+@event.listens_for(Invoice.items_json, "set")
+def _reset_items_cache_on_set(target, value, oldvalue, initiator) -> None:
+    target.__dict__.pop(_ITEMS_CACHE_KEY, None)
+
+
+@event.listens_for(Invoice, "expire")
+def _reset_items_cache_on_expire(target, attrs) -> None:
+    if attrs is None or "items_json" in attrs:
+        target.__dict__.pop(_ITEMS_CACHE_KEY, None)
+
+
+@event.listens_for(Invoice, "refresh")
+def _reset_items_cache_on_refresh(target, context, attrs) -> None:
+    if attrs is None or "items_json" in attrs:
+        target.__dict__.pop(_ITEMS_CACHE_KEY, None)
+
+
+class InvoiceItem(db.Model):
+    __tablename__ = "invoice_items"
+    __table_args__ = (db.Index("ix_invoice_items_invoice_position", "invoice_id", "position"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    invoice_id = db.Column(db.Integer, db.ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    description = db.Column(db.String(255), nullable=False)
+    quantity = db.Column(db.Numeric(12, 3), nullable=False, default=Decimal("1"))
+    unit = db.Column(db.String(20), nullable=False, default="usł.")
+    unit_price_net = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    unit_price_gross = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    line_total_net = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    line_total_gross = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    service_template_id = db.Column(
+        db.Integer, db.ForeignKey("service_templates.id", ondelete="SET NULL"), index=True
+    )
+
+class NDGDocument(db.Model):
+    __tablename__ = "ndg_documents"
+    __table_args__ = (
+        db.Index("ix_ndg_documents_number", "number"),
+        db.Index("ix_ndg_documents_list_order", "document_date", "number", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    number = db.Column(db.String(120), nullable=False)
+    document_date = db.Column(db.Date, nullable=False)
+    supplier_name = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text)
+    amount = db.Column(MoneyGrosze(), nullable=False)
+    file_reference = db.Column(db.String(255))
+    internal_notes = db.Column(db.Text)
+    # Załączniki ładujemy osobnym zapytaniem (selectinload) tylko tam, gdzie są
+    # wyświetlane - nie doklejamy ich JOIN-em do każdego zapytania o dokumenty.
+    attachments = db.relationship(
+        "NDGAttachment", backref="document", cascade="all, delete-orphan", lazy="select"
+    )
+
+
+class NDGAttachment(db.Model):
+    __tablename__ = "ndg_attachments"
+
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(
+        db.Integer, db.ForeignKey("ndg_documents.id"), nullable=False, index=True
+    )
+    file_reference = db.Column(db.String(255), nullable=False)
+
+
+class ServiceTemplate(db.Model):
+    __tablename__ = "service_templates"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.String(255), nullable=False)
+    gross_price = db.Column(MoneyGrosze(), nullable=False)
+
+
+class MonthlyTotal(db.Model):
+    __tablename__ = "monthly_totals"
+
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    document_type = db.Column(db.String(20), primary_key=True)  # faktura / paragon / rachunek / ndg
+    gross_amount = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    net_amount = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    ndg_cost = db.Column(MoneyGrosze(), nullable=False, default=Decimal("0"))
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Client(db.Model):
+    __tablename__ = "clients"
+    __table_args__ = (
+        db.Index("ix_clients_search_name", "search_name"),
+        db.Index("ix_clients_tax_digits", "tax_digits"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # "nip:<cyfry>" albo "nazwa:<znormalizowana nazwa>" - po nim deduplikujemy.
+    key = db.Column(db.String(255), nullable=False, unique=True)
+    name = db.Column(db.String(255), nullable=False)
+    tax_id = db.Column(db.String(50))
+    address = db.Column(db.String(255))
+    search_name = db.Column(db.String(255), nullable=False)
+    tax_digits = db.Column(db.String(50))
+    last_used = db.Column(db.Date)
+
+
+class ChangeLogEntry(db.Model):
+    __tablename__ = "change_log"
+
+    # id jest kursorem strumienia zmian (rośnie z każdym wpisem).
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    entity = db.Column(db.String(20), nullable=False)  # invoice / ndg / ndg_attachment
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # create / update / delete
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+
+class DocumentSequence(db.Model):
+    __tablename__ = "document_sequences"
+
+    document_type = db.Column(db.String(20), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ArchivedYear(db.Model):
+    __tablename__ = "archived_years"
+
+    year = db.Column(db.Integer, primary_key=True)
+    file_name = db.Column(db.String(255), nullable=False)  # plik w katalogu instance/
+    archived_at = db.Column(db.DateTime, nullable=False)
+    invoice_count = db.Column(db.Integer, nullable=False, default=0)
+    ndg_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)  # sales_register / ndg_register / import_* / restore_backup
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued / running / done / failed / cancelled
+    params_json = db.Column(db.Text, nullable=False, default="{}")
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    message = db.Column(db.Text)
+    result_name = db.Column(db.String(255))  # plik wyniku w instance/jobs/<id>/
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+
+class DataVersion(db.Model):
+    __tablename__ = "data_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Kolejność list (malejąco) i klucz kursora stronicowania.
+INVOICE_LIST_ORDER = (Invoice.issue_date, Invoice.number, Invoice.id)
+NDG_LIST_ORDER = (NDGDocument.document_date, NDGDocument.number, NDGDocument.id)
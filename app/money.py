@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import Integer
+from sqlalchemy.sql import type_coerce
+from sqlalchemy.types import TypeDecorator
+
+ZERO = Decimal("0.00")
+_GROSZ = Decimal("0.01")
+
+
+class MoneyGrosze(TypeDecorator):
+    # Kwoty trzymamy w bazie jako liczbę całkowitą groszy (SUM() jest dokładne
+    # i nie przechodzi przez float), a w Pythonie widzimy Decimal z 2 miejscami.
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return int((value / _GROSZ).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Decimal(int(value)).scaleb(-2)
+
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+
+    @property
+    def python_type(self):
+        return Decimal
+
+
+def grosze(expression):
+    # Surowa wartość w groszach (int) - np. func.sum(grosze(Invoice.gross_amount)).
+    return type_coerce(expression, Integer)
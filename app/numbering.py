@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .models import DocumentSequence, Invoice
+
+# Numer dokumentu ma postać "<kolejny>/<miesiąc>/<rok>", licznik jest osobny
+# dla każdego typu dokumentu i miesiąca daty wystawienia. Ostatnia wydana
+# wartość leży w document_sequences, więc podgląd numeru to odczyt jednego
+# wiersza, a przydział to jedno INSERT .. ON CONFLICT w transakcji zapisu.
+SequenceKey = Tuple[str, int, int]
+
+
+def sequence_value(number: str | None) -> int | None:
+    if not number:
+        return None
+    try:
+        return int(number.split("/")[0])
+    except (ValueError, TypeError):
+        return None
+
+
+def format_document_number(value: int, issue_date: date) -> str:
+    return f"{value}/{issue_date.month}/{issue_date.year}"
+
+
+def _sequence_key(document_type: str, issue_date: date) -> Dict[str, object]:
+    return {"document_type": document_type, "year": issue_date.year, "month": issue_date.month}
+
+
+def peek_document_number(session, document_type: str, issue_date: date) -> str:
+    key = _sequence_key(document_type, issue_date)
+    last_value = session.execute(
+        select(DocumentSequence.last_value).filter_by(**key)
+    ).scalar()
+    return format_document_number((last_value or 0) + 1, issue_date)
+
+
+def allocate_document_number(session, document_type: str, issue_date: date) -> str:
+    # Zwiększenie licznika blokuje bazę do końca transakcji zapisu, więc dwa
+    # równoległe zapisy nie dostaną tego samego numeru.
+    statement = sqlite_insert(DocumentSequence).values(
+        **_sequence_key(document_type, issue_date), last_value=1
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[DocumentSequence.document_type, DocumentSequence.year, DocumentSequence.month],
+        set_={"last_value": DocumentSequence.last_value + 1},
+    ).returning(DocumentSequence.last_value)
+    value = session.execute(statement).scalar_one()
+    return format_document_number(value, issue_date)
+
+
+def register_document_number(session, document_type: str, issue_date: date, number: str) -> None:
+    # Numer wpisany ręcznie (lub z importu) przesuwa licznik, jeśli jest wyższy.
+    value = sequence_value(number)
+    if value is None or value <= 0:
+        return
+    statement = sqlite_insert(DocumentSequence).values(
+        **_sequence_key(document_type, issue_date), last_value=value
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DocumentSequence.document_type, DocumentSequence.year, DocumentSequence.month],
+            set_={"last_value": func.max(DocumentSequence.last_value, statement.excluded.last_value)},
+        )
+    )
+
+
+def rebuild_document_sequences(connection) -> None:
+    highest: Dict[SequenceKey, int] = {}
+    rows = connection.execute(
+        select(Invoice.document_type, Invoice.issue_date, Invoice.number)
+    )
+    for document_type, issue_date, number in rows:
+        value = sequence_value(number)
+        if value is None or issue_date is None:
+            continue
+        key = (document_type, issue_date.year, issue_date.month)
+        highest[key] = max(highest.get(key, 0), value)
+    connection.execute(delete(DocumentSequence))
+    if highest:
+        connection.execute(
+            insert(DocumentSequence),
+            [
+                {"document_type": document_type, "year": year, "month": month, "last_value": value}
+                for (document_type, year, month), value in highest.items()
+            ],
+        )
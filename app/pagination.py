@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, List, Sequence, Tuple
+
+from flask import current_app, request
+from sqlalchemy import tuple_
+
+# Stronicowanie po kluczu (keyset): kolejna strona to warunek
+# (data, numer, id) < ostatni wiersz poprzedniej strony, więc koszt zapytania
+# nie rośnie z numerem strony tak jak przy OFFSET.
+MAX_PAGE_SIZE = 200
+# Liczby całkowite SQLite są 64-bitowe; większa wartość z kursora kończyłaby
+# się OverflowError przy wiązaniu parametru.
+_SQLITE_INT_RANGE = range(-(2**63), 2**63)
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: List[Any]
+    per_page: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, date) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None, columns: Sequence) -> Tuple | None:
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            value = date.fromisoformat(value) if python_type is date else python_type(value)
+            if isinstance(value, int) and value not in _SQLITE_INT_RANGE:
+                return None
+            decoded.append(value)
+        return tuple(decoded)
+    except (binascii.Error, ValueError, TypeError, NotImplementedError):
+        return None
+
+
+def requested_page_size() -> int:
+    default = current_app.config.get("LIST_PAGE_SIZE", 50)
+    per_page = request.args.get("per_page", type=int) or default
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, columns: Sequence, per_page: int) -> KeysetPage:
+    # Lista jest sortowana malejąco po columns; kursory ?after= / ?before=
+    # wskazują odpowiednio ostatni i pierwszy wiersz sąsiedniej strony.
+    key = tuple_(*columns)
+    after = decode_cursor(request.args.get("after"), columns)
+    before = None if after else decode_cursor(request.args.get("before"), columns)
+
+    if before is not None:
+        rows = (
+            query.filter(key > tuple_(*before))
+            .order_by(*[column.asc() for column in columns])
+            .limit(per_page + 1)
+            .all()
+        )
+        has_prev, has_next = len(rows) > per_page, True
+        rows = list(reversed(rows[:per_page]))
+    else:
+        if after is not None:
+            query = query.filter(key < tuple_(*after))
+        rows = query.order_by(*[column.desc() for column in columns]).limit(per_page + 1).all()
+        has_prev, has_next = after is not None, len(rows) > per_page
+        rows = rows[:per_page]
+
+    def cursor(row) -> str:
+        return encode_cursor([getattr(row, column.key) for column in columns])
+
+    return KeysetPage(
+        items=rows,
+        per_page=per_page,
+        next_cursor=cursor(rows[-1]) if rows and has_next else None,
+        prev_cursor=cursor(rows[0]) if rows and has_prev else None,
+    )
@@ -0,0 +1,843 @@
+from __future__ import annotations
+
+import copy
+import itertools
+import re
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+from flask import current_app
+from fontTools import subset as ftsubset
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.enums import TextEmphasis, XPos, YPos
+from fpdf.fonts import SubsetMap, TTFFont
+
+from .config import DEFAULT_ISSUE_PLACE, PDF_FONT_CANDIDATES, SELLER
+from .invoice_line import InvoiceLine
+from .models import Invoice, NDGDocument
+
+
+@lru_cache(maxsize=1)
+def pdf_font_path() -> Path | None:
+    # Szukamy czcionki dopiero przy pierwszym generowanym PDF, nie przy starcie.
+    return next((path for path in PDF_FONT_CANDIDATES if path.exists()), None)
+
+
+# FPDF.add_font parsuje plik TTF przy każdym dokumencie, a przy zapisie fpdf2
+# przycina całą czcionkę (ok. 6000 glifów DejaVuSans) do użytych znaków.
+# Parsujemy ją raz na proces i raz przycinamy do zakresów poniżej; każdy PDF
+# dostaje kopię z własnym TTFont, podzbiorem glifów i deskryptorem (fpdf2
+# zmienia je przy zapisie). Znak spoza zakresów - pełny plik (_pdf_output).
+COMMON_FONT_RANGES = (
+    (0x0020, 0x007E),  # Basic Latin
+    (0x00A0, 0x024F),  # Latin-1 Supplement, Latin Extended-A/B (polskie znaki)
+    (0x2000, 0x206F),  # interpunkcja (półpauzy, cudzysłowy, wielokropek)
+    (0x20A0, 0x20BF),  # symbole walut
+    (0x2116, 0x2116),  # №
+    (0x2122, 0x2122),  # ™
+)
+# Tabele pomijane przez fpdf2 przy osadzaniu czcionki.
+_UNUSED_FONT_TABLES = ["FFTM", "GDEF", "GPOS", "GSUB", "MATH", "hdmx", "meta"]
+
+
+@dataclass(frozen=True)
+class DocumentFont:
+    parsed: TTFFont
+    full_data: bytes
+    common_data: bytes
+    common_glyphs: frozenset
+
+
+def _load_ttfont(data: bytes) -> ttLib.TTFont:
+    return ttLib.TTFont(BytesIO(data), recalcTimestamp=False, fontNumber=0, lazy=True)
+
+
+def _common_subset(data: bytes) -> Tuple[bytes, frozenset]:
+    options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True, glyph_names=True)
+    options.drop_tables += _UNUSED_FONT_TABLES
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(
+        unicodes=[code for first, last in COMMON_FONT_RANGES for code in range(first, last + 1)]
+    )
+    font = _load_ttfont(data)
+    subsetter.subset(font)
+    output = BytesIO()
+    font.save(output)
+    return output.getvalue(), frozenset(font.getGlyphOrder())
+
+
+@lru_cache(maxsize=4)
+def _document_font(font_path: str) -> DocumentFont:
+    parsed = TTFFont(FPDF(), Path(font_path), "documentfont", "")
+    parsed.ttfont.close()
+    full_data = Path(font_path).read_bytes()
+    common_data, common_glyphs = _common_subset(full_data)
+    return DocumentFont(parsed, full_data, common_data, common_glyphs)
+
+
+def _add_cached_font(pdf: FPDF, family: str, style: str, font_path: Path) -> None:
+    cached = _document_font(str(font_path))
+    font = copy.copy(cached.parsed)
+    font.i = len(pdf.fonts) + 1
+    font.fontkey = f"{family.lower()}{style}"
+    font.emphasis = TextEmphasis.coerce(style)
+    font.missing_glyphs = []
+    font.desc = copy.copy(cached.parsed.desc)
+    font.ttfont = _load_ttfont(cached.common_data)
+    reserved = "\x00 \r\n"
+    if pdf.str_alias_nb_pages:
+        reserved += "0123456789" + pdf.str_alias_nb_pages
+    font.subset = SubsetMap(font, [ord(char) for char in reserved])
+    pdf.fonts[font.fontkey] = font
+
+
+def _use_full_fonts_if_needed(pdf: FPDF) -> None:
+    for font in pdf.fonts.values():
+        if isinstance(font, TTFFont):
+            cached = _document_font(str(font.ttffile))
+            if not cached.common_glyphs.issuperset(font.subset.get_all_glyph_names()):
+                font.ttfont.close()
+                font.ttfont = _load_ttfont(cached.full_data)
+
+
+def _pdf_with_title(title: str | None = None) -> Tuple[FPDF, str]:
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    font_family = "Helvetica"
+
+    font_path = pdf_font_path()
+    if font_path:
+        try:
+            _add_cached_font(pdf, "DocumentFont", "", font_path)
+            _add_cached_font(pdf, "DocumentFont", "B", font_path)
+            font_family = "DocumentFont"
+        except Exception:
+            current_app.logger.warning("Nie udało się załadować czcionki %s.", font_path)
+
+    title_text = (title or "").strip()
+    if title_text:
+        pdf.set_font(font_family, size=16)
+        pdf.cell(0, 10, title_text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(4)
+    pdf.set_font(font_family, size=11)
+    return pdf, font_family
+
+
+def _format_quantity(value: Decimal | float | int) -> str:
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value or "0"))
+    normalized = value.normalize()
+    as_string = format(normalized, "f")
+    if "." in as_string:
+        as_string = as_string.rstrip("0").rstrip(".")
+    return as_string.replace(".", ",") or "0"
+
+
+def _pdf_table_row(
+    pdf: FPDF,
+    widths: Sequence[float],
+    values: Sequence[str],
+    *,
+    line_height: float = 6,
+    aligns: Sequence[str] | None = None,
+) -> None:
+    aligns = list(aligns or ["L"] * len(widths))
+    y_start = pdf.get_y()
+    x_start = pdf.get_x()
+    max_lines = 1
+    prepared_lines: List[List[str]] = []
+
+    for text, width in zip(values, widths):
+        content = (text or "").strip()
+        lines = pdf.multi_cell(
+            width,
+            line_height,
+            content,
+            dry_run=True,
+            output="LINES",
+        )
+        if not lines:
+            lines = [""]
+        prepared_lines.append(lines)
+        max_lines = max(max_lines, len(lines))
+
+    pdf.set_xy(x_start, y_start)
+    for idx, (lines, width) in enumerate(zip(prepared_lines, widths)):
+        align = "L"
+        if idx < len(aligns):
+            align = aligns[idx]
+        pdf.multi_cell(
+            width,
+            line_height,
+            "\n".join(lines),
+            border=1,
+            align=align,
+            new_x="RIGHT",
+            new_y="TOP",
+            max_line_height=line_height,
+        )
+    pdf.set_xy(x_start, y_start + line_height * max_lines)
+
+
+def _pdf_output(pdf: FPDF) -> bytes:
+    _use_full_fonts_if_needed(pdf)
+    data = pdf.output(dest="S")
+    if isinstance(data, bytearray):
+        return bytes(data)
+    if isinstance(data, bytes):
+        return data
+    try:
+        return data.encode("latin-1")
+    except UnicodeEncodeError:
+        return data.encode("latin-1", "ignore")
+
+
+def _normalize_decimal(value: Decimal | float | int) -> Decimal:
+    if isinstance(value, Decimal):
+        normalized = value
+    else:
+        normalized = Decimal(str(value))
+    return normalized.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _format_currency_plain(value: Decimal | float | int) -> str:
+    amount = _normalize_decimal(value)
+    return f"{amount:,.2f}".replace(",", " " ).replace(".", ",")
+
+
+def _format_currency(value: Decimal | float | int) -> str:
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    value = value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    formatted = f"{value:,.2f}".replace(",", " ").replace(".", ",")
+    return f"{formatted} zł"
+
+
+_UNITS = [
+    ["zero", "jeden", "dwa", "trzy", "cztery", "pięć", "sześć", "siedem", "osiem", "dziewięć"],
+    ["", "jeden", "dwa", "trzy", "cztery", "pięć", "sześć", "siedem", "osiem", "dziewięć"],
+]
+_TEENS = ["dziesięć", "jedenaście", "dwanaście", "trzynaście", "czternaście", "piętnaście", "szesnaście", "siedemnaście", "osiemnaście", "dziewiętnaście"]
+_TENS = ["", "", "dwadzieścia", "trzydzieści", "czterdzieści", "pięćdziesiąt", "sześćdziesiąt", "siedemdziesiąt", "osiemdziesiąt", "dziewięćdziesiąt"]
+_HUNDREDS = ["", "sto", "dwieście", "trzysta", "czterysta", "pięćset", "sześćset", "siedemset", "osiemset", "dziewięćset"]
+_GROUPS = [
+    ("złoty", "złote", "złotych"),
+    ("tysiąc", "tysiące", "tysięcy"),
+    ("milion", "miliony", "milionów"),
+    ("miliard", "miliardy", "miliardów"),
+]
+_GROSZ_FORMS = ("grosz", "grosze", "groszy")
+
+
+def _declension(number: int, forms: Tuple[str, str, str]) -> str:
+    if number == 1:
+        return forms[0]
+    if 2 <= number % 10 <= 4 and not (12 <= number % 100 <= 14):
+        return forms[1]
+    return forms[2]
+
+
+def _group_to_words(group: int, hide_one: bool) -> str:
+    if group == 0:
+        return ""
+    words: list[str] = []
+    hundreds = group // 100
+    tens_units = group % 100
+    tens = tens_units // 10
+    units = tens_units % 10
+
+    if hundreds:
+        words.append(_HUNDREDS[hundreds])
+    if tens_units:
+        if tens_units < 10:
+            if tens_units == 1 and hide_one and not hundreds:
+                pass
+            else:
+                words.append(_UNITS[1][units])
+        elif tens_units < 20:
+            words.append(_TEENS[tens_units - 10])
+        else:
+            words.append(_TENS[tens])
+            if units:
+                words.append(_UNITS[1][units])
+    return " ".join(words).strip()
+
+
+def number_to_words_pl(value: Decimal) -> str:
+    value = value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    zloty = int(value)
+    grosze = int((value * 100) % 100)
+
+    if zloty == 0:
+        words = "zero z\u0142otych"
+    else:
+        parts: list[str] = []
+        groups: list[int] = []
+        tmp = zloty
+        while tmp > 0:
+            groups.append(tmp % 1000)
+            tmp //= 1000
+
+        for idx, group in enumerate(groups):
+            if group == 0:
+                continue
+            hide_one = idx > 0
+            group_words = _group_to_words(group, hide_one)
+            forms = _GROUPS[idx] if idx < len(_GROUPS) else _GROUPS[-1]
+            part = f"{group_words} {_declension(group, forms)}".strip()
+            parts.insert(0, part)
+        words = " ".join(parts).strip()
+
+    grosze_part = f"{grosze:02d} {_declension(grosze, _GROSZ_FORMS)}"
+    return f"{words}, {grosze_part}".strip()
+
+
+def invoice_pdf_bytes(invoice: Invoice, items: Sequence[InvoiceLine]) -> bytes:
+    document_type = (invoice.document_type or "").lower()
+    pdf, font = _pdf_with_title(None)
+    if document_type == "paragon":
+        _render_paragon_document(pdf, font, invoice, items)
+    else:
+        _render_invoice_document(pdf, font, invoice, items)
+    return _pdf_output(pdf)
+
+
+def _render_invoice_document(pdf: FPDF, font: str, invoice: Invoice, items: Sequence[InvoiceLine]) -> None:
+    sale_label = (
+        invoice.sale_date.strftime("%Y-%m-%d")
+        if invoice.sale_date
+        else invoice.issue_date.strftime("%Y-%m-%d")
+    )
+    doc_label = (invoice.document_type or "Dokument").strip().capitalize() or "Dokument"
+    number_label = (invoice.number or "").strip() or "-"
+
+    pdf.set_font(font, size=18)
+    pdf.cell(0, 10, doc_label, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font(font, size=12)
+    pdf.cell(0, 7, number_label, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(4)
+
+    meta_rows = [
+        ("Miejsce wystawienia", invoice.issue_place or DEFAULT_ISSUE_PLACE),
+        ("Data wystawienia", invoice.issue_date.strftime("%Y-%m-%d")),
+        ("Data sprzedaży", sale_label),
+    ]
+    meta_width = 82
+    gap = 8
+    block_top_y = pdf.get_y()
+    buyer_width = max(90, pdf.w - pdf.l_margin - pdf.r_margin - meta_width - gap)
+
+    pdf.set_xy(pdf.l_margin, block_top_y)
+    pdf.set_fill_color(235, 235, 235)
+    pdf.set_font(font, style="B", size=10)
+    pdf.multi_cell(buyer_width, 7, "Nabywca", border=1, fill=True)
+    pdf.set_font(font, size=10)
+    client_name = (invoice.client_name or "Klient detaliczny").strip() or "Klient detaliczny"
+    nip_value = f"NIP: {invoice.client_tax_id}" if invoice.client_tax_id else "NIP: -"
+    address_lines = [line.strip() for line in (invoice.client_address or "").splitlines() if line.strip()] or ["-"]
+    buyer_lines = [client_name, nip_value, *address_lines]
+    pdf.set_x(pdf.l_margin)
+    pdf.multi_cell(buyer_width, 5.2, "\n".join(buyer_lines), border=1, align="L")
+    buyer_bottom = pdf.get_y()
+
+    meta_x = pdf.w - pdf.r_margin - meta_width
+    pdf.set_xy(meta_x, block_top_y)
+    pdf.set_fill_color(241, 241, 241)
+    for label, value in meta_rows:
+        pdf.set_xy(meta_x, pdf.get_y())
+        pdf.set_font(font, style="B", size=9)
+        pdf.multi_cell(meta_width, 6, label, border=1, fill=True)
+        pdf.set_xy(meta_x, pdf.get_y())
+        pdf.set_font(font, size=10)
+        pdf.multi_cell(meta_width, 7, value or "-", border=1)
+    meta_bottom = pdf.get_y()
+    pdf.set_y(max(buyer_bottom, meta_bottom) + 8)
+
+    pdf.set_font(font, size=10)
+    pdf.cell(0, 7, "Sprzedawca", fill=True, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font(font, size=12)
+    pdf.cell(0, 7, SELLER.name, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font(font, size=10)
+    for line in SELLER.address_lines:
+        pdf.cell(0, 6, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    if SELLER.bank_account:
+        pdf.cell(0, 6, f"Konto bankowe: {SELLER.bank_account}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    if SELLER.extra_info:
+        for key, value in SELLER.extra_info.items():
+            pdf.cell(0, 6, f"{key.capitalize()}: {value}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(4)
+
+    headers = ["Lp.", "Nazwa pełna", "Ilość", "Jm", "Cena brutto", "Wartość brutto"]
+    widths = [10, 88, 20, 12, 30, 30]
+    _pdf_table_header(pdf, font, headers, widths, cell_height=9)
+
+    if not items:
+        pdf.cell(sum(widths), 7, "Brak pozycji", border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    else:
+        aligns = ["R", "L", "R", "L", "R", "R"]
+        for idx, item in enumerate(items, 1):
+            row = [
+                str(idx),
+                (item.description or "").strip() or "-",
+                _format_quantity(item.quantity),
+                item.unit or "",
+                _format_currency(item.unit_price_gross),
+                _format_currency(item.line_total_gross),
+            ]
+            _pdf_table_row(pdf, widths, row, aligns=aligns, line_height=8)
+
+    pdf.set_font(font, style="B", size=10)
+    pdf.set_fill_color(243, 246, 250)
+    left_span = sum(widths[:-2])
+    total_row_height = 9.5
+    x_start = pdf.get_x()
+    y_start = pdf.get_y()
+    pdf.cell(left_span, total_row_height, "", border=1, fill=True)
+    pdf.cell(widths[-2], total_row_height, "", border=1, fill=True)
+    pdf.cell(widths[-1], total_row_height, "", border=1, fill=True)
+    pdf.set_xy(x_start + left_span, y_start)
+    pdf.cell(widths[-2], total_row_height, "Razem (PLN)", border=0, align="R")
+    pdf.set_xy(x_start + left_span + widths[-2], y_start)
+    pdf.cell(widths[-1], total_row_height, _format_currency(invoice.gross_amount), border=0, align="R")
+    pdf.set_y(y_start + total_row_height)
+    pdf.ln(4)
+
+    amount_paid, remaining = _payment_breakdown(invoice)
+    table_width = sum(widths)
+    value_width = widths[-1] + widths[-2]
+    label_width = table_width - value_width
+    words = number_to_words_pl(invoice.gross_amount)
+
+    summary_rows = [
+        (
+            "DO ZAPŁATY",
+            f"{_format_currency(invoice.gross_amount)}",
+            {
+                "fill": (232, 232, 232),
+                "label_style": "B",
+                "label_size": 10,
+                "label_align": "C",
+                "value_style": "B",
+                "value_size": 14,
+                "value_align": "C",
+            },
+        ),
+        ("Słownie", words, {"label_style": "B"}),
+        (
+            "Sposób płatności",
+            invoice.payment_method or "BLIK",
+            {"label_style": "B"},
+        ),
+        (
+            "Zapłacono",
+            _format_currency(amount_paid),
+            {"label_style": "B", "value_align": "R"},
+        ),
+        (
+            "Pozostało do zapłaty",
+            _format_currency(remaining),
+            {"label_style": "B", "value_align": "R", "value_style": "B"},
+        ),
+    ]
+    _draw_labeled_rows(pdf, font, label_width, value_width, summary_rows, line_height=5.8)
+    pdf.ln(4)
+
+    if invoice.notes:
+        pdf.set_font(font, size=10)
+        pdf.multi_cell(0, 6, f"Uwagi: {invoice.notes}")
+        pdf.ln(4)
+
+    signature_width = 72
+    signature_height = 18
+    signature_y = pdf.get_y()
+    right_signature_x = pdf.w - pdf.r_margin - signature_width
+
+    pdf.rect(pdf.l_margin, signature_y, signature_width, signature_height)
+    pdf.set_xy(pdf.l_margin, signature_y + 4)
+    pdf.set_font(font, style="B", size=10)
+    pdf.cell(signature_width, 6, "Jakub Lis", align="C")
+    pdf.set_xy(pdf.l_margin, signature_y + 10)
+    pdf.set_font(font, size=9)
+    pdf.cell(signature_width, 5, "Wystawił(a)", align="C")
+
+    pdf.rect(right_signature_x, signature_y, signature_width, signature_height)
+    pdf.set_xy(right_signature_x, signature_y + 4)
+    pdf.set_font(font, style="B", size=10)
+    pdf.cell(signature_width, 6, "Odebrał(a)", align="C")
+    pdf.set_xy(right_signature_x, signature_y + 10)
+    pdf.set_font(font, size=9)
+    pdf.cell(signature_width, 5, "czytelny podpis", align="C")
+
+    pdf.set_y(signature_y + signature_height + 2)
+
+
+def _render_paragon_document(pdf: FPDF, font: str, invoice: Invoice, items: Sequence[InvoiceLine]) -> None:
+    sale_label = (
+        invoice.sale_date.strftime("%Y-%m-%d")
+        if invoice.sale_date
+        else invoice.issue_date.strftime("%Y-%m-%d")
+    )
+
+    number_label = (invoice.number or "").strip() or "-"
+    match = re.match(r"(?i)paragon\s*(.*)", number_label)
+    display_number = match.group(1).strip() if match and match.group(1).strip() else number_label
+
+    pdf.set_font(font, size=18)
+    pdf.cell(0, 10, "Paragon", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font(font, size=12)
+    pdf.cell(0, 7, display_number, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(4)
+
+    meta_rows = [
+        ("Miejsce wystawienia", invoice.issue_place or DEFAULT_ISSUE_PLACE),
+        ("Data wystawienia", invoice.issue_date.strftime("%Y-%m-%d")),
+        ("Data sprzedaży", sale_label),
+    ]
+    meta_width = 82
+    meta_x = pdf.w - pdf.r_margin - meta_width
+    meta_top_y = pdf.get_y()
+    pdf.set_fill_color(241, 241, 241)
+    current_meta_y = meta_top_y
+    for label, value in meta_rows:
+        pdf.set_xy(meta_x, current_meta_y)
+        pdf.set_font(font, style="B", size=9)
+        pdf.multi_cell(meta_width, 6, label, border=1, fill=True)
+        pdf.set_xy(meta_x, pdf.get_y())
+        pdf.set_font(font, size=10)
+        pdf.multi_cell(meta_width, 7, value or "-", border=1)
+        current_meta_y = pdf.get_y()
+    meta_bottom = current_meta_y
+
+    pdf.set_xy(meta_x, meta_bottom + 2)
+    pdf.set_fill_color(235, 235, 235)
+    pdf.set_font(font, style="B", size=10)
+    pdf.multi_cell(meta_width, 7, "Sprzedawca", border=1, fill=True, align="C")
+    pdf.set_font(font, size=10)
+    seller_lines = [SELLER.name, *SELLER.address_lines]
+    if SELLER.bank_account:
+        seller_lines.append(f"Konto bankowe: {SELLER.bank_account}")
+    if SELLER.extra_info:
+        for key, value in SELLER.extra_info.items():
+            seller_lines.append(f"{key.capitalize()}: {value}")
+    for line in seller_lines:
+        pdf.set_xy(meta_x, pdf.get_y())
+        pdf.multi_cell(meta_width, 6, line, border=1)
+    seller_bottom = pdf.get_y()
+
+    pdf.set_y(max(seller_bottom, meta_top_y) + 10)
+    pdf.set_x(pdf.l_margin)
+
+    headers = ["Lp.", "Nazwa pełna", "Ilość", "Jm", "Cena brutto", "Wartość brutto"]
+    widths = [10, 88, 20, 12, 30, 30]
+    _pdf_table_header(pdf, font, headers, widths, cell_height=9)
+
+    if not items:
+        pdf.cell(sum(widths), 7, "Brak pozycji", border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    else:
+        aligns = ["R", "L", "R", "L", "R", "R"]
+        for idx, item in enumerate(items, 1):
+            row = [
+                str(idx),
+                (item.description or "").strip() or "-",
+                _format_quantity(item.quantity),
+                item.unit or "",
+                _format_currency_plain(item.unit_price_gross),
+                _format_currency_plain(item.line_total_gross),
+            ]
+            _pdf_table_row(pdf, widths, row, aligns=aligns, line_height=8.5)
+
+    pdf.set_font(font, style="B", size=10)
+    pdf.set_fill_color(243, 246, 250)
+    left_span = sum(widths[:-2])
+    total_row_height = 9.5
+    x_start = pdf.get_x()
+    y_start = pdf.get_y()
+    pdf.cell(left_span, total_row_height, "", border=1, fill=True)
+    pdf.cell(widths[-2], total_row_height, "", border=1, fill=True)
+    pdf.cell(widths[-1], total_row_height, "", border=1, fill=True)
+    pdf.set_xy(x_start + left_span, y_start)
+    pdf.cell(widths[-2], total_row_height, "Razem (PLN)", border=0, align="R")
+    pdf.set_xy(x_start + left_span + widths[-2], y_start)
+    pdf.cell(widths[-1], total_row_height, _format_currency_plain(invoice.gross_amount), border=0, align="R")
+    pdf.set_y(y_start + total_row_height)
+    pdf.ln(4)
+
+    amount_paid, remaining = _payment_breakdown(invoice)
+    table_width = sum(widths)
+    value_width = widths[-1] + widths[-2]
+    label_width = table_width - value_width
+    words = number_to_words_pl(invoice.gross_amount)
+
+    summary_rows = [
+        (
+            "DO ZAPŁATY",
+            f"{_format_currency_plain(invoice.gross_amount)} PLN",
+            {
+                "fill": (232, 232, 232),
+                "label_style": "B",
+                "label_size": 10,
+                "label_align": "C",
+                "value_style": "B",
+                "value_size": 14,
+                "value_align": "C",
+            },
+        ),
+        ("Słownie", words, {"label_style": "B"}),
+        (
+            "Sposób płatności",
+            invoice.payment_method or "Inny",
+            {"label_style": "B"},
+        ),
+        (
+            "Zapłacono",
+            f"{_format_currency_plain(amount_paid)} PLN",
+            {"label_style": "B", "value_align": "R"},
+        ),
+        (
+            "Pozostało do zapłaty",
+            f"{_format_currency_plain(remaining)} PLN",
+            {"label_style": "B", "value_align": "R", "value_style": "B"},
+        ),
+    ]
+    _draw_labeled_rows(pdf, font, label_width, value_width, summary_rows, line_height=5.8)
+    pdf.ln(4)
+
+    if invoice.notes:
+        pdf.set_font(font, size=10)
+        pdf.multi_cell(0, 6, f"Uwagi: {invoice.notes}")
+        pdf.ln(4)
+
+    signature_width = 72
+    signature_height = 18
+    signature_y = pdf.get_y()
+    right_signature_x = pdf.w - pdf.r_margin - signature_width
+
+    pdf.rect(pdf.l_margin, signature_y, signature_width, signature_height)
+    pdf.set_xy(pdf.l_margin, signature_y + 4)
+    pdf.set_font(font, style="B", size=10)
+    pdf.cell(signature_width, 6, "Jakub Lis", align="C")
+    pdf.set_xy(pdf.l_margin, signature_y + 10)
+    pdf.set_font(font, size=9)
+    pdf.cell(signature_width, 5, "Wystawił(a)", align="C")
+
+    pdf.rect(right_signature_x, signature_y, signature_width, signature_height)
+    pdf.set_xy(right_signature_x, signature_y + 4)
+    pdf.set_font(font, style="B", size=10)
+    pdf.cell(signature_width, 6, "Odebrał(a)", align="C")
+    pdf.set_xy(right_signature_x, signature_y + 10)
+    pdf.set_font(font, size=9)
+    pdf.cell(signature_width, 5, "czytelny podpis", align="C")
+
+    pdf.set_y(signature_y + signature_height + 2)
+
+
+def _draw_labeled_rows(
+    pdf: FPDF,
+    font: str,
+    label_width: float,
+    value_width: float,
+    rows: Sequence[Tuple[str, str, dict | None]],
+    line_height: float = 6.0,
+) -> None:
+    label_width = max(20.0, label_width)
+    value_width = max(20.0, value_width)
+    row_start_x = pdf.l_margin
+
+    for label, value, options in rows:
+        opts = options or {}
+        padding_x = opts.get("padding_x", 1.4)
+        padding_y = opts.get("padding_y", 1.2)
+        label_style = opts.get("label_style", "")
+        label_size = opts.get("label_size", 9)
+        value_style = opts.get("value_style", "")
+        value_size = opts.get("value_size", 10)
+        label_align = opts.get("label_align", "L")
+        value_align = opts.get("value_align", "L")
+        fill = opts.get("fill")
+
+        label_box_width = max(4.0, label_width - 2 * padding_x)
+        value_box_width = max(4.0, value_width - 2 * padding_x)
+
+        pdf.set_font(font, style=label_style, size=label_size)
+        label_lines = pdf.multi_cell(
+            label_box_width, line_height, (label or "-"), split_only=True
+        )
+        pdf.set_font(font, style=value_style, size=value_size)
+        value_lines = pdf.multi_cell(
+            value_box_width, line_height, (value or "-"), split_only=True
+        )
+        label_count = max(1, len(label_lines))
+        value_count = max(1, len(value_lines))
+        content_height = line_height * max(label_count, value_count)
+        row_height = content_height + 2 * padding_y
+        row_y = pdf.get_y()
+
+        if fill:
+            pdf.set_fill_color(*fill)
+            pdf.rect(row_start_x, row_y, label_width + value_width, row_height, style="F")
+
+        pdf.rect(row_start_x, row_y, label_width, row_height)
+        pdf.rect(row_start_x + label_width, row_y, value_width, row_height)
+
+        pdf.set_xy(row_start_x + padding_x, row_y + padding_y)
+        pdf.set_font(font, style=label_style, size=label_size)
+        pdf.multi_cell(
+            label_box_width, line_height, (label or "-"), border=0, align=label_align
+        )
+
+        pdf.set_xy(row_start_x + label_width + padding_x, row_y + padding_y)
+        pdf.set_font(font, style=value_style, size=value_size)
+        pdf.multi_cell(
+            value_box_width, line_height, (value or "-"), border=0, align=value_align
+        )
+
+        pdf.set_y(row_y + row_height)
+
+
+def _pdf_table_header(
+    pdf: FPDF, font: str, headers: Sequence[str], widths: Sequence[float], cell_height: float = 7.0
+) -> None:
+    pdf.set_font(font, style="B", size=10)
+    pdf.set_fill_color(243, 246, 250)
+    for header, width in zip(headers, widths):
+        pdf.cell(width, cell_height, header, border=1, fill=True)
+    pdf.ln()
+
+
+def _payment_breakdown(invoice: Invoice) -> Tuple[Decimal, Decimal]:
+    amount_paid = Decimal(invoice.amount_paid) if invoice.amount_paid is not None else Decimal("0")
+    remaining = max(invoice.gross_amount - amount_paid, Decimal("0"))
+    return amount_paid, remaining
+
+
+REGISTER_ROW_HEIGHT = 7
+
+
+def _register_summary_row(
+    pdf: FPDF,
+    font: str,
+    widths: Sequence[float],
+    amount_columns: Sequence[int],
+    label: str,
+    sums: Sequence[Decimal],
+) -> None:
+    first = amount_columns[0]
+    values = iter(sums)
+    pdf.set_font(font, style="B", size=9)
+    pdf.cell(sum(widths[:first]), REGISTER_ROW_HEIGHT, label, border=1)
+    for index in range(first, len(widths)):
+        if index in amount_columns:
+            pdf.cell(widths[index], REGISTER_ROW_HEIGHT, _format_currency(next(values)), border=1, align="R")
+        else:
+            pdf.cell(widths[index], REGISTER_ROW_HEIGHT, "", border=1)
+    pdf.ln()
+    pdf.set_font(font, size=10)
+
+
+def _register_table(
+    pdf: FPDF,
+    font: str,
+    headers: Sequence[str],
+    widths: Sequence[float],
+    amount_columns: Sequence[int],
+    rows: Iterable[Tuple[Sequence[str], Sequence[Decimal]]],
+) -> List[Decimal]:
+    # Wiersze (komórki, kwoty) przychodzą strumieniowo; trzymamy tylko sumy.
+    # Na dole każdej strony suma strony i kwota do przeniesienia, na górze
+    # następnej - nagłówek tabeli i kwota z przeniesienia.
+    page_sums = [Decimal("0")] * len(amount_columns)
+    totals = [Decimal("0")] * len(amount_columns)
+    _pdf_table_header(pdf, font, headers, widths)
+    pdf.set_font(font, size=10)
+    for cells, amounts in rows:
+        if pdf.get_y() + 3 * REGISTER_ROW_HEIGHT > pdf.page_break_trigger:
+            _register_summary_row(pdf, font, widths, amount_columns, "Suma strony", page_sums)
+            _register_summary_row(pdf, font, widths, amount_columns, "Do przeniesienia", totals)
+            pdf.add_page()
+            _pdf_table_header(pdf, font, headers, widths)
+            _register_summary_row(pdf, font, widths, amount_columns, "Z przeniesienia", totals)
+            page_sums = [Decimal("0")] * len(amount_columns)
+        for index, (value, width) in enumerate(zip(cells, widths)):
+            align = "R" if index in amount_columns else "L"
+            pdf.cell(width, REGISTER_ROW_HEIGHT, value, border=1, align=align)
+        pdf.ln()
+        page_sums = [total + amount for total, amount in zip(page_sums, amounts)]
+        totals = [total + amount for total, amount in zip(totals, amounts)]
+    _register_summary_row(pdf, font, widths, amount_columns, "Suma strony", page_sums)
+    _register_summary_row(pdf, font, widths, amount_columns, "Razem", totals)
+    return totals
+
+
+def _register_start(title: str, period: str | None, documents: Iterable):
+    # Zwraca (pdf, font, wiersze) albo (pdf, font, None) dla pustego zestawienia.
+    pdf, font = _pdf_with_title(title)
+    if period:
+        pdf.cell(0, 6, f"Okres: {period}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(2)
+    iterator = iter(documents)
+    first = next(iterator, None)
+    if first is None:
+        return pdf, font, None
+    return pdf, font, itertools.chain([first], iterator)
+
+
+def _trim(value: str | None, limit: int) -> str:
+    value = value or ""
+    return value if len(value) <= limit else value[: limit - 3] + "..."
+
+
+def sales_register_pdf_bytes(invoices: Iterable[Invoice], period: str | None = None) -> bytes:
+    pdf, font, invoices = _register_start("Ewidencja sprzedaży", period, invoices)
+    if invoices is None:
+        pdf.multi_cell(0, 6, "Brak dokumentów sprzedażowych w wybranym okresie.")
+        return _pdf_output(pdf)
+
+    headers = ["Data", "Numer", "Kontrahent", "Netto", "VAT", "Brutto"]
+    widths = [22, 34, 58, 24, 22, 30]
+    rows = (
+        (
+            [
+                invoice.issue_date.strftime("%Y-%m-%d"),
+                _trim(invoice.number, 20),
+                _trim(invoice.client_name, 32),
+                _format_currency(invoice.net_amount),
+                _format_currency(invoice.gross_amount - invoice.net_amount),
+                _format_currency(invoice.gross_amount),
+            ],
+            [invoice.net_amount, invoice.gross_amount - invoice.net_amount, invoice.gross_amount],
+        )
+        for invoice in invoices
+    )
+    _register_table(pdf, font, headers, widths, (3, 4, 5), rows)
+    return _pdf_output(pdf)
+
+
+def ndg_register_pdf_bytes(documents: Iterable[NDGDocument], period: str | None = None) -> bytes:
+    pdf, font, documents = _register_start("Dokumenty NDG", period, documents)
+    if documents is None:
+        pdf.multi_cell(0, 6, "Brak dokumentów kosztowych NDG w wybranym okresie.")
+        return _pdf_output(pdf)
+
+    headers = ["Data", "Numer", "Dostawca", "Kwota", "Uwagi"]
+    widths = [24, 35, 56, 25, 50]
+    rows = (
+        (
+            [
+                doc.document_date.strftime("%Y-%m-%d"),
+                _trim(doc.number, 20),
+                _trim(doc.supplier_name, 32),
+                _format_currency(doc.amount),
+                _trim(doc.description, 28),
+            ],
+            [doc.amount],
+        )
+        for doc in documents
+    )
+    _register_table(pdf, font, headers, widths, (3,), rows)
+    return _pdf_output(pdf)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from .models import Invoice
+from .pdf import invoice_pdf_bytes
+from .pdf_cache import cached_pdf_path, invoice_pdf_filename, invoice_pdf_key, store_pdf
+
+# Paczka PDF-ów z miesiąca: dokumenty bez pliku w pdf_cache renderujemy
+# równolegle w procesach (fpdf2 to czysty Python, wątki nie pomogą przez GIL),
+# a ZIP wysyłamy strumieniowo - każdy PDF trafia do archiwum, gdy jest gotowy.
+# Pula jest jedna na proces aplikacji i startuje przy pierwszej paczce;
+# "spawn", bo fork procesu serwera z wątkami i otwartą bazą jest ryzykowny.
+BUNDLE_WORKERS = max(1, os.cpu_count() or 1)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _bundle_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=BUNDLE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_pool.shutdown, cancel_futures=True)
+        return _pool
+
+
+def _render_invoice_pdf(fields: Dict[str, object]) -> bytes:
+    # Wykonywane w procesie roboczym - dostaje same wartości kolumn, bez sesji.
+    invoice = Invoice(**fields)
+    return invoice_pdf_bytes(invoice, invoice.items)
+
+
+class _ZipStream(io.RawIOBase):
+    # Plik tylko do zapisu: zipfile dopisuje dane, a generator odbiera je
+    # po każdym dokumencie (bez seek, więc zipfile używa deskryptorów danych).
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _rendered_pdfs(invoices: Sequence[Invoice]) -> Iterator[Tuple[str, bytes]]:
+    cached: List[Tuple[str, Path]] = []
+    pending = []
+    for invoice in invoices:
+        key = invoice_pdf_key(invoice)
+        path = cached_pdf_path(key)
+        if path is not None:
+            cached.append((invoice_pdf_filename(invoice), path))
+        else:
+            fields = {column.key: getattr(invoice, column.key) for column in Invoice.__table__.columns}
+            pending.append((invoice_pdf_filename(invoice), key, fields))
+
+    # Renderowanie zlecamy przed wysłaniem plików z pdf_cache, żeby procesy
+    # pracowały, gdy strumień jest zajęty gotowymi dokumentami.
+    futures = {}
+    if pending:
+        pool = _bundle_pool()
+        futures = {pool.submit(_render_invoice_pdf, fields): (name, key) for name, key, fields in pending}
+    try:
+        for name, path in cached:
+            yield name, path.read_bytes()
+        for future in as_completed(futures):
+            name, key = futures[future]
+            data = future.result()
+            store_pdf(key, data)
+            yield name, data
+    finally:
+        # Przerwane pobieranie - nie renderujemy reszty.
+        for future in futures:
+            future.cancel()
+
+
+def invoice_pdf_bundle(invoices: Sequence[Invoice]) -> Iterator[bytes]:
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in _rendered_pdfs(invoices):
+            archive.writestr(name, data)
+            yield stream.drain()
+    yield stream.drain()
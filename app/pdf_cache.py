@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from flask import current_app
+
+from .config import DEFAULT_ISSUE_PLACE, SELLER
+from .models import Invoice
+from .pdf import invoice_pdf_bytes
+
+# Wygenerowane PDF-y dokumentów sprzedaży w instance/pdf_cache/<skrót>.pdf.
+# Skrót liczymy z pól dokumentu (w tym items_json), danych sprzedawcy i wersji
+# szablonu, więc zmiana czegokolwiek daje nowy plik, a stary nigdy nie zostanie
+# wysłany. Edycja i usunięcie dokumentu od razu kasują jego poprzedni plik.
+PDF_TEMPLATE_VERSION = 1
+PDF_CACHE_DIR = "pdf_cache"
+
+
+def pdf_cache_dir() -> Path:
+    return Path(current_app.instance_path) / PDF_CACHE_DIR
+
+
+def invoice_pdf_key(invoice: Invoice) -> str:
+    fields = {column.key: getattr(invoice, column.key) for column in Invoice.__table__.columns}
+    payload = {
+        "version": PDF_TEMPLATE_VERSION,
+        "invoice": fields,
+        "seller": dataclasses.asdict(SELLER),
+        "issue_place": DEFAULT_ISSUE_PLACE,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def invoice_pdf_filename(invoice: Invoice) -> str:
+    name = f"{invoice.document_type}_{invoice.number}".replace("/", "_").replace("\\", "_")
+    return f"{name}.pdf"
+
+
+def _cache_path(key: str) -> Path:
+    return pdf_cache_dir() / f"{key}.pdf"
+
+
+def cached_pdf_path(key: str) -> Path | None:
+    path = _cache_path(key)
+    return path if path.exists() else None
+
+
+def store_pdf(key: str, data: bytes) -> Path:
+    # Zapis przez plik tymczasowy i os.replace - równoległe żądanie nie
+    # zobaczy niedopisanego pliku.
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def invoice_pdf_file(invoice: Invoice, key: str | None = None) -> Path:
+    key = key or invoice_pdf_key(invoice)
+    return cached_pdf_path(key) or store_pdf(key, invoice_pdf_bytes(invoice, invoice.items))
+
+
+def discard_cached_pdf(key: str) -> None:
+    _cache_path(key).unlink(missing_ok=True)
+
+
+def clear_pdf_cache() -> None:
+    shutil.rmtree(pdf_cache_dir(), ignore_errors=True)
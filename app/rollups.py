@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Sequence, Tuple
+
+from sqlalchemy import Integer, cast, delete, event, func, insert, inspect, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .aggregation import MonthKey, month_label, months_span, rollup_series, trailing_months, year_months
+from .extensions import db
+from .migrations import table_exists
+from .models import ArchivedYear, DataVersion, Invoice, MonthlyTotal, NDGDocument
+
+# Licznik w tabeli data_versions zwiększany przy każdym zapisie dokumentów.
+DOCUMENTS_VERSION = "documents"
+
+
+# Zestawienie monthly_totals jest aktualizowane w tej samej transakcji co zapis
+# dokumentu: po każdym flushu zbieramy dotknięte miesiące, a przed commitem
+# przeliczamy tylko te miesiące. Operacje masowe (Query.delete) przebudowują
+# zestawienie jawnie przez rebuild_monthly_totals().
+_ROLLUP_PENDING_KEY = "monthly_totals_pending"
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_rollup_months(session, flush_context) -> None:
+    pending = session.info.setdefault(_ROLLUP_PENDING_KEY, set())
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        if isinstance(obj, Invoice):
+            attribute = "issue_date"
+        elif isinstance(obj, NDGDocument):
+            attribute = "document_date"
+        else:
+            continue
+        history = inspect(obj).attrs[attribute].history
+        for value in [*history.added, *history.unchanged, *history.deleted]:
+            if isinstance(value, date):
+                pending.add((value.year, value.month))
+
+
+@event.listens_for(db.session, "before_commit")
+def _apply_rollup_months(session) -> None:
+    session.flush()
+    pending = session.info.pop(_ROLLUP_PENDING_KEY, None)
+    if pending:
+        connection = session.connection()
+        _refresh_monthly_totals(connection, pending)
+        bump_data_version(connection, DOCUMENTS_VERSION)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _discard_rollup_months(session, previous_transaction) -> None:
+    session.info.pop(_ROLLUP_PENDING_KEY, None)
+
+
+_ROLLUP_COLUMNS = [
+    "year",
+    "month",
+    "document_type",
+    "gross_amount",
+    "net_amount",
+    "ndg_cost",
+    "document_count",
+]
+
+
+def rollup_source_selects(start: date | None = None, end: date | None = None):
+    sales_year = cast(func.strftime("%Y", Invoice.issue_date), Integer)
+    sales_month = cast(func.strftime("%m", Invoice.issue_date), Integer)
+    sales = select(
+        sales_year,
+        sales_month,
+        Invoice.document_type,
+        func.coalesce(func.sum(Invoice.gross_amount), 0),
+        func.coalesce(func.sum(Invoice.net_amount), 0),
+        literal(0),
+        func.count(Invoice.id),
+    ).group_by(sales_year, sales_month, Invoice.document_type)
+
+    ndg_year = cast(func.strftime("%Y", NDGDocument.document_date), Integer)
+    ndg_month = cast(func.strftime("%m", NDGDocument.document_date), Integer)
+    ndg = select(
+        ndg_year,
+        ndg_month,
+        literal("ndg"),
+        literal(0),
+        literal(0),
+        func.coalesce(func.sum(NDGDocument.amount), 0),
+        func.count(NDGDocument.id),
+    ).group_by(ndg_year, ndg_month)
+
+    if start is not None and end is not None:
+        sales = sales.where(Invoice.issue_date >= start, Invoice.issue_date < end)
+        ndg = ndg.where(NDGDocument.document_date >= start, NDGDocument.document_date < end)
+    return sales, ndg
+
+
+def _insert_rollup_rows(connection, start: date | None = None, end: date | None = None) -> None:
+    for source in rollup_source_selects(start, end):
+        connection.execute(insert(MonthlyTotal).from_select(_ROLLUP_COLUMNS, source))
+
+
+def _refresh_monthly_totals(connection, months: Iterable[MonthKey]) -> None:
+    for key in sorted(set(months)):
+        start, end = months_span([key])
+        connection.execute(
+            delete(MonthlyTotal)
+            .where(MonthlyTotal.year == key[0])
+            .where(MonthlyTotal.month == key[1])
+        )
+        _insert_rollup_rows(connection, start, end)
+
+
+def rebuild_monthly_totals(connection) -> None:
+    # Lata przeniesione do archiwum (archive.py) nie mają już dokumentów
+    # w bazie głównej - ich wiersze zestawienia zostają bez zmian.
+    statement = delete(MonthlyTotal)
+    if table_exists(connection, ArchivedYear.__tablename__):
+        statement = statement.where(MonthlyTotal.year.not_in(select(ArchivedYear.year)))
+    connection.execute(statement)
+    _insert_rollup_rows(connection)
+    bump_data_version(connection, DOCUMENTS_VERSION)
+
+
+def bump_data_version(connection, name: str) -> None:
+    statement = sqlite_insert(DataVersion).values(name=name, value=1)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DataVersion.name],
+            set_={"value": DataVersion.value + 1},
+        )
+    )
+
+
+@contextmanager
+def advanced_data_versions():
+    # Wersje służą za ETag-i i klucze katalogu w przeglądarce, więc nie mogą
+    # się cofnąć przy podmianie pliku bazy (przywrócenie kopii): po podmianie
+    # każdy licznik dostaje max(sprzed podmiany, z kopii) + 1.
+    previous = dict(db.session.execute(select(DataVersion.name, DataVersion.value)).all())
+    yield
+    restored = dict(db.session.execute(select(DataVersion.name, DataVersion.value)).all())
+    rows = [
+        {"name": name, "value": max(previous.get(name, 0), restored.get(name, 0)) + 1}
+        for name in sorted(previous.keys() | restored.keys())
+    ]
+    if rows:
+        statement = sqlite_insert(DataVersion)
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[DataVersion.name],
+                set_={"value": statement.excluded.value},
+            ),
+            rows,
+        )
+    db.session.commit()
+
+
+def data_version(name: str) -> int:
+    return db.session.query(DataVersion.value).filter_by(name=name).scalar() or 0
+
+
+def sales_by_month(months: Sequence[MonthKey]) -> List[Decimal]:
+    return rollup_series(
+        db.session, MonthlyTotal.year, MonthlyTotal.month, MonthlyTotal.gross_amount, months
+    )
+
+
+def ndg_costs_by_month(months: Sequence[MonthKey]) -> List[Decimal]:
+    return rollup_series(
+        db.session, MonthlyTotal.year, MonthlyTotal.month, MonthlyTotal.ndg_cost, months
+    )
+
+
+def aggregate_ndg_documents(reference: date, months_back: int = 6) -> Tuple[List[str], List[Decimal]]:
+    months = trailing_months(reference, months_back)
+    return [month_label(key) for key in months], ndg_costs_by_month(months)
+
+
+def annual_sales_by_month(year: int) -> Tuple[List[str], List[Decimal]]:
+    months = year_months(year)
+    return [month_label(key) for key in months], sales_by_month(months)
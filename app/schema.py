@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import threading
+from functools import partial
+from typing import List
+
+from flask import current_app
+from sqlalchemy import text
+
+from .archive import archived_max_id
+from .change_log import backfill_change_log
+from .clients import backfill_clients
+from .extensions import db
+from .migrations import Migration, add_column, read_schema_version, upgrade_schema
+from .line_items import backfill_invoice_items
+from .models import (
+    ArchivedYear,
+    ChangeLogEntry,
+    Client,
+    DataVersion,
+    DocumentSequence,
+    Invoice,
+    InvoiceItem,
+    Job,
+    MonthlyTotal,
+    NDGDocument,
+)
+from .numbering import rebuild_document_sequences
+from .rollups import rebuild_monthly_totals
+from .search import rebuild_search_index
+
+_SCHEMA_LOCK = threading.Lock()
+
+
+def initialize_database() -> None:
+    with db.engine.connect() as conn:
+        version = read_schema_version(conn)
+    if version is None or version < LATEST_SCHEMA_VERSION:
+        upgrade_database()
+    elif version > LATEST_SCHEMA_VERSION:
+        current_app.logger.warning(
+            "Baza ma schemat w wersji %s, nowszy niż obsługiwany (%s).",
+            version,
+            LATEST_SCHEMA_VERSION,
+        )
+
+
+def upgrade_database() -> List[str]:
+    applied = upgrade_schema(db.engine, SCHEMA_MIGRATIONS, db.metadata.create_all)
+    for step in applied:
+        current_app.logger.info("Migracja schematu: %s", step)
+    return applied
+
+
+def _migrate_rollup_tables(connection) -> None:
+    DataVersion.__table__.create(connection, checkfirst=True)
+    MonthlyTotal.__table__.create(connection, checkfirst=True)
+    rebuild_monthly_totals(connection)
+
+
+# Indeksy w postaci z chwili dodania danego kroku. Kroki nie mogą czytać
+# indeksów z bieżących modeli: np. unikalny ix_invoices_number_type da się
+# założyć dopiero po usunięciu duplikatów numerów w kroku 12.
+_HOT_QUERY_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_invoices_issue_date ON invoices (issue_date)",
+    "CREATE INDEX IF NOT EXISTS ix_invoices_type_issue_date ON invoices (document_type, issue_date)",
+    "CREATE INDEX IF NOT EXISTS ix_invoices_number_type ON invoices (number, document_type)",
+    "CREATE INDEX IF NOT EXISTS ix_ndg_documents_document_date ON ndg_documents (document_date)",
+    "CREATE INDEX IF NOT EXISTS ix_ndg_documents_number ON ndg_documents (number)",
+    "CREATE INDEX IF NOT EXISTS ix_ndg_attachments_document_id ON ndg_attachments (document_id)",
+)
+_LIST_ORDER_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_invoices_list_order ON invoices (issue_date, number, id)",
+    "CREATE INDEX IF NOT EXISTS ix_ndg_documents_list_order ON ndg_documents (document_date, number, id)",
+)
+_UNIQUE_NUMBER_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_invoices_number_type ON invoices (number, document_type)",
+)
+
+
+def _create_indexes(connection, statements) -> None:
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def _migrate_invoice_items(connection) -> None:
+    InvoiceItem.__table__.create(connection, checkfirst=True)
+    backfill_invoice_items(connection)
+
+
+# Kolumny kwot przechowywane od wersji 11 jako liczba groszy (MoneyGrosze).
+_MONEY_COLUMNS = {
+    "invoices": ("amount_paid", "net_amount", "gross_amount"),
+    "ndg_documents": ("amount",),
+    "service_templates": ("gross_price",),
+}
+
+
+def _migrate_money_to_grosze(connection) -> None:
+    # Typ kolumn w SQLite zostaje NUMERIC (liczby całkowite są w nim zapisywane
+    # jako INTEGER), zmieniamy tylko wartości. invoice_items i monthly_totals
+    # odtwarzamy od nowa - backfill zapisuje już przez MoneyGrosze.
+    for table, columns in _MONEY_COLUMNS.items():
+        assignments = ", ".join(
+            f"{column} = CAST(ROUND({column} * 100) AS INTEGER)" for column in columns
+        )
+        connection.execute(text(f"UPDATE {table} SET {assignments}"))
+    backfill_invoice_items(connection)
+    rebuild_monthly_totals(connection)
+
+
+def _migrate_document_sequences(connection) -> None:
+    DocumentSequence.__table__.create(connection, checkfirst=True)
+    # Starsze bazy mogły mieć powtórzone numery - dostają dopisek z id, bo
+    # inaczej nie da się założyć unikalnego indeksu (document_type, number).
+    duplicates = connection.execute(
+        text(
+            "SELECT id, number FROM invoices AS i WHERE EXISTS ("
+            "SELECT 1 FROM invoices AS o WHERE o.document_type = i.document_type"
+            " AND o.number = i.number AND o.id < i.id)"
+        )
+    ).all()
+    for invoice_id, number in duplicates:
+        renamed = f"{number} (duplikat #{invoice_id})"
+        connection.execute(
+            text("UPDATE invoices SET number = :number WHERE id = :id"),
+            {"number": renamed, "id": invoice_id},
+        )
+        current_app.logger.warning("Zduplikowany numer dokumentu %s zmieniony na %s.", number, renamed)
+    connection.execute(text("DROP INDEX IF EXISTS ix_invoices_number_type"))
+    _create_indexes(connection, _UNIQUE_NUMBER_INDEX)
+    rebuild_document_sequences(connection)
+
+
+def _migrate_clients(connection) -> None:
+    Client.__table__.create(connection, checkfirst=True)
+    backfill_clients(connection)
+
+
+def _migrate_change_log(connection) -> None:
+    ChangeLogEntry.__table__.create(connection, checkfirst=True)
+    backfill_change_log(connection)
+
+
+def _migrate_archived_years(connection) -> None:
+    ArchivedYear.__table__.create(connection, checkfirst=True)
+
+
+def _migrate_jobs(connection) -> None:
+    Job.__table__.create(connection, checkfirst=True)
+
+
+# Tabele dokumentów w postaci z kroku 18 - jak indeksy wyżej, krok nie może
+# brać kolumn z bieżących modeli, bo późniejsze kolumny dochodzą dalszymi krokami.
+_AUTOINCREMENT_TABLES = {
+    "invoices": (
+        "id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT",
+        "document_type VARCHAR(20) NOT NULL",
+        "number VARCHAR(120) NOT NULL",
+        "issue_date DATE NOT NULL",
+        "sale_date DATE",
+        "issue_place VARCHAR(120)",
+        "client_name VARCHAR(255) NOT NULL",
+        "client_tax_id VARCHAR(50)",
+        "client_address VARCHAR(255)",
+        "payment_method VARCHAR(120)",
+        "amount_paid INTEGER",
+        "items_json TEXT NOT NULL",
+        "net_amount INTEGER NOT NULL",
+        "tax_rate NUMERIC(5, 2) NOT NULL",
+        "gross_amount INTEGER NOT NULL",
+        "notes TEXT",
+        "internal_notes TEXT",
+    ),
+    "ndg_documents": (
+        "id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT",
+        "number VARCHAR(120) NOT NULL",
+        "document_date DATE NOT NULL",
+        "supplier_name VARCHAR(255) NOT NULL",
+        "description TEXT",
+        "amount INTEGER NOT NULL",
+        "file_reference VARCHAR(255)",
+        "internal_notes TEXT",
+    ),
+}
+
+
+def _rebuild_with_autoincrement(connection, name: str, floor: int) -> None:
+    # SQLite nie dodaje AUTOINCREMENT do istniejącej tabeli: nowa tabela,
+    # kopia wierszy, zamiana nazw i te same indeksy co wcześniej. Klucze obce
+    # nie są włączone (PRAGMA foreign_keys), więc DROP nie rusza tabel zależnych.
+    temp = f"{name}_new"
+    definitions = _AUTOINCREMENT_TABLES[name]
+    index_sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+        {"name": name},
+    ).scalars().all()
+    connection.execute(text(f"CREATE TABLE {temp} ({', '.join(definitions)})"))
+    columns = ", ".join(definition.split(" ", 1)[0] for definition in definitions)
+    connection.execute(text(f"INSERT INTO {temp} ({columns}) SELECT {columns} FROM {name}"))
+    connection.execute(text(f"DROP TABLE {name}"))
+    connection.execute(text(f"ALTER TABLE {temp} RENAME TO {name}"))
+    for statement in index_sql:
+        connection.execute(text(statement))
+    # Licznik zaczyna od najwyższego id w bazie i w archiwach lat.
+    seq = max(connection.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {name}")).scalar(), floor)
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name IN (:name, :temp)"), {"name": name, "temp": temp})
+    connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": name, "seq": seq})
+
+
+def _migrate_autoincrement_ids(connection) -> None:
+    floors = {model: archived_max_id(connection, model) for model in (Invoice, NDGDocument)}
+    for model, floor in floors.items():
+        _rebuild_with_autoincrement(connection, model.__tablename__, floor)
+
+
+def _drop_date_indexes(connection) -> None:
+    # Indeksy list (data, numer, id) zaczynają się od tej samej kolumny, więc
+    # obsługują też zakresy dat. Starsze pliki archiwów zostają bez zmian.
+    for name in ("ix_invoices_issue_date", "ix_ndg_documents_document_date"):
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+# Nowe zmiany schematu dopisujemy na końcu listy z kolejnym numerem.
+SCHEMA_MIGRATIONS: List[Migration] = [
+    (1, "invoices.internal_notes", partial(add_column, table="invoices", column_ddl="internal_notes TEXT")),
+    (2, "invoices.sale_date", partial(add_column, table="invoices", column_ddl="sale_date DATE")),
+    (3, "invoices.issue_place", partial(add_column, table="invoices", column_ddl="issue_place TEXT")),
+    (4, "invoices.payment_method", partial(add_column, table="invoices", column_ddl="payment_method TEXT")),
+    (5, "invoices.amount_paid", partial(add_column, table="invoices", column_ddl="amount_paid NUMERIC")),
+    (
+        6,
+        "ndg_documents.internal_notes",
+        partial(add_column, table="ndg_documents", column_ddl="internal_notes TEXT"),
+    ),
+    (7, "tabele monthly_totals i data_versions", _migrate_rollup_tables),
+    (8, "indeksy zapytań", partial(_create_indexes, statements=_HOT_QUERY_INDEXES)),
+    (9, "indeksy stronicowania list", partial(_create_indexes, statements=_LIST_ORDER_INDEXES)),
+    (10, "tabela invoice_items (z items_json)", _migrate_invoice_items),
+    (11, "kwoty w groszach (liczby całkowite)", _migrate_money_to_grosze),
+    (12, "liczniki numeracji i unikalne numery dokumentów", _migrate_document_sequences),
+    (13, "indeks wyszukiwania pełnotekstowego (FTS5)", rebuild_search_index),
+    (14, "katalog kontrahentów (z dokumentów sprzedaży)", _migrate_clients),
+    (15, "dziennik zmian change_log", _migrate_change_log),
+    (16, "archiwum zamkniętych lat (archived_years)", _migrate_archived_years),
+    (17, "kolejka zadań w tle (jobs)", _migrate_jobs),
+    (18, "identyfikatory dokumentów bez ponownego użycia (AUTOINCREMENT)", _migrate_autoincrement_ids),
+    (19, "bez zdublowanych indeksów dat (ix_invoices_issue_date, ix_ndg_documents_document_date)", _drop_date_indexes),
+]
+LATEST_SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def ensure_database() -> None:
+    # Schemat sprawdzamy przy pierwszym żądaniu (lub komendzie CLI), a nie przy
+    # imporcie modułu - sam start aplikacji nie dotyka bazy.
+    state = current_app.extensions
+    if state.get("schema_ready"):
+        return
+    with _SCHEMA_LOCK:
+        if not state.get("schema_ready"):
+            initialize_database()
+            state["schema_ready"] = True
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import load_only
+
+from .extensions import db
+from .helpers import slugify
+from .invoice_line import decode_lines
+from .models import Invoice, NDGDocument
+
+# Wyszukiwanie pełnotekstowe (SQLite FTS5). Każdy dokument ma jeden wiersz
+# w search_invoices / search_ndg o rowid równym id dokumentu. Tekst zapisujemy
+# znormalizowany jak w slugify (bez polskich znaków, małe litery), tak samo
+# normalizujemy zapytanie - "zolc" znajdzie "żółć".
+SEARCH_TABLES = {
+    "invoice": "search_invoices",
+    "ndg": "search_ndg",
+}
+REINDEX_BATCH_SIZE = 500
+# Wagi bm25 dla kolumn (numer, kontrahent, treść).
+_RANK_WEIGHTS = "10.0, 5.0, 1.0"
+
+
+def create_search_tables(connection, schema: str = "main") -> None:
+    for table in SEARCH_TABLES.values():
+        connection.execute(
+            text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.{table} USING fts5(number, party, body)")
+        )
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_search_tables_with_schema(target, connection, **kw) -> None:
+    create_search_tables(connection)
+
+
+def search_text(*values: str | None) -> str:
+    # slugify gubi "ł" (nie ma rozkładu NFKD), więc zamieniamy je wcześniej.
+    joined = " ".join(value for value in values if value)
+    return slugify(joined.replace("ł", "l").replace("Ł", "L")).replace("_", " ")
+
+
+def _invoice_row(invoice) -> dict:
+    # invoice to obiekt Invoice albo wiersz z tymi samymi kolumnami (reindeksacja).
+    return {
+        "rowid": invoice.id,
+        "number": search_text(invoice.number),
+        "party": search_text(invoice.client_name, invoice.client_tax_id),
+        "body": search_text(
+            *(line.description for line in decode_lines(invoice.items_json)),
+            invoice.notes,
+            invoice.internal_notes,
+        ),
+    }
+
+
+def _ndg_row(document) -> dict:
+    return {
+        "rowid": document.id,
+        "number": search_text(document.number),
+        "party": search_text(document.supplier_name),
+        "body": search_text(document.description, document.internal_notes),
+    }
+
+
+def _delete_rows(connection, kind: str, ids: Iterable[int]) -> None:
+    ids = list(ids)
+    if ids:
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLES[kind]} WHERE rowid = :rowid"),
+            [{"rowid": document_id} for document_id in ids],
+        )
+
+
+def _insert_rows(connection, kind: str, rows: List[dict]) -> None:
+    if rows:
+        connection.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLES[kind]} (rowid, number, party, body)"
+                " VALUES (:rowid, :number, :party, :body)"
+            ),
+            rows,
+        )
+
+
+# Indeks aktualizujemy w tej samej transakcji co zapis dokumentu. Operacje
+# masowe (Query.delete) przebudowują go jawnie przez rebuild_search_index().
+@event.listens_for(db.session, "after_flush")
+def _sync_search_index(session, flush_context) -> None:
+    changed: Dict[str, List[dict]] = {"invoice": [], "ndg": []}
+    removed: Dict[str, List[int]] = {"invoice": [], "ndg": []}
+    for obj in [*session.new, *session.dirty]:
+        if isinstance(obj, Invoice):
+            changed["invoice"].append(_invoice_row(obj))
+        elif isinstance(obj, NDGDocument):
+            changed["ndg"].append(_ndg_row(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Invoice):
+            removed["invoice"].append(obj.id)
+        elif isinstance(obj, NDGDocument):
+            removed["ndg"].append(obj.id)
+    if not any(changed.values()) and not any(removed.values()):
+        return
+    connection = session.connection()
+    for kind in SEARCH_TABLES:
+        _delete_rows(connection, kind, [*removed[kind], *(row["rowid"] for row in changed[kind])])
+        _insert_rows(connection, kind, changed[kind])
+
+
+_REINDEX_SOURCES = (
+    (
+        "invoice",
+        (
+            Invoice.id,
+            Invoice.number,
+            Invoice.client_name,
+            Invoice.client_tax_id,
+            Invoice.items_json,
+            Invoice.notes,
+            Invoice.internal_notes,
+        ),
+        _invoice_row,
+    ),
+    (
+        "ndg",
+        (
+            NDGDocument.id,
+            NDGDocument.number,
+            NDGDocument.supplier_name,
+            NDGDocument.description,
+            NDGDocument.internal_notes,
+        ),
+        _ndg_row,
+    ),
+)
+
+
+def rebuild_search_index(connection) -> int:
+    create_search_tables(connection)
+    indexed = 0
+    for kind, columns, to_row in _REINDEX_SOURCES:
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLES[kind]}"))
+        id_column = columns[0]
+        last_id = 0
+        while True:
+            batch = connection.execute(
+                select(*columns).where(id_column > last_id).order_by(id_column).limit(REINDEX_BATCH_SIZE)
+            ).all()
+            if not batch:
+                break
+            _insert_rows(connection, kind, [to_row(row) for row in batch])
+            indexed += len(batch)
+            last_id = batch[-1].id
+    return indexed
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    kind: str
+    document: object
+    rank: float
+
+
+@dataclass(frozen=True)
+class SearchResults:
+    query: str
+    hits: List[SearchHit]
+    total: int
+    page: int
+    per_page: int
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page * self.per_page < self.total
+
+
+def match_expression(query: str) -> str | None:
+    # Każde słowo jako prefiks ("kow"* znajdzie "kowalski"), wszystkie muszą wystąpić.
+    tokens = search_text(query).split()
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _ranked_sql(schemas: Sequence[str]) -> str:
+    # W MATCH i bm25 tabela FTS musi wystąpić bez schematu i bez aliasu.
+    return " UNION ALL ".join(
+        f"SELECT '{kind}' AS kind, rowid AS id, bm25({table}, {_RANK_WEIGHTS}) AS rank"
+        f" FROM {schema}.{table} WHERE {table} MATCH :match"
+        for schema in schemas
+        for kind, table in SEARCH_TABLES.items()
+    )
+
+
+_LIST_COLUMNS = {
+    "invoice": (
+        Invoice.id,
+        Invoice.issue_date,
+        Invoice.number,
+        Invoice.document_type,
+        Invoice.client_name,
+        Invoice.gross_amount,
+    ),
+    "ndg": (
+        NDGDocument.id,
+        NDGDocument.document_date,
+        NDGDocument.number,
+        NDGDocument.supplier_name,
+        NDGDocument.amount,
+    ),
+}
+
+
+def search_documents(
+    session,
+    query: str,
+    page: int = 1,
+    per_page: int = 20,
+    schemas: Sequence[str] = ("main",),
+    entities: Dict[str, object] | None = None,
+) -> SearchResults:
+    # schemas - przeszukiwane indeksy (main i dołączone archiwa), entities -
+    # model albo alias z archiwami (archive.with_archives) dla każdego rodzaju.
+    page = max(page, 1)
+    match = match_expression(query)
+    if match is None:
+        return SearchResults(query=query, hits=[], total=0, page=page, per_page=per_page)
+    ranked_sql = _ranked_sql(schemas)
+    total = session.execute(
+        text(f"SELECT COUNT(*) FROM ({ranked_sql})"), {"match": match}
+    ).scalar()
+    rows = session.execute(
+        text(f"{ranked_sql} ORDER BY rank LIMIT :limit OFFSET :offset"),
+        {"match": match, "limit": per_page, "offset": (page - 1) * per_page},
+    ).all()
+
+    entities = {"invoice": Invoice, "ndg": NDGDocument, **(entities or {})}
+    documents = {}
+    for kind, entity in entities.items():
+        ids = [document_id for row_kind, document_id, _ in rows if row_kind == kind]
+        if ids:
+            loaded = (
+                session.query(entity)
+                .options(load_only(*(getattr(entity, column.key) for column in _LIST_COLUMNS[kind])))
+                .filter(entity.id.in_(ids))
+                .all()
+            )
+            documents.update({(kind, obj.id): obj for obj in loaded})
+    hits = [
+        SearchHit(kind=kind, document=documents[(kind, document_id)], rank=rank)
+        for kind, document_id, rank in rows
+        if (kind, document_id) in documents
+    ]
+    return SearchResults(query=query, hits=hits, total=total, page=page, per_page=per_page)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+from .cache import app_cache
+from .extensions import db
+from .models import ServiceTemplate
+from .rollups import bump_data_version, data_version
+
+# Szablony usług zmieniają się rzadko, a formularz dokumentu otwierany jest
+# wiele razy dziennie - katalog trzymamy w pamięci procesu do czasu zmiany
+# wersji w data_versions (podbijanej przy dodaniu i usunięciu szablonu).
+SERVICE_TEMPLATES_VERSION = "service_templates"
+
+
+@dataclass(frozen=True)
+class ServiceCatalog:
+    version: int
+    templates: Tuple[dict, ...]
+
+
+def service_catalog_version() -> int:
+    # Formularz dokumentu dostaje tylko wersję - sam katalog pobiera przez
+    # /api/service-templates i trzyma w localStorage do zmiany wersji.
+    return data_version(SERVICE_TEMPLATES_VERSION)
+
+
+def service_catalog() -> ServiceCatalog:
+    version = service_catalog_version()
+    return app_cache("service_templates").get_or_build(version, lambda: _build_catalog(version))
+
+
+def _build_catalog(version: int) -> ServiceCatalog:
+    templates = db.session.query(ServiceTemplate).order_by(ServiceTemplate.name).all()
+    return ServiceCatalog(
+        version=version,
+        templates=tuple(
+            {
+                "id": template.id,
+                "name": template.name,
+                "description": template.description,
+                "gross_price": str(template.gross_price),
+            }
+            for template in templates
+        ),
+    )
+
+
+def invalidate_service_catalog(connection) -> None:
+    bump_data_version(connection, SERVICE_TEMPLATES_VERSION)
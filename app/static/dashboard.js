@@ -6,6 +6,8 @@
         const annualCanvas = document.getElementById("annualSalesChart");
         const healthToggle = document.querySelector("[data-health-toggle]");
         const healthPanel = document.getElementById("companyHealthPanel");
+        const annualTotal = document.querySelector("[data-annual-total]");
+        const topServices = document.querySelector("[data-top-services]");
 
         const currencyFormatter = new Intl.NumberFormat("pl-PL", {
             style: "currency",
@@ -20,13 +22,20 @@
             bar: "#3f84d6",
         };
 
+        const refreshIntervalMs = 60000;
+
         let usageChart = null;
         let annualChart = null;
+        let dashboardEtag = bootstrap.etag || null;
+        let annualRequest = null;
+        let servicesRequest = null;
 
+        // Dane osadzone w stronie są aktualne - API odpytujemy dopiero przy
+        // kolejnym odświeżeniu (z If-None-Match, więc zwykle dostajemy 304).
         if (usageCanvas && hasChartJs) {
             const donutPayload = normalizeDonut(bootstrap);
             updateUsageChart(donutPayload);
-            refreshFromApi();
+            window.setInterval(refreshFromApi, refreshIntervalMs);
         }
 
         setupCompanyHealth();
@@ -41,9 +50,8 @@
                     healthPanel.removeAttribute("hidden");
                     healthToggle.classList.add("is-open");
                     healthToggle.setAttribute("aria-expanded", "true");
-                    if (hasChartJs) {
-                        requestAnimationFrame(() => buildAnnualChart());
-                    }
+                    loadAnnualSales();
+                    loadTopServices();
                 } else {
                     healthPanel.setAttribute("hidden", "");
                     healthToggle.classList.remove("is-open");
@@ -52,11 +60,70 @@
             });
         }
 
-        function buildAnnualChart() {
+        function loadAnnualSales() {
+            if (annualRequest || !bootstrap.annual_url) {
+                return;
+            }
+            annualRequest = fetch(bootstrap.annual_url, { headers: { Accept: "application/json" } })
+                .then((response) => (response.ok ? response.json() : null))
+                .then((payload) => {
+                    if (!payload) {
+                        annualRequest = null;
+                        return;
+                    }
+                    if (annualTotal) {
+                        annualTotal.textContent = currencyFormatter.format(Number(payload.total) || 0);
+                    }
+                    if (hasChartJs) {
+                        requestAnimationFrame(() => buildAnnualChart(payload));
+                    }
+                })
+                .catch((error) => {
+                    annualRequest = null;
+                    console.warn("Nie udało się pobrać sprzedaży rocznej.", error);
+                });
+        }
+
+        function loadTopServices() {
+            if (servicesRequest || !topServices || !bootstrap.services_url) {
+                return;
+            }
+            servicesRequest = fetch(bootstrap.services_url, { headers: { Accept: "application/json" } })
+                .then((response) => (response.ok ? response.json() : null))
+                .then((payload) => {
+                    if (!payload) {
+                        servicesRequest = null;
+                        return;
+                    }
+                    renderTopServices(payload.services || []);
+                })
+                .catch((error) => {
+                    servicesRequest = null;
+                    console.warn("Nie udało się pobrać najpopularniejszych usług.", error);
+                });
+        }
+
+        function renderTopServices(services) {
+            const body = topServices.querySelector("tbody");
+            body.replaceChildren(
+                ...services.map((row) => {
+                    const tr = document.createElement("tr");
+                    [row.service, row.documents, currencyFormatter.format(Number(row.gross) || 0)].forEach((value) => {
+                        const td = document.createElement("td");
+                        td.textContent = value;
+                        tr.append(td);
+                    });
+                    return tr;
+                })
+            );
+            topServices.hidden = services.length === 0;
+        }
+
+        function buildAnnualChart(payload) {
             if (!annualCanvas || annualChart || !hasChartJs) {
                 return;
             }
-            const dataset = normalizeAnnual(bootstrap.annual || {});
+            const dataset = normalizeAnnual(payload || {});
             if (!dataset.labels.length) {
                 return;
             }
@@ -105,8 +172,19 @@
         }
 
         function refreshFromApi() {
-            fetch("/api/dashboard-data", { headers: { Accept: "application/json" } })
-                .then((response) => (response.ok ? response.json() : null))
+            const headers = { Accept: "application/json" };
+            if (dashboardEtag) {
+                headers["If-None-Match"] = dashboardEtag;
+            }
+            fetch("/api/dashboard-data", { headers, cache: "no-store" })
+                .then((response) => {
+                    // 304: dane się nie zmieniły od ostatniego odświeżenia.
+                    if (response.status === 304 || !response.ok) {
+                        return null;
+                    }
+                    dashboardEtag = response.headers.get("ETag");
+                    return response.json();
+                })
                 .then((payload) => {
                     if (!payload) {
                         return;
@@ -0,0 +1,142 @@
+(() => {
+    // Formularze z data-job-form zlecają zadanie w tle (odpowiedź JSON 202)
+    // i odpytują /jobs/<id> aż do zakończenia. Bez JS formularz wysyła się
+    // zwykle, a serwer przekierowuje z komunikatem.
+    const pollIntervalMs = 1000;
+    const finishedStatuses = ["done", "failed", "cancelled"];
+    const statusLabels = {
+        queued: "w kolejce",
+        running: "w toku",
+        done: "zakończone",
+        failed: "błąd",
+        cancelled: "anulowane",
+    };
+    const statusClasses = {
+        done: "success",
+        failed: "error",
+    };
+
+    window.addEventListener("DOMContentLoaded", () => {
+        document.querySelectorAll("form[data-job-form]").forEach((form) => {
+            form.addEventListener("submit", (event) => submitJob(event, form));
+        });
+    });
+
+    function statusPanel(form) {
+        const selector = form.dataset.jobStatus;
+        if (selector) {
+            return document.querySelector(selector);
+        }
+        let panel = form.nextElementSibling;
+        if (!panel || !panel.classList.contains("job-status")) {
+            panel = document.createElement("div");
+            panel.className = "flash job-status";
+            form.after(panel);
+        }
+        return panel;
+    }
+
+    async function submitJob(event, form) {
+        // onsubmit z confirm() mógł już anulować wysyłkę.
+        if (event.defaultPrevented) {
+            return;
+        }
+        event.preventDefault();
+        const panel = statusPanel(form);
+        const button = form.querySelector("[type=submit]");
+        if (button) {
+            button.disabled = true;
+        }
+        try {
+            const response = await fetch(form.action, {
+                method: "POST",
+                body: new FormData(form),
+                headers: { Accept: "application/json" },
+            });
+            const payload = await response.json();
+            if (!response.ok) {
+                showError(panel, payload.error || "Nie udało się zlecić zadania.");
+                return;
+            }
+            await pollJob(panel, form, payload);
+        } catch (error) {
+            showError(panel, "Brak połączenia z aplikacją - sprawdź stan zadania później.");
+        } finally {
+            if (button) {
+                button.disabled = false;
+            }
+        }
+    }
+
+    async function pollJob(panel, form, job) {
+        renderJob(panel, form, job);
+        while (!finishedStatuses.includes(job.status)) {
+            await new Promise((resolve) => window.setTimeout(resolve, pollIntervalMs));
+            const response = await fetch(job.status_url, { headers: { Accept: "application/json" } });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            job = await response.json();
+            renderJob(panel, form, job);
+        }
+        if (job.result_url) {
+            window.location.href = job.result_url;
+        }
+    }
+
+    function renderJob(panel, form, job) {
+        panel.hidden = false;
+        panel.className = `flash job-status ${statusClasses[job.status] || ""}`.trim();
+        panel.replaceChildren();
+
+        const { done, total } = job.progress;
+        const label = document.createElement("span");
+        label.textContent = `Zadanie #${job.id}: ${statusLabels[job.status] || job.status}`
+            + (total ? ` (${done} z ${total})` : "");
+        panel.append(label);
+
+        if (!finishedStatuses.includes(job.status)) {
+            const bar = document.createElement("progress");
+            if (total) {
+                bar.max = total;
+                bar.value = done;
+            }
+            panel.append(bar);
+        }
+        if (job.cancel_url) {
+            const cancel = document.createElement("button");
+            cancel.type = "button";
+            cancel.className = "btn-link";
+            cancel.textContent = "Anuluj";
+            cancel.addEventListener("click", () => {
+                cancel.disabled = true;
+                fetch(job.cancel_url, { method: "POST", headers: { Accept: "application/json" } });
+            });
+            panel.append(cancel);
+        }
+        if (job.message) {
+            const message = document.createElement("p");
+            message.textContent = job.message;
+            panel.append(message);
+        }
+        if (job.result_url) {
+            panel.append(link(job.result_url, "Pobierz wynik"));
+        } else if (job.status === "done" && form.dataset.jobDoneUrl) {
+            panel.append(link(form.dataset.jobDoneUrl, form.dataset.jobDoneLabel || "Przejdź dalej"));
+        }
+    }
+
+    function link(href, text) {
+        const anchor = document.createElement("a");
+        anchor.className = "btn-link";
+        anchor.href = href;
+        anchor.textContent = text;
+        return anchor;
+    }
+
+    function showError(panel, text) {
+        panel.hidden = false;
+        panel.className = "flash job-status error";
+        panel.textContent = text;
+    }
+})();
@@ -0,0 +1,111 @@
+"""Pomiar czasu generowania PDF: podgląd faktury i ewidencja sprzedaży.
+
+Porównuje czcionkę wczytywaną przez FPDF.add_font przy każdym dokumencie
+("bez cache", zachowanie sprzed wspólnej pamięci czcionek) z czcionką
+parsowaną raz na proces (app.pdf._add_cached_font). Pierwszy dokument
+w trybie z cache liczymy osobno - zawiera jednorazowe parsowanie.
+Uruchomienie: python scripts/bench_pdf.py [--runs 20] [--rows 200]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from app import create_app, pdf  # noqa: E402
+from app.invoice_line import InvoiceLine, encode_lines  # noqa: E402
+from app.models import Invoice  # noqa: E402
+
+
+def _sample_invoice(number: int) -> Invoice:
+    lines = [
+        InvoiceLine(
+            f"Usługa serwisowa – zdjęcie blokady {position}",
+            Decimal("1"),
+            "szt.",
+            Decimal("100.00"),
+            Decimal("123.00"),
+            Decimal("100.00"),
+            Decimal("123.00"),
+        )
+        for position in range(1, 4)
+    ]
+    return Invoice(
+        id=number,
+        document_type="faktura",
+        number=f"FV/{number}/2026",
+        issue_date=date(2026, 1, 1) + timedelta(days=number % 300),
+        sale_date=date(2026, 1, 1) + timedelta(days=number % 300),
+        issue_place="Łódź",
+        client_name=f"Przedsiębiorstwo Żółć sp. z o.o. {number}",
+        client_tax_id="PL1234567890",
+        client_address="ul. Świętokrzyska 1, 00-001 Warszawa",
+        payment_method="Przelew",
+        amount_paid=Decimal("369.00"),
+        items_json=encode_lines(lines),
+        net_amount=Decimal("300.00"),
+        tax_rate=Decimal("23"),
+        gross_amount=Decimal("369.00"),
+    )
+
+
+def _add_font_per_document(document: pdf.FPDF, family: str, style: str, font_path: Path) -> None:
+    document.add_font(family, style, str(font_path))
+
+
+def _measure(render, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, values: list[float]) -> None:
+    print(
+        f"{label:<34} mediana {statistics.median(values):7.1f} ms"
+        f"  min {min(values):7.1f} ms  max {max(values):7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=200, help="liczba dokumentów w ewidencji")
+    args = parser.parse_args()
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    invoice = _sample_invoice(1)
+    register = [_sample_invoice(number) for number in range(1, args.rows + 1)]
+    renders = {
+        "faktura": lambda: pdf.invoice_pdf_bytes(invoice, invoice.items),
+        f"ewidencja ({args.rows} dok.)": lambda: pdf.sales_register_pdf_bytes(register),
+    }
+
+    with app.app_context():
+        first = _measure(renders["faktura"], 1)
+        cached_font = pdf._add_cached_font
+        pdf._add_cached_font = _add_font_per_document
+        try:
+            baseline = {name: _measure(render, args.runs) for name, render in renders.items()}
+        finally:
+            pdf._add_cached_font = cached_font
+
+        cached = {name: _measure(render, args.runs) for name, render in renders.items()}
+
+    for name in renders:
+        _report(f"{name}, bez cache", baseline[name])
+        _report(f"{name}, z cache", cached[name])
+    print(f"{'pierwsza faktura (parsowanie)':<34} {first[0]:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Pomiar czasu startu aplikacji: import + create_app() i pierwsze żądanie.
+
+Każdy pomiar w świeżym procesie, żeby nie liczyć importów z pamięci podręcznej.
+Uruchomienie: python scripts/bench_startup.py [--runs 10]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[1]})
+created = time.perf_counter()
+app.test_client().get("/api/dashboard-data")
+first = time.perf_counter()
+print(json.dumps({"create_app": created - start, "first_request": first - created}))
+"""
+
+
+def _measure(database_uri: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, database_uri],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        _measure(database_uri)  # pierwszy start tworzy schemat
+        samples = [_measure(database_uri) for _ in range(args.runs)]
+
+    for key in ("create_app", "first_request"):
+        values = [sample[key] * 1000 for sample in samples]
+        print(
+            f"{key:<14} mediana {statistics.median(values):7.1f} ms"
+            f"  min {min(values):7.1f} ms  max {max(values):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.schema import ensure_database  # noqa: E402
+
+# Baza w postaci sprzed wersjonowanych migracji (brak schema_version).
+BASELINE_DB = REPO_DIR / "instance" / "finance.db"
+
+
+def make_app(instance: Path, database: Path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database}", "TESTING": True})
+    app.instance_path = str(instance)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path, tmp_path / "finance.db")
+    with app.app_context():
+        ensure_database()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from app.blueprints import dashboard
+from test_archive import _add_invoice, _archive, _seed_2023
+
+URL = "/api/analytics?from=2023-01-01&to=2026-12-31&granularity=month&series=sales,count"
+
+
+def _yearly_sales(client) -> dict:
+    payload = client.get(URL).get_json()
+    totals: dict = {}
+    for label, value in zip(payload["labels"], payload["series"]["sales"]):
+        totals[label[:4]] = totals.get(label[:4], 0) + value
+    return totals
+
+
+def test_writes_rebuild_only_open_years(app, client, monkeypatch):
+    _seed_2023(client)
+    _add_invoice(client, "2026-01-10", "B/1")
+    _archive(app, 2023)
+
+    builds = []
+    original = dashboard._build_archived_index
+    monkeypatch.setattr(
+        dashboard, "_build_archived_index", lambda *args: builds.append(args) or original(*args)
+    )
+    assert _yearly_sales(client) == {"2023": 200, "2024": 0, "2025": 0, "2026": 100}
+
+    _add_invoice(client, "2026-02-10", "B/2")
+    assert _yearly_sales(client) == {"2023": 200, "2024": 0, "2025": 0, "2026": 200}
+    assert len(builds) == 1
+
+
+def _move_to_tomorrow(monkeypatch) -> None:
+    class Tomorrow(dashboard.date):
+        @classmethod
+        def today(cls):
+            return dashboard.date.fromordinal(super().today().toordinal() + 1)
+
+    monkeypatch.setattr(dashboard, "date", Tomorrow)
+
+
+def test_etag_changes_with_the_date(app, client, monkeypatch):
+    etag = client.get("/api/analytics").headers["ETag"]
+    _move_to_tomorrow(monkeypatch)
+    response = client.get("/api/analytics", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_service_revenue_etag_changes_with_the_date(app, client, monkeypatch):
+    etag = client.get("/api/service-revenue").headers["ETag"]
+    _move_to_tomorrow(monkeypatch)
+    response = client.get("/api/service-revenue", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
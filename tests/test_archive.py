@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.archive import archive_year
+from app.extensions import db
+from app.models import Invoice, NDGDocument
+from app.schema import _migrate_autoincrement_ids
+
+
+def _add_invoice(client, day: str, number: str) -> None:
+    response = client.post(
+        "/invoices/new",
+        data={
+            "issue_date": day,
+            "document_type": "faktura",
+            "number": number,
+            "client_name": "Kowalski",
+            "tax_rate": "0",
+            "payment_method": "BLIK",
+            "item_description[]": ["Usługa"],
+            "item_quantity[]": ["1"],
+            "item_gross_price[]": ["100"],
+        },
+    )
+    assert response.status_code == 302
+
+
+def _add_ndg(client, day: str, number: str) -> None:
+    response = client.post(
+        "/ndg/new",
+        data={"document_date": day, "number": number, "supplier_name": "Dostawca", "amount": "10"},
+    )
+    assert response.status_code == 302
+
+
+def _archive(app, year: int) -> None:
+    with app.app_context():
+        archive_year(db.session.connection(), year)
+        db.session.commit()
+
+
+def _latest_ids(app):
+    with app.app_context():
+        return (
+            db.session.query(db.func.max(Invoice.id)).scalar(),
+            db.session.query(db.func.max(NDGDocument.id)).scalar(),
+        )
+
+
+def _assert_new_documents_after_archive(app, client) -> None:
+    client.post("/documents/purge", data={"scope": "all"})
+    _add_invoice(client, "2026-02-01", "C/1")
+    _add_ndg(client, "2026-02-01", "N/2")
+    invoice_id, ndg_id = _latest_ids(app)
+
+    # Archiwum ma faktury o id 1-2 i dokument NDG o id 1.
+    assert invoice_id > 2
+    assert ndg_id > 1
+    assert "C/1" in client.get(f"/invoices/{invoice_id}").get_data(as_text=True)
+    assert "A/1" in client.get("/invoices/1").get_data(as_text=True)
+    listing = client.get("/invoices?od=2023-01-01").get_data(as_text=True)
+    assert all(number in listing for number in ("A/1", "A/2", "C/1"))
+    ndg_listing = client.get("/ndg?od=2023-01-01").get_data(as_text=True)
+    assert "N/1" in ndg_listing and "N/2" in ndg_listing
+
+
+def _seed_2023(client) -> None:
+    _add_invoice(client, "2023-03-01", "A/1")
+    _add_invoice(client, "2023-05-01", "A/2")
+    _add_ndg(client, "2023-04-01", "N/1")
+
+
+def test_ids_are_not_reused_after_archive_and_purge(app, client):
+    _seed_2023(client)
+    _archive(app, 2023)
+    _assert_new_documents_after_archive(app, client)
+
+
+def test_upgrade_seeds_id_counters_from_archives(app, client):
+    _seed_2023(client)
+    _archive(app, 2023)
+    with app.app_context():
+        # Stan sprzed migracji 18: brak licznika, SQLite nadaje max(id) + 1.
+        db.session.execute(text("DELETE FROM sqlite_sequence"))
+        _migrate_autoincrement_ids(db.session.connection())
+        db.session.commit()
+    _assert_new_documents_after_archive(app, client)
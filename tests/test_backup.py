@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+import time
+import zipfile
+from datetime import date
+
+from test_archive import _add_invoice, _archive, _seed_2023
+
+
+def _restore(client, data: bytes, name: str) -> dict:
+    response = client.post(
+        "/backup/import",
+        data={"backup_file": (io.BytesIO(data), name)},
+        headers={"Accept": "application/json"},
+    )
+    assert response.status_code == 202
+    job = response.get_json()
+    deadline = time.monotonic() + 30
+    while job["status"] in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+        job = client.get(job["status_url"]).get_json()
+    return job
+
+
+def test_backup_round_trip_includes_archives(app, client):
+    _seed_2023(client)
+    _add_invoice(client, "2026-01-10", "B/1")
+    _archive(app, 2023)
+
+    response = client.get("/backup/export")
+    assert response.mimetype == "application/zip"
+    bundle = response.get_data()
+    with zipfile.ZipFile(io.BytesIO(bundle)) as archive:
+        assert sorted(archive.namelist()) == ["archive_2023.db", "finance.db"]
+        database_only = archive.read("finance.db")
+
+    _add_invoice(client, "2026-02-10", "B/2")
+    job = _restore(client, bundle, "backup.zip")
+    assert job["status"] == "done", job["message"]
+
+    listing = client.get("/invoices?od=2023-01-01").get_data(as_text=True)
+    assert "A/1" in listing and "B/1" in listing
+    assert "B/2" not in listing
+
+    job = _restore(client, database_only, "backup.db")
+    assert job["status"] == "failed"
+    assert "archive_2023.db" in job["message"]
+
+
+def test_restore_invalidates_version_etags(app, client):
+    today = date.today().isoformat()
+    _add_invoice(client, today, "A/1")
+    bundle = client.get("/backup/export").get_data()
+    _add_invoice(client, today, "A/2")
+    urls = ("/api/dashboard-data", "/api/annual-sales", "/api/analytics", "/api/service-revenue")
+    etags = {url: client.get(url).headers["ETag"] for url in urls}
+
+    job = _restore(client, bundle, "backup.zip")
+    assert job["status"] == "done", job["message"]
+
+    for url, etag in etags.items():
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200, url
+        assert response.headers["ETag"] != etag
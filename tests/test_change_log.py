@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from test_archive import _add_invoice
+
+
+def _changes(client, since: int = 0) -> list:
+    return client.get(f"/api/changes?since={since}").get_json()["changes"]
+
+
+def test_edit_writes_one_change_log_row(client):
+    _add_invoice(client, "2026-01-10", "B/1")
+    cursor = _changes(client)[-1]["cursor"]
+
+    response = client.post(
+        "/invoices/1/edit",
+        data={
+            "issue_date": "2026-01-10",
+            "document_type": "faktura",
+            "number": "B/1",
+            "client_name": "Nowak",
+            "tax_rate": "23",
+            "notes": "Poprawka",
+            "payment_method": "BLIK",
+            "item_description[]": ["Usługa"],
+            "item_quantity[]": ["2"],
+            "item_gross_price[]": ["100"],
+        },
+    )
+    assert response.status_code == 302
+
+    changes = _changes(client, cursor)
+    assert [(change["entity"], change["id"], change["operation"]) for change in changes] == [
+        ("invoice", 1, "update")
+    ]
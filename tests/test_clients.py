@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from app.extensions import db
+from app.models import Client
+from app.search import search_text
+
+INVOICE = {
+    "issue_date": "2026-01-10",
+    "document_type": "faktura",
+    "number": "A/1",
+    "client_name": "Żółć Sp. z o.o.",
+    "client_address": "Łódź, ul. Polna 1",
+    "tax_rate": "0",
+    "payment_method": "BLIK",
+    "item_description[]": ["Usługa"],
+    "item_quantity[]": ["1"],
+    "item_gross_price[]": ["100"],
+}
+NAME_KEY = f"nazwa:{search_text('Żółć Sp. z o.o.')}"
+
+
+def _post(client, url: str, data: dict) -> None:
+    assert client.post(url, data=data).status_code == 302
+
+
+def _clients(app) -> list:
+    with app.app_context():
+        return [
+            (row.key, row.name, row.tax_id, row.address)
+            for row in db.session.query(Client).order_by(Client.key)
+        ]
+
+
+def test_invoice_writes_keep_clients_in_sync(app, client):
+    _post(client, "/invoices/new", INVOICE)
+    assert _clients(app) == [(NAME_KEY, "Żółć Sp. z o.o.", None, "Łódź, ul. Polna 1")]
+
+    # Ten sam kontrahent z NIP-em to nowy wpis katalogu (klucz po cyfrach NIP).
+    _post(client, "/invoices/1/edit", {**INVOICE, "client_tax_id": "PL 123-456-78-90"})
+    assert _clients(app) == [
+        (NAME_KEY, "Żółć Sp. z o.o.", None, "Łódź, ul. Polna 1"),
+        ("nip:1234567890", "Żółć Sp. z o.o.", "PL 123-456-78-90", "Łódź, ul. Polna 1"),
+    ]
+
+    _post(
+        client,
+        "/invoices/1/edit",
+        {**INVOICE, "client_tax_id": "1234567890", "client_address": "Kraków"},
+    )
+    assert _clients(app)[1] == ("nip:1234567890", "Żółć Sp. z o.o.", "1234567890", "Kraków")
+
+    # Katalog pamięta kontrahentów także po usunięciu dokumentu.
+    _post(client, "/invoices/1/delete", {})
+    assert [key for key, *_ in _clients(app)] == [NAME_KEY, "nip:1234567890"]
+    suggestions = client.get("/api/clients?prefix=1234").get_json()["clients"]
+    assert suggestions == [{"name": "Żółć Sp. z o.o.", "tax_id": "1234567890", "address": "Kraków"}]
+
+
+def test_retail_and_ndg_documents_do_not_add_clients(app, client):
+    _post(client, "/invoices/new", {**INVOICE, "client_name": "", "client_address": ""})
+    _post(client, "/ndg/new", {"document_date": "2026-01-12", "number": "N/1", "supplier_name": "Dostawca", "amount": "10"})
+    _post(client, "/ndg/1/edit", {"document_date": "2026-01-12", "number": "N/1", "supplier_name": "Hurtownia", "amount": "10"})
+    _post(client, "/ndg/1/delete", {})
+    assert _clients(app) == []
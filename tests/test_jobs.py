@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import io
+import threading
+import time
+
+from app import jobs
+from app.extensions import db
+from app.models import Invoice
+from test_archive import _add_invoice
+
+JSON = {"Accept": "application/json"}
+CSV = "Numer;Data;Kontrahent;Brutto\nI/1;2026-01-10;Kowalski;100\nI/2;2026-01-11;Nowak;200\n".encode("utf-8")
+
+# Zadanie testowe trzymające bramkę zadań, dopóki test go nie zwolni.
+_events: dict = {}
+_runs: list = []
+
+
+@jobs.job_handler("test_blocking", exclusive=True)
+def _run_blocking(job: jobs.JobContext, params: dict) -> jobs.JobOutcome:
+    _runs.append(params["name"])
+    _events["started"].set()
+    assert _events["release"].wait(10)
+    return jobs.JobOutcome("Gotowe.")
+
+
+def _wait(client, job: dict) -> dict:
+    deadline = time.monotonic() + 30
+    while job["status"] in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+        job = client.get(job["status_url"]).get_json()
+    return job
+
+
+def _submit_blocking(app, name: str) -> dict:
+    with app.test_request_context():
+        job = jobs.submit_job("test_blocking", {"name": name})
+        return {"id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+def test_cancelled_queued_job_never_starts(app, client):
+    _events.update(started=threading.Event(), release=threading.Event())
+    _runs.clear()
+    first = _submit_blocking(app, "first")
+    assert _events["started"].wait(10)
+    # Bramka jest zajęta przez zadanie wyłączne, więc drugie czeka w kolejce.
+    second = _submit_blocking(app, "second")
+
+    response = client.post(f"/jobs/{second['id']}/cancel")
+    assert response.status_code == 202
+    assert response.get_json()["status"] == "cancelled"
+
+    _events["release"].set()
+    assert _wait(client, first)["status"] == "done"
+    # Wątek drugiego zadania przechodzi przez bramkę i kończy bez uruchamiania go.
+    with app.app_context():
+        deadline = time.monotonic() + 10
+        while jobs.job_runner().live(second["id"]) is not None:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+    assert client.get(second["status_url"]).get_json()["status"] == "cancelled"
+    assert _runs == ["first"]
+
+
+def test_cancelling_running_import_rolls_back(app, client, monkeypatch):
+    started, proceed = threading.Event(), threading.Event()
+    original = jobs.JobContext.progress
+
+    def pausing_progress(self, done, total=None):
+        original(self, done, total)
+        if done == 1 and total is None:
+            started.set()
+            assert proceed.wait(10)
+
+    monkeypatch.setattr(jobs.JobContext, "progress", pausing_progress)
+    response = client.post(
+        "/import/invoices", data={"csv_file": (io.BytesIO(CSV), "sprzedaz.csv")}, headers=JSON
+    )
+    assert response.status_code == 202
+    job = response.get_json()
+    assert started.wait(10)
+
+    # Pierwszy wiersz jest już zapisany w otwartej transakcji importu.
+    assert client.post(job["cancel_url"]).status_code == 202
+    proceed.set()
+    job = _wait(client, job)
+    assert job["status"] == "cancelled"
+    assert job["progress"] == {"done": 1, "total": 2}
+    with app.app_context():
+        assert db.session.query(Invoice).count() == 0
+
+
+def test_result_download_and_cancel_after_finish(app, client):
+    _add_invoice(client, "2026-01-10", "B/1")
+    response = client.post("/invoices/export/pdf?from=2026-01-01&to=2026-01-31", headers=JSON)
+    assert response.status_code == 202
+    job = _wait(client, response.get_json())
+    assert job["status"] == "done", job["message"]
+    assert job["cancel_url"] is None
+
+    result = client.get(job["result_url"])
+    assert result.status_code == 200
+    assert result.mimetype == "application/pdf"
+    assert "ewidencja_sprzedazy_2026-01-01_2026-01-31.pdf" in result.headers["Content-Disposition"]
+    assert result.get_data().startswith(b"%PDF")
+
+    response = client.post(f"/jobs/{job['id']}/cancel")
+    assert response.status_code == 409
+    assert client.get(job["status_url"]).get_json()["status"] == "done"
+    assert client.get("/jobs/999/result").status_code == 404
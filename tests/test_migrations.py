@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import shutil
+import sqlite3
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.schema import LATEST_SCHEMA_VERSION, upgrade_database
+
+from conftest import BASELINE_DB, make_app
+
+
+def _duplicate_first_invoice(path) -> str:
+    connection = sqlite3.connect(path)
+    cursor = connection.execute("SELECT * FROM invoices ORDER BY id LIMIT 1")
+    columns = [column[0] for column in cursor.description]
+    row = dict(zip(columns, cursor.fetchone()))
+    row["id"] = row["id"] + 1000
+    connection.execute(
+        f"INSERT INTO invoices ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+        list(row.values()),
+    )
+    connection.commit()
+    connection.close()
+    return row["number"]
+
+
+def test_upgrade_from_baseline_with_duplicate_numbers(tmp_path):
+    database = tmp_path / "finance.db"
+    shutil.copy(BASELINE_DB, database)
+    number = _duplicate_first_invoice(database)
+    app = make_app(tmp_path, database)
+
+    with app.app_context():
+        upgrade_database()
+        version = db.session.execute(text("SELECT version FROM schema_version")).scalar()
+        numbers = db.session.execute(text("SELECT number FROM invoices ORDER BY id")).scalars().all()
+        unique_index = db.session.execute(
+            text("SELECT sql FROM sqlite_master WHERE name = 'ix_invoices_number_type'")
+        ).scalar()
+        db.session.remove()
+        db.engine.dispose()
+
+    assert version == LATEST_SCHEMA_VERSION
+    assert numbers.count(number) == 1
+    assert any(value.startswith(f"{number} (duplikat #") for value in numbers)
+    assert unique_index.startswith("CREATE UNIQUE INDEX")
+    assert app.test_client().get("/invoices").status_code == 200
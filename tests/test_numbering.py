@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import date
+
+from app.extensions import db
+from app.models import Invoice
+from app.numbering import allocate_document_number, peek_document_number, register_document_number
+
+DAY = date(2026, 1, 10)
+
+
+def _post_invoice(client, number: str, suggested: str = ""):
+    return client.post(
+        "/invoices/new",
+        data={
+            "issue_date": DAY.isoformat(),
+            "document_type": "faktura",
+            "number": number,
+            "number_suggested": suggested,
+            "client_name": "Kowalski",
+            "tax_rate": "0",
+            "payment_method": "BLIK",
+            "item_description[]": ["Usługa"],
+            "item_quantity[]": ["1"],
+            "item_gross_price[]": ["100"],
+        },
+    )
+
+
+def _numbers(app) -> list:
+    with app.app_context():
+        return db.session.scalars(db.select(Invoice.number).order_by(Invoice.id)).all()
+
+
+def test_allocation_is_sequential_per_type_and_month(app):
+    with app.app_context():
+        assert peek_document_number(db.session, "faktura", DAY) == "1/1/2026"
+        assert allocate_document_number(db.session, "faktura", DAY) == "1/1/2026"
+        assert allocate_document_number(db.session, "faktura", DAY) == "2/1/2026"
+        assert allocate_document_number(db.session, "paragon", DAY) == "1/1/2026"
+        assert allocate_document_number(db.session, "faktura", date(2026, 2, 1)) == "1/2/2026"
+        db.session.commit()
+        assert peek_document_number(db.session, "faktura", DAY) == "3/1/2026"
+
+
+def test_registered_number_only_moves_the_sequence_forward(app):
+    with app.app_context():
+        register_document_number(db.session, "faktura", DAY, "7/1/2026")
+        assert peek_document_number(db.session, "faktura", DAY) == "8/1/2026"
+        register_document_number(db.session, "faktura", DAY, "3/1/2026")
+        register_document_number(db.session, "faktura", DAY, "bez numeru")
+        assert allocate_document_number(db.session, "faktura", DAY) == "8/1/2026"
+
+
+def test_manual_number_bumps_the_sequence(app, client):
+    assert _post_invoice(client, "7/1/2026").status_code == 302
+    assert client.get("/api/next-number?issue_date=2026-01-10").get_json() == {"number": "8/1/2026"}
+
+
+def test_duplicate_number_is_rejected(app, client):
+    assert _post_invoice(client, "5/1/2026").status_code == 302
+    response = _post_invoice(client, "5/1/2026")
+    assert response.status_code == 200
+    assert "Dokument o numerze 5/1/2026 już istnieje." in response.get_data(as_text=True)
+    assert _numbers(app) == ["5/1/2026"]
+
+
+def test_suggested_number_is_allocated_on_save(app, client):
+    suggested = client.get("/api/next-number?issue_date=2026-01-10").get_json()["number"]
+    assert suggested == "1/1/2026"
+    # Inny dokument zajmuje podpowiedziany numer, zanim formularz zostanie zapisany.
+    assert _post_invoice(client, "").status_code == 302
+    assert _post_invoice(client, suggested, suggested=suggested).status_code == 302
+    assert _numbers(app) == ["1/1/2026", "2/1/2026"]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import base64
+import json
+
+import pytest
+
+from app.extensions import db
+from app.models import INVOICE_LIST_ORDER, Invoice
+from app.pagination import decode_cursor, encode_cursor, keyset_page
+
+# Ten sam dzień i powtarzające się numery (różne typy) - kolejność rozstrzyga id.
+DOCUMENTS = [
+    ("2026-01-10", "faktura", "1/1/2026"),
+    ("2026-01-10", "paragon", "1/1/2026"),
+    ("2026-01-10", "faktura", "2/1/2026"),
+    ("2026-01-10", "paragon", "2/1/2026"),
+    ("2026-01-12", "faktura", "3/1/2026"),
+]
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+@pytest.fixture
+def documents(client):
+    for day, document_type, number in DOCUMENTS:
+        response = client.post(
+            "/invoices/new",
+            data={
+                "issue_date": day,
+                "document_type": document_type,
+                "number": number,
+                "client_name": "Kowalski",
+                "tax_rate": "0",
+                "payment_method": "BLIK",
+                "item_description[]": ["Usługa"],
+                "item_quantity[]": ["1"],
+                "item_gross_price[]": ["100"],
+            },
+        )
+        assert response.status_code == 302
+
+
+def _page(app, per_page: int = 2, **args):
+    with app.test_request_context("/invoices", query_string=args):
+        page = keyset_page(db.session.query(Invoice), INVOICE_LIST_ORDER, per_page)
+        return [invoice.id for invoice in page.items], page.prev_cursor, page.next_cursor
+
+
+def test_pages_cover_ties_without_gaps_or_repeats(app, documents):
+    with app.app_context():
+        expected = [
+            invoice.id
+            for invoice in db.session.query(Invoice).order_by(*[column.desc() for column in INVOICE_LIST_ORDER])
+        ]
+    assert expected == [5, 4, 3, 2, 1]
+
+    pages = []
+    ids, prev_cursor, next_cursor = _page(app)
+    assert prev_cursor is None
+    pages.append(ids)
+    while next_cursor:
+        ids, prev_cursor, next_cursor = _page(app, after=next_cursor)
+        assert prev_cursor is not None
+        pages.append(ids)
+    assert pages == [[5, 4], [3, 2], [1]]
+
+    # Wstecz od ostatniej strony przez ?before= - te same strony w odwrotnej kolejności.
+    back = []
+    while prev_cursor:
+        ids, prev_cursor, next_cursor = _page(app, before=prev_cursor)
+        assert next_cursor is not None
+        back.append(ids)
+    assert back == [[3, 2], [5, 4]]
+
+
+def test_cursor_round_trip(app, documents):
+    with app.app_context():
+        invoice = db.session.get(Invoice, 2)
+        values = tuple(getattr(invoice, column.key) for column in INVOICE_LIST_ORDER)
+    assert decode_cursor(encode_cursor(values), INVOICE_LIST_ORDER) == values
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "nie-kursor!",
+        "%%%",
+        _raw_cursor(["2026-01-10", "1/1/2026"]),
+        _raw_cursor({"issue_date": "2026-01-10"}),
+        _raw_cursor(["10.01.2026", "1/1/2026", 1]),
+        _raw_cursor([None, "1/1/2026", 1]),
+        _raw_cursor(["2026-01-10", "1/1/2026", "x"]),
+        _raw_cursor(["2026-01-10", "1/1/2026", {}]),
+        _raw_cursor(["2026-01-10", "1/1/2026", 10**30]),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+    ],
+)
+def test_bad_cursor_falls_back_to_first_page(app, client, documents, token):
+    assert decode_cursor(token, INVOICE_LIST_ORDER) is None
+    assert _page(app, after=token)[0] == [5, 4]
+    for name in ("after", "before"):
+        assert client.get(f"/invoices?{name}={token}").status_code == 200
+        assert client.get(f"/ndg?{name}={token}").status_code == 200
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+from app import pdf_cache
+from app.extensions import db
+from app.models import Invoice
+from test_archive import _add_invoice
+
+CACHED_PDF = b"%PDF-1.4 plik z pdf_cache"
+
+
+def test_bundle_reuses_cached_pdfs_and_stores_rendered_ones(app, client):
+    _add_invoice(client, "2026-03-02", "C/1")
+    _add_invoice(client, "2026-03-20", "C/2")
+    _add_invoice(client, "2026-04-01", "D/1")
+    with app.app_context():
+        cached, rendered = db.session.query(Invoice).filter(Invoice.number.in_(["C/1", "C/2"])).order_by(Invoice.id).all()
+        pdf_cache.store_pdf(pdf_cache.invoice_pdf_key(cached), CACHED_PDF)
+        names = [pdf_cache.invoice_pdf_filename(invoice) for invoice in (cached, rendered)]
+        rendered_key = pdf_cache.invoice_pdf_key(rendered)
+        assert pdf_cache.cached_pdf_path(rendered_key) is None
+
+    response = client.get("/invoices/export/bundle?month=2026-03")
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    assert response.headers["Content-Disposition"] == "attachment; filename=dokumenty_2026-03.zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as bundle:
+        assert bundle.testzip() is None
+        assert sorted(bundle.namelist()) == sorted(names)
+        assert bundle.read(names[0]) == CACHED_PDF
+        rendered_pdf = bundle.read(names[1])
+    assert rendered_pdf.startswith(b"%PDF")
+    with app.app_context():
+        assert pdf_cache.cached_pdf_path(rendered_key).read_bytes() == rendered_pdf
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from app import pdf_cache
+from test_archive import _add_invoice
+
+
+def test_edit_regenerates_cached_pdf(app, client, monkeypatch):
+    renders = []
+    original = pdf_cache.invoice_pdf_bytes
+    monkeypatch.setattr(
+        pdf_cache, "invoice_pdf_bytes", lambda *args: renders.append(args) or original(*args)
+    )
+    _add_invoice(client, "2026-01-10", "B/1")
+
+    first = client.get("/invoices/1/pdf")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert client.get("/invoices/1/pdf", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/invoices/1/pdf").get_data() == first.get_data()
+    assert len(renders) == 1
+    with app.app_context():
+        cached = sorted(path.name for path in pdf_cache.pdf_cache_dir().iterdir())
+    assert cached == [f"{first.get_etag()[0]}.pdf"]
+
+    response = client.post(
+        "/invoices/1/edit",
+        data={
+            "issue_date": "2026-01-10",
+            "document_type": "faktura",
+            "number": "B/1",
+            "client_name": "Nowak",
+            "tax_rate": "0",
+            "payment_method": "BLIK",
+            "item_description[]": ["Usługa"],
+            "item_quantity[]": ["1"],
+            "item_gross_price[]": ["100"],
+        },
+    )
+    assert response.status_code == 302
+
+    second = client.get("/invoices/1/pdf", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert len(renders) == 2
+    with app.app_context():
+        cached = sorted(path.name for path in pdf_cache.pdf_cache_dir().iterdir())
+    assert cached == [f"{second.get_etag()[0]}.pdf"]
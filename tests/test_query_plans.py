@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from app.cli import _FULL_SCAN_PATTERN, query_plan_report
+
+
+def test_full_scan_pattern():
+    assert _FULL_SCAN_PATTERN.match("SCAN invoices")
+    assert _FULL_SCAN_PATTERN.match("SCAN TABLE invoices")
+    assert not _FULL_SCAN_PATTERN.match("SCAN invoices USING INDEX ix_invoices_list_order")
+    assert not _FULL_SCAN_PATTERN.match("SEARCH invoices USING INDEX ix_invoices_list_order (issue_date>? AND issue_date<?)")
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        report = query_plan_report()
+    assert report
+    scans = {name: scanned for name, _, scanned in report if scanned}
+    assert scans == {}
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from app import pdf
+
+HEADERS = ["Data", "Numer", "Kwota", "VAT"]
+WIDTHS = [30, 40, 30, 30]
+
+
+def test_register_table_carries_sums_across_pages(monkeypatch):
+    summaries = []
+    headers = []
+    original_summary = pdf._register_summary_row
+    original_header = pdf._pdf_table_header
+
+    def record_summary(document, font, widths, amount_columns, label, sums):
+        summaries.append((document.page_no(), label, list(sums)))
+        original_summary(document, font, widths, amount_columns, label, sums)
+
+    def record_header(document, *args, **kwargs):
+        headers.append(document.page_no())
+        original_header(document, *args, **kwargs)
+
+    monkeypatch.setattr(pdf, "_register_summary_row", record_summary)
+    monkeypatch.setattr(pdf, "_pdf_table_header", record_header)
+
+    amounts = [[Decimal(index) + Decimal("0.01"), Decimal(index % 7)] for index in range(1, 121)]
+    rows = ((["2026-01-01", f"{index}/1/2026", "", ""], values) for index, values in enumerate(amounts, 1))
+    document, font = pdf._pdf_with_title("Ewidencja")
+    totals = pdf._register_table(document, font, HEADERS, WIDTHS, (2, 3), rows)
+
+    pages = document.page_no()
+    assert pages >= 2
+    assert headers == list(range(1, pages + 1))
+
+    expected = [sum(column, Decimal("0")) for column in zip(*amounts)]
+    assert totals == expected
+    assert summaries[-1] == (pages, "Razem", expected)
+
+    carried = [Decimal("0"), Decimal("0")]
+    for page in range(1, pages + 1):
+        labels = {label: sums for number, label, sums in summaries if number == page}
+        if page > 1:
+            assert labels["Z przeniesienia"] == carried
+        page_sum = labels["Suma strony"]
+        carried = [before + value for before, value in zip(carried, page_sum)]
+        if page < pages:
+            assert labels["Do przeniesienia"] == carried
+    assert carried == expected
+
+
+def test_export_rejects_malformed_dates(client):
+    for url in ("/invoices/export/pdf?from=abc", "/ndg/export/pdf?to=2026-13-45"):
+        response = client.get(url)
+        assert response.status_code == 302
+        assert "/export/" not in response.headers["Location"]
+    response = client.get("/invoices/export/pdf?from=abc", follow_redirects=True)
+    assert "Niepoprawna data początkowa: abc." in response.get_data(as_text=True)
+    assert client.get("/invoices/export/pdf?from=2026-01-01&to=2026-01-31").mimetype == "application/pdf"
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.extensions import db
+
+INVOICE = {
+    "issue_date": "2026-01-10",
+    "document_type": "faktura",
+    "number": "A/1",
+    "client_name": "Żółć Sp. z o.o.",
+    "tax_rate": "0",
+    "payment_method": "BLIK",
+    "item_description[]": ["Usługa"],
+    "item_quantity[]": ["1"],
+    "item_gross_price[]": ["100"],
+}
+NDG = {"document_date": "2026-01-12", "number": "N/1", "supplier_name": "Dostawca", "amount": "10"}
+
+
+def _post(client, url: str, data: dict) -> None:
+    assert client.post(url, data=data).status_code == 302
+
+
+def _search_rows(app, table: str) -> list:
+    with app.app_context():
+        return [
+            tuple(row)
+            for row in db.session.execute(text(f"SELECT rowid, number, party, body FROM {table} ORDER BY rowid"))
+        ]
+
+
+def _total(client, query: str) -> int:
+    return client.get(f"/api/search?q={query}").get_json()["total"]
+
+
+def test_invoice_writes_keep_search_index_in_sync(app, client):
+    _post(client, "/invoices/new", INVOICE)
+    assert _search_rows(app, "search_invoices") == [(1, "a 1", "zolc sp z o o", "usluga")]
+
+    _post(
+        client,
+        "/invoices/1/edit",
+        {**INVOICE, "client_tax_id": "1234567890", "notes": "Termin 14 dni", "item_description[]": ["Konsultacja"]},
+    )
+    assert _search_rows(app, "search_invoices") == [
+        (1, "a 1", "zolc sp z o o 1234567890", "konsultacja termin 14 dni")
+    ]
+    assert _total(client, "konsult") == 1
+    assert _total(client, "usluga") == 0
+
+    _post(client, "/invoices/1/delete", {})
+    assert _search_rows(app, "search_invoices") == []
+    assert _total(client, "zolc") == 0
+
+
+def test_ndg_writes_keep_search_index_in_sync(app, client):
+    _post(client, "/ndg/new", NDG)
+    assert _search_rows(app, "search_ndg") == [(1, "n 1", "dostawca", "")]
+
+    _post(
+        client,
+        "/ndg/1/edit",
+        {**NDG, "number": "N/2", "supplier_name": "Hurtownia Łąka", "description": "Papier"},
+    )
+    assert _search_rows(app, "search_ndg") == [(1, "n 2", "hurtownia laka", "papier")]
+    assert _total(client, "laka") == 1
+    assert _total(client, "dostawca") == 0
+
+    _post(client, "/ndg/1/delete", {})
+    assert _search_rows(app, "search_ndg") == []
+    assert _total(client, "papier") == 0
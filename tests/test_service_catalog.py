@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from test_backup import _restore
+
+
+def _add_template(client, name: str) -> None:
+    response = client.post(
+        "/services", data={"name": name, "description": f"{name} - opis", "gross_price": "150"}
+    )
+    assert response.status_code == 302
+
+
+def test_form_loads_catalog_from_versioned_endpoint(client):
+    _add_template(client, "Konsultacja")
+    form = client.get("/invoices/new").get_data(as_text=True)
+    assert "Konsultacja" not in form
+
+    response = client.get("/api/service-templates")
+    etag = response.headers["ETag"]
+    payload = response.get_json()
+    assert f"const serviceCatalogVersion = {payload['version']};" in form
+    assert [template["name"] for template in payload["templates"]] == ["Konsultacja"]
+    assert client.get("/api/service-templates", headers={"If-None-Match": etag}).status_code == 304
+
+    _add_template(client, "Audyt")
+    response = client.get("/api/service-templates", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["version"] > payload["version"]
+    assert [template["name"] for template in response.get_json()["templates"]] == ["Audyt", "Konsultacja"]
+
+
+def test_restore_never_reuses_a_catalog_version(client):
+    _add_template(client, "Konsultacja")
+    bundle = client.get("/backup/export").get_data()
+    _add_template(client, "Audyt")
+    stored = client.get("/api/service-templates")
+    version, etag = stored.get_json()["version"], stored.headers["ETag"]
+
+    job = _restore(client, bundle, "backup.zip")
+    assert job["status"] == "done", job["message"]
+    # Pierwszy zapis po przywróceniu dawniej dostawał tę samą wersję co "Audyt".
+    _add_template(client, "Szkolenie")
+
+    form = client.get("/invoices/new").get_data(as_text=True)
+    assert f"const serviceCatalogVersion = {version};" not in form
+    response = client.get("/api/service-templates", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["version"] > version
+    assert [template["name"] for template in response.get_json()["templates"]] == ["Konsultacja", "Szkolenie"]